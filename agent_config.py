@@ -2,11 +2,13 @@
 # 주식 매매 Agent 설정 파일
 # KIS API 키 및 전략 파라미터를 여기서 관리합니다.
 
+from typing import Any
+
 # =============================================================================
 # KIS (한국투자증권) API 설정
 # https://apiportal.koreainvestment.com/ 에서 발급
 # =============================================================================
-KIS_CONFIG = {
+KIS_CONFIG: dict[str, Any] = {
     # 실전투자 / 모의투자 구분
     "is_paper_trading": True,  # True: 모의투자, False: 실전투자
 
@@ -21,6 +23,24 @@ KIS_CONFIG = {
     # 계좌 정보
     "account_no": "YOUR_ACCOUNT_NO",  # 예: "12345678"
     "account_type": "01",             # 01: 위탁계좌
+
+    # 초당 REST 호출 한도 (None이면 실전 20건 / 모의 2건)
+    "rate_limit_per_sec": None,
+    # 현재가 캐시 유효 시간 (초). 같은 종목을 화면 표시 → 수량 계산 → 주문에서 다시 조회하지 않음
+    "quote_ttl_sec": 2.0,
+    # 토큰 캐시 파일 (같은 파일을 쓰는 agent 프로세스끼리 토큰 공유, 만료 1시간 전 자동 갱신)
+    "token_cache_file": ".kis_token_cache.json",
+}
+
+# =============================================================================
+# 실시간 체결가 (KIS WebSocket, agent_kis_stream)
+# =============================================================================
+STREAM_CONFIG: dict[str, Any] = {
+    "enabled": False,        # True: 분석 결과가 준비되면 종합 랭킹 상위 종목 실시간 구독
+    "watchlist_size": 30,    # 구독할 종합 랭킹 상위 종목 수 (KIS 세션당 최대 41)
+    "ws_url": None,          # None이면 실전/모의 KIS 주소, 리플레이 서버는 "ws://127.0.0.1:8765"
+    "max_age_sec": 10,       # 이보다 오래된 체결가는 쓰지 않고 REST로 조회
+    "record_path": None,     # 수신 원문 기록 파일 (JSONL, 리플레이 서버 입력)
 }
 
 # =============================================================================
@@ -104,14 +124,43 @@ COMPOSITE_WEIGHTS = {
     "ncav": 0.10,
 }
 
+# =============================================================================
+# 백테스트 설정 (strat_backtest.py)
+# =============================================================================
+BACKTEST_CONFIG: dict[str, Any] = {
+    "price_file": "derived/prices.parquet",  # 수정종가 테이블 (날짜 × 종목코드, 또는 date/종목코드/close)
+    "rebalance": "M",             # 리밸런싱 주기 (M: 월말, Q: 분기말)
+    "top_n": 20,                  # 전략별 보유 종목 수 (동일가중)
+    "cost_bps": 30,               # 거래비용 (매매 금액 대비 bp, 수수료+세금+슬리피지)
+    "strategies": ["peg", "piotroski", "greenblatt", "multifactor", "composite", "universe"],
+    "processes": None,            # 스냅샷별 종목 선정 병렬 프로세스 수 (None: CPU 수)
+}
+
+# =============================================================================
+# 파라미터 스윕 설정 (strat_sweep.py)
+# 키: "전략.파라미터" (STRATEGY_CONFIG 경로) 또는 "composite.전략" (COMPOSITE_WEIGHTS)
+# =============================================================================
+SWEEP_CONFIG: dict[str, Any] = {
+    "grid": {
+        "peg.max_peg": [0.5, 1.0, 1.5],
+        "piotroski.min_score": [5, 6, 7],
+        "greenblatt.top_n": [20, 30],
+        "multifactor.weights.모멘텀": [0.0, 0.15, 0.30],
+    },
+    "top_n": 20,                  # 조합별로 비교할 종합 상위 종목 수
+    "processes": None,            # worker 프로세스 수 (None: CPU 수)
+}
+
 # =============================================================================
 # 매매 설정
 # =============================================================================
-TRADING_CONFIG = {
+TRADING_CONFIG: dict[str, Any] = {
     "max_stocks": 10,             # 최대 보유 종목 수
     "invest_per_stock": 1_000_000,  # 종목당 투자금액 (원) - 기본값
     "order_type": "00",           # 00: 지정가, 01: 시장가
     "order_condition": "0",       # 0: 일반주문
+    "order_workers": None,        # 동시 주문 제출 수 (None: KIS 초당 호출 한도)
+    "order_max_retries": 2,       # 주문별 재시도 횟수 (접수되지 않았음이 확인된 경우만)
 }
 
 # =============================================================================
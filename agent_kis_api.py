@@ -3,21 +3,303 @@
 # 공식 문서: https://apiportal.koreainvestment.com/
 #
 # 기능:
-#   - 액세스 토큰 발급 / 자동 갱신
+#   - 액세스 토큰 발급 / 자동 갱신 (TokenManager: 만료 전 백그라운드 갱신, 프로세스 간 파일 락 공유)
 #   - 계좌 잔고 조회
 #   - 현재가 조회
 #   - 매수 / 매도 주문
 #   - 체결 내역 조회
 #   - 보유 종목 조회
-
+#
+# 호출 방식:
+#   - 모든 REST 호출은 keep-alive 세션 하나를 공유 (매 호출 TLS 핸드셰이크 없음)
+#   - 초당 호출 한도(RATE_LIMITS)를 RateLimiter로 지키고, 한도 초과 응답(EGW00201)은 재시도
+#   - get_prices_batch_async: 여러 종목 현재가를 한도 내에서 동시에 조회
+#   - 현재가는 QuoteCache에 짧게(quote_ttl_sec) 보관, 같은 종목 동시 조회는 HTTP 1회로 합침
+#   - attach_prices(PriceTable)로 실시간 체결가 표(agent_kis_stream)를 붙이면 그 값을 먼저 사용
+
+import asyncio
 import json
+import os
+import random
+import threading
 import time
 import requests
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from pathlib import Path
+from typing import IO
+from requests.adapters import HTTPAdapter
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore[assignment]
+    import msvcrt
 
 
 TOKEN_CACHE_FILE = ".kis_token_cache.json"
+TOKEN_REFRESH_AHEAD = timedelta(hours=1)   # 만료 이만큼 전에 미리 갱신
+TOKEN_RETRY_SEC = 60                       # 갱신 실패 시 재시도 간격 (KIS 토큰 발급은 분당 1회)
+TOKEN_ERROR_CODES = ("EGW00121", "EGW00123")  # 유효하지 않은 / 기간이 만료된 token
+
+# 초당 REST 호출 한도 (앱키 기준, KIS 유량 안내). KIS_CONFIG["rate_limit_per_sec"]로 덮어쓸 수 있다
+RATE_LIMITS = {"real": 20, "paper": 2}
+RATE_LIMIT_MSG_CD = "EGW00201"   # 초당 거래건수를 초과하였습니다
+MAX_RATE_RETRIES = 3
+REQUEST_TIMEOUT = 10
+QUOTE_TTL_SEC = 2.0               # 현재가 캐시 유효 시간 (KIS_CONFIG["quote_ttl_sec"])
+MAX_HISTORY_PAGES = 100           # 주문 체결 내역 연속 조회 최대 페이지 수 (응답 tr_cont F/M이면 다음 페이지)
+
+
+class RateLimiter:
+    """
+    초당 호출 한도 제한기 (토큰 버킷, 스레드 안전)
+
+    rate개/초 속도로 토큰이 충전되며 최대 capacity개까지 쌓인다.
+    reserve()가 토큰 하나를 예약하고 기다릴 시간을 돌려주므로,
+    여러 스레드가 동시에 호출해도 예약 순서대로 간격을 두고 실행된다.
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """토큰 1개 예약 → 대기해야 할 시간 (초)"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    def acquire(self):
+        """토큰을 얻을 때까지 대기"""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+
+class QuoteCache:
+    """
+    현재가 단기 캐시 (스레드 안전)
+
+    - ttl_sec 동안은 같은 종목을 다시 조회하지 않는다 (0이면 캐시하지 않음)
+    - 같은 종목을 여러 스레드가 동시에 조회하면 첫 호출만 fetch하고 나머지는 그 결과를 기다린다
+    - 오류 응답({"error": ...})은 캐시하지 않는다
+    - invalidate()는 조회 중인 결과도 캐시에 들어가지 않게 한다 (주문 직후 등)
+    """
+
+    def __init__(self, ttl_sec=QUOTE_TTL_SEC):
+        self.ttl_sec = ttl_sec
+        self._quotes: dict[str, tuple[float, dict]] = {}  # code → (조회 시각, quote)
+        self._inflight: dict[str, Future[dict]] = {}
+        self._generation = 0  # invalidate() 횟수
+        self._lock = threading.Lock()
+
+    def get(self, code: str, fetch) -> dict:
+        """캐시된 현재가, 없거나 만료됐으면 fetch(code) 결과"""
+        with self._lock:
+            hit = self._quotes.get(code)
+            if hit and time.monotonic() - hit[0] < self.ttl_sec:
+                return hit[1]
+            future = self._inflight.get(code)
+            owner = future is None
+            if future is None:
+                future = self._inflight[code] = Future()
+                generation = self._generation
+        if not owner:
+            return future.result()  # 먼저 시작한 조회 결과 공유
+        try:
+            quote: dict = fetch(code)
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(code, None)
+            future.set_exception(e)
+            raise
+        with self._lock:
+            if "error" not in quote and self.ttl_sec > 0 and generation == self._generation:
+                self._quotes[code] = (time.monotonic(), quote)
+            self._inflight.pop(code, None)
+        future.set_result(quote)
+        return quote
+
+    def invalidate(self, codes=None):
+        """codes(None이면 전체) 캐시 무효화"""
+        with self._lock:
+            self._generation += 1
+            if codes is None:
+                self._quotes.clear()
+            else:
+                for code in ([codes] if isinstance(codes, str) else codes):
+                    self._quotes.pop(code, None)
+
+
+class _FileLock:
+    """프로세스 간 배타 락 (POSIX fcntl / Windows msvcrt)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._f: IO[str] | None = None
+
+    def __enter__(self):
+        f = self._f = open(self.path, "a+")
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)  # 10초 대기 후 OSError
+                    break
+                except OSError:
+                    continue
+        return self
+
+    def __exit__(self, *exc):
+        f, self._f = self._f, None
+        if f is None:
+            return
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        f.close()
+
+
+class TokenManager:
+    """
+    액세스 토큰 수명 관리 (스레드 안전, 프로세스 간 공유)
+
+    - get()은 메모리의 토큰이 유효하면 락·파일 I/O 없이 바로 반환한다
+    - start() 후에는 백그라운드 스레드가 만료 refresh_ahead 전에 미리 갱신한다
+    - 갱신은 캐시 파일 락 안에서 파일을 다시 읽어, 다른 프로세스가 이미 갱신했으면
+      그 토큰을 쓰고 아닐 때만 issue()로 새로 발급한다 (여러 agent가 동시에 발급 요청하지 않음)
+    """
+
+    def __init__(self, issue, scope: str, cache_file: str = TOKEN_CACHE_FILE,
+                 refresh_ahead: timedelta = TOKEN_REFRESH_AHEAD, retry_sec: float = TOKEN_RETRY_SEC):
+        """
+        Args:
+            issue:      () → (token, 만료 시각) 새 토큰 발급 함수 (실패 시 예외)
+            scope:      캐시 파일을 공유할 범위 (앱키·서버가 다른 토큰은 쓰지 않음)
+        """
+        self._issue = issue
+        self.scope = scope
+        self.cache_file = cache_file
+        self.refresh_ahead = refresh_ahead
+        self.retry_sec = retry_sec
+
+        self.token: str | None = None
+        self.expire: datetime | None = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def valid(self, margin: timedelta = timedelta(0)) -> bool:
+        return self.token is not None and self.expire is not None and datetime.now() + margin < self.expire
+
+    def get(self) -> str:
+        """유효한 토큰 (평소에는 메모리 값, 만료된 경우에만 동기 갱신)"""
+        if not self.valid():
+            self.refresh()
+        assert self.token is not None  # refresh()는 발급에 실패하면 예외
+        return self.token
+
+    def refresh(self, stale: str | None = None) -> bool:
+        """
+        토큰 갱신 → 새로 발급했으면 True, 기존/다른 프로세스 토큰을 썼으면 False
+
+        Args:
+            stale: 서버가 거절한 토큰. 주면 이 토큰은 유효 시간과 관계없이 쓰지 않는다
+        """
+        with self._lock:
+            # 다른 스레드가 방금 갱신했으면 그대로 사용
+            if stale is None and self.valid(self.refresh_ahead):
+                return False
+            if stale is not None and self.token != stale and self.valid():
+                return False
+
+            with _FileLock(self.cache_file + ".lock"):
+                cached = self._read_cache()
+                if cached and cached[0] != stale and datetime.now() + self.refresh_ahead < cached[1]:
+                    self.token, self.expire = cached
+                    return False
+                token, expire = self._issue()
+                self._write_cache(token, expire)
+                self.token, self.expire = token, expire
+                return True
+
+    def _read_cache(self):
+        try:
+            with open(self.cache_file, encoding="utf-8") as f:
+                d = json.load(f)
+            if d.get("scope", self.scope) != self.scope:
+                return None
+            return d["token"], datetime.fromisoformat(d["expire"])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _write_cache(self, token: str, expire: datetime):
+        tmp = self.cache_file + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"token": token, "expire": expire.isoformat(), "scope": self.scope}, f)
+        os.replace(tmp, self.cache_file)
+
+    # ------------------------------------------------------------------
+    # 백그라운드 갱신
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """만료 전 자동 갱신 스레드 시작 (이미 실행 중이면 무시)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="kis-token", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            wait = 0.0
+            if self.expire is not None:
+                remaining = (self.expire - datetime.now()).total_seconds()
+                # 수명이 refresh_ahead보다 짧은 토큰은 남은 시간의 절반 뒤에 갱신 (매초 재발급 방지)
+                wait = max(remaining - self.refresh_ahead.total_seconds(), remaining / 2)
+            if self._stop.wait(max(wait, 1.0)):
+                return
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"  ⚠️ 토큰 자동 갱신 실패 ({e}), {self.retry_sec}초 후 재시도")
+                self._stop.wait(self.retry_sec)
+
+
+def _body_order_no(resp) -> str:
+    """주문 응답 본문의 주문번호 (오류 응답에도 실려 오는 경우가 있음, 없으면 "")"""
+    try:
+        order_no: str = (resp.json().get("output") or {}).get("ODNO", "")
+    except (ValueError, AttributeError):
+        return ""
+    return order_no
+
+
+def _error_code(resp):
+    """KIS 오류 응답의 msg_cd (정상 응답 / JSON 아님이면 None)"""
+    if resp.status_code == 200:
+        return None
+    try:
+        return resp.json().get("msg_cd")
+    except ValueError:
+        return None
 
 
 class KISApi:
@@ -43,8 +325,19 @@ class KISApi:
         self.base_url = (config["base_url_paper"] if self.is_paper
                          else config["base_url_real"])
 
-        self.access_token = None
-        self.token_expire = None
+        self.tokens = TokenManager(self._issue_token, scope=f"{self.app_key}@{self.base_url}",
+                                   cache_file=config.get("token_cache_file", TOKEN_CACHE_FILE))
+
+        # 초당 호출 한도 + keep-alive 세션 (동시 조회 수만큼 커넥션 유지)
+        self.rate_limit = config.get("rate_limit_per_sec") or RATE_LIMITS["paper" if self.is_paper else "real"]
+        self.limiter = RateLimiter(self.rate_limit)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, int(self.rate_limit)))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.quotes = QuoteCache(config.get("quote_ttl_sec", QUOTE_TTL_SEC))
+        self.price_table = None      # agent_kis_stream.PriceTable (attach_prices)
+        self.price_max_age: float | None = None
 
         env_label = "🟡 모의투자" if self.is_paper else "🟢 실전투자"
         print(f"  KIS API 초기화 완료 ({env_label})")
@@ -53,39 +346,62 @@ class KISApi:
     # 인증
     # ------------------------------------------------------------------
 
+    @property
+    def access_token(self):
+        return self.tokens.token
+
+    @property
+    def token_expire(self):
+        return self.tokens.expire
+
     def authenticate(self) -> bool:
-        """액세스 토큰 발급 (캐시된 토큰 재사용)"""
-        # 캐시 확인
-        if self._load_token_cache():
-            print("  ✅ 토큰 캐시 사용 중")
-            return True
+        """액세스 토큰 준비 (캐시된 토큰 재사용) + 만료 전 자동 갱신 시작"""
+        try:
+            issued = self.tokens.refresh() if not self.tokens.valid() else False
+        except (requests.RequestException, RuntimeError, KeyError, ValueError) as e:
+            print(f"  ❌ 인증 실패: {e}")
+            return False
+        self.tokens.start()
+        print("  ✅ 인증 성공 (토큰 발급)" if issued else "  ✅ 토큰 캐시 사용 중")
+        return True
 
+    def _issue_token(self):
+        """새 액세스 토큰 발급 → (token, 만료 시각)"""
         url = f"{self.base_url}/oauth2/tokenP"
         payload = {
             "grant_type": "client_credentials",
             "appkey":     self.app_key,
             "appsecret":  self.app_secret,
         }
-        resp = requests.post(url, json=payload, timeout=10)
+        resp = self.session.post(url, json=payload, timeout=REQUEST_TIMEOUT)
         if resp.status_code != 200:
-            print(f"  ❌ 인증 실패: {resp.status_code} {resp.text}")
-            return False
+            raise RuntimeError(f"{resp.status_code} {resp.text}")
 
         data = resp.json()
-        self.access_token = data["access_token"]
-        # 만료 시간은 보통 1일
-        self.token_expire = datetime.now() + timedelta(hours=23)
-        self._save_token_cache()
-        print("  ✅ 인증 성공 (토큰 발급)")
-        return True
+        # 만료 시간은 보통 1일 (expires_in 초)
+        return data["access_token"], datetime.now() + timedelta(seconds=int(data.get("expires_in", 86400)))
+
+    def get_approval_key(self) -> str:
+        """실시간(WebSocket) 접속키 발급"""
+        url = f"{self.base_url}/oauth2/Approval"
+        payload = {
+            "grant_type": "client_credentials",
+            "appkey":     self.app_key,
+            "secretkey":  self.app_secret,
+        }
+        resp = self.session.post(url, json=payload, timeout=REQUEST_TIMEOUT)
+        resp.raise_for_status()
+        approval_key: str = resp.json()["approval_key"]
+        return approval_key
+
+    def _ensure_token(self):
+        self.tokens.get()
 
-    def _headers(self, tr_id: str, extra: dict = None) -> dict:
-        """공통 헤더 생성"""
-        if not self.access_token or datetime.now() >= self.token_expire:
-            self.authenticate()
+    def _headers(self, tr_id: str, extra: dict | None = None) -> dict:
+        """공통 헤더 생성 (토큰은 TokenManager가 미리 갱신해 두므로 보통 대기 없음)"""
         h = {
             "Content-Type":  "application/json; charset=utf-8",
-            "authorization": f"Bearer {self.access_token}",
+            "authorization": f"Bearer {self.tokens.get()}",
             "appkey":        self.app_key,
             "appsecret":     self.app_secret,
             "tr_id":         tr_id,
@@ -95,28 +411,28 @@ class KISApi:
             h.update(extra)
         return h
 
-    def _load_token_cache(self) -> bool:
-        cache = Path(TOKEN_CACHE_FILE)
-        if not cache.exists():
-            return False
-        try:
-            with open(cache) as f:
-                d = json.load(f)
-            expire = datetime.fromisoformat(d["expire"])
-            if datetime.now() < expire:
-                self.access_token = d["token"]
-                self.token_expire = expire
-                return True
-        except Exception:
-            pass
-        return False
+    def _request(self, method: str, url: str, tr_id: str, extra_headers: dict | None = None,
+                 **kwargs) -> requests.Response:
+        """
+        한도를 지키며 REST 호출 (공유 세션 사용)
 
-    def _save_token_cache(self):
-        with open(TOKEN_CACHE_FILE, "w") as f:
-            json.dump({
-                "token":  self.access_token,
-                "expire": self.token_expire.isoformat(),
-            }, f)
+        한도 초과 응답은 주문이 접수되지 않은 것이므로 MAX_RATE_RETRIES회까지 다시 보낸다.
+        만료/무효 토큰 응답은 토큰을 갱신(다른 프로세스가 갱신했으면 그 토큰)해 한 번 다시 보낸다.
+        """
+        token_retried = False
+        attempt = 0
+        while True:
+            self.limiter.acquire()
+            headers = self._headers(tr_id, extra_headers)
+            resp = self.session.request(method, url, headers=headers, timeout=REQUEST_TIMEOUT, **kwargs)
+            code = _error_code(resp)
+            if code in TOKEN_ERROR_CODES and not token_retried:
+                token_retried = True
+                self.tokens.refresh(stale=headers["authorization"][len("Bearer "):])
+                continue
+            if code != RATE_LIMIT_MSG_CD or attempt == MAX_RATE_RETRIES:
+                return resp
+            attempt += 1
 
     # ------------------------------------------------------------------
     # 현재가 조회
@@ -126,6 +442,9 @@ class KISApi:
         """
         국내 주식 현재가 조회
 
+        실시간 체결가 표에 price_max_age초 이내 값이 있으면 그 값을, 없으면 REST로 조회한다
+        (QuoteCache 경유, quote_ttl_sec 이내 재조회는 캐시 사용).
+
         Returns:
             {
                 "code": "005930",
@@ -138,6 +457,22 @@ class KISApi:
                 "change_rate": 1.23  # 등락률 (%)
             }
         """
+        if self.price_table is not None:
+            streamed = self.price_table.get(stock_code, self.price_max_age)
+            if streamed is not None:
+                return streamed
+        return self.quotes.get(stock_code, self._fetch_current_price)
+
+    def invalidate_quotes(self, codes=None):
+        """현재가 캐시 무효화 (codes: 종목코드 또는 목록, None이면 전체)"""
+        self.quotes.invalidate(codes)
+
+    def attach_prices(self, table, max_age_sec: float | None = None):
+        """실시간 체결가 표 연결 (None이면 해제). max_age_sec보다 오래된 체결가는 REST로 조회"""
+        self.price_table = table
+        self.price_max_age = max_age_sec
+
+    def _fetch_current_price(self, stock_code: str) -> dict:
         url = f"{self.base_url}/uapi/domestic-stock/v1/quotations/inquire-price"
         tr_id = "FHKST01010100"
 
@@ -145,7 +480,7 @@ class KISApi:
             "fid_cond_mrkt_div_code": "J",
             "fid_input_iscd": stock_code,
         }
-        resp = requests.get(url, headers=self._headers(tr_id), params=params, timeout=10)
+        resp = self._request("GET", url, tr_id, params=params)
 
         if resp.status_code != 200:
             return {"error": f"HTTP {resp.status_code}"}
@@ -166,13 +501,37 @@ class KISApi:
             "change_rate": float(o.get("prdy_ctrt", 0)),
         }
 
-    def get_prices_batch(self, codes: list, delay_sec: float = 0.2) -> dict:
-        """여러 종목 현재가 일괄 조회 (API 부하 방지 딜레이 포함)"""
-        result = {}
-        for code in codes:
-            result[code] = self.get_current_price(code)
-            time.sleep(delay_sec)
-        return result
+    async def get_prices_batch_async(self, codes: list, concurrency: int | None = None) -> dict:
+        """
+        여러 종목 현재가 동시 조회 (asyncio)
+
+        공유 세션 위에서 최대 concurrency건(기본: 초당 한도)을 동시에 보내고,
+        시작 간격은 RateLimiter가 맞춘다. 실패한 종목은 {"error": ...}로 남는다.
+
+        Returns:
+            {종목코드: get_current_price 결과} (codes 순서)
+        """
+        codes = list(dict.fromkeys(codes))
+        if not codes:
+            return {}
+        self._ensure_token()  # 토큰 발급은 동시 조회 전에 한 번만
+
+        workers = min(len(codes), concurrency or max(1, int(self.rate_limit)))
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = await asyncio.gather(
+                *(loop.run_in_executor(executor, self._price_or_error, code) for code in codes))
+        return dict(zip(codes, results))
+
+    def get_prices_batch(self, codes: list, concurrency: int | None = None) -> dict:
+        """여러 종목 현재가 일괄 조회 (get_prices_batch_async의 동기 버전)"""
+        return asyncio.run(self.get_prices_batch_async(codes, concurrency))
+
+    def _price_or_error(self, code: str) -> dict:
+        try:
+            return self.get_current_price(code)
+        except requests.RequestException as e:
+            return {"error": str(e)}
 
     # ------------------------------------------------------------------
     # 계좌 조회
@@ -217,7 +576,7 @@ class KISApi:
             "CTX_AREA_FK100":   "",
             "CTX_AREA_NK100":   "",
         }
-        resp = requests.get(url, headers=self._headers(tr_id), params=params, timeout=10)
+        resp = self._request("GET", url, tr_id, params=params)
 
         if resp.status_code != 200:
             return {"error": f"HTTP {resp.status_code}"}
@@ -270,6 +629,7 @@ class KISApi:
 
         Returns:
             {"success": True, "order_no": "...", "message": "..."}
+            실패 시 {"success": False, "error", "message", "order_no"} (본문에 ODNO가 없으면 order_no는 "")
         """
         url = f"{self.base_url}/uapi/domestic-stock/v1/trading/order-cash"
 
@@ -292,15 +652,18 @@ class KISApi:
         side_kr = "매수" if side == "buy" else "매도"
         print(f"  📤 {side_kr} 주문 → {stock_code} {qty}주 @ {price:,}원")
 
-        resp = requests.post(url, headers=self._headers(tr_id), json=payload, timeout=10)
+        resp = self._request("POST", url, tr_id, json=payload)
 
         if resp.status_code != 200:
-            return {"success": False, "error": f"HTTP {resp.status_code}", "message": resp.text}
+            return {"success": False, "error": f"HTTP {resp.status_code}", "message": resp.text,
+                    "order_no": _body_order_no(resp)}
 
         d = resp.json()
         if d.get("rt_cd") != "0":
-            return {"success": False, "error": d.get("rt_cd"), "message": d.get("msg1", "")}
+            return {"success": False, "error": d.get("rt_cd"), "message": d.get("msg1", ""),
+                    "order_no": _body_order_no(resp)}
 
+        self.invalidate_quotes(stock_code)  # 체결로 가격이 움직였을 수 있음
         output = d.get("output", {})
         return {
             "success":  True,
@@ -344,15 +707,21 @@ class KISApi:
     # 체결 내역 조회
     # ------------------------------------------------------------------
 
-    def get_order_history(self, date: str = None) -> list:
+    def get_order_history(self, date: str | None = None, filled_only: bool = True,
+                          strict: bool = False) -> list:
         """
         당일 또는 특정일 주문 체결 내역 조회
 
+        응답 헤더 tr_cont가 F/M이면 ctx_area_fk100/nk100을 넘겨 다음 페이지를 이어서 조회한다.
+
         Args:
-            date: "YYYYMMDD" 형식. None이면 오늘
+            date:        "YYYYMMDD" 형식. None이면 오늘
+            filled_only: True면 체결분만, False면 미체결 주문 포함
+            strict:      True면 조회 실패(또는 MAX_HISTORY_PAGES 초과) 시 RuntimeError (주문 재시도 전 확인용).
+                         False면 실패한 페이지부터는 빼고 반환
 
         Returns:
-            [{"code", "name", "side", "qty", "price", "status"}, ...]
+            [{"code", "name", "side", "qty", "price", "status", "order_no", "filled_qty"}, ...]
         """
         if date is None:
             date = datetime.now().strftime("%Y%m%d")
@@ -368,7 +737,7 @@ class KISApi:
             "SLL_BUY_DVSN_CD":  "00",  # 00: 전체
             "INQR_DVSN":        "00",
             "PDNO":             "",
-            "CCLD_DVSN":        "01",
+            "CCLD_DVSN":        "01" if filled_only else "00",  # 01: 체결, 00: 전체
             "ORD_GNO_BRNO":     "",
             "ODNO":             "",
             "INQR_DVSN_3":      "00",
@@ -377,24 +746,42 @@ class KISApi:
             "CTX_AREA_NK100":   "",
         }
 
-        resp = requests.get(url, headers=self._headers(tr_id), params=params, timeout=10)
-        if resp.status_code != 200:
-            return []
-
-        d = resp.json()
-        if d.get("rt_cd") != "0":
-            return []
-
-        history = []
-        for item in d.get("output1", []):
-            history.append({
-                "code":   item.get("pdno", ""),
-                "name":   item.get("prdt_name", ""),
-                "side":   "매수" if item.get("sll_buy_dvsn_cd") == "02" else "매도",
-                "qty":    int(item.get("ord_qty", 0)),
-                "price":  int(item.get("avg_prvs", 0)),
-                "status": item.get("ord_tmd", ""),
-            })
+        history: list[dict] = []
+        tr_cont = ""
+        for _ in range(MAX_HISTORY_PAGES):
+            resp = self._request("GET", url, tr_id, extra_headers={"tr_cont": tr_cont} if tr_cont else None,
+                                 params=params)
+            if resp.status_code != 200:
+                if strict:
+                    raise RuntimeError(f"체결 내역 조회 실패: HTTP {resp.status_code}")
+                return history
+
+            d = resp.json()
+            if d.get("rt_cd") != "0":
+                if strict:
+                    raise RuntimeError(f"체결 내역 조회 실패: {d.get('msg1', '')}")
+                return history
+
+            for item in d.get("output1", []):
+                history.append({
+                    "code":   item.get("pdno", ""),
+                    "name":   item.get("prdt_name", ""),
+                    "side":   "매수" if item.get("sll_buy_dvsn_cd") == "02" else "매도",
+                    "qty":    int(item.get("ord_qty", 0)),
+                    "price":  int(item.get("avg_prvs", 0)),
+                    "status": item.get("ord_tmd", ""),
+                    "order_no":   item.get("odno", ""),
+                    "filled_qty": int(item.get("tot_ccld_qty", 0)),
+                })
+
+            if resp.headers.get("tr_cont") not in ("F", "M"):
+                return history
+            params["CTX_AREA_FK100"] = d.get("ctx_area_fk100", "")
+            params["CTX_AREA_NK100"] = d.get("ctx_area_nk100", "")
+            tr_cont = "N"
+
+        if strict:
+            raise RuntimeError(f"체결 내역 조회 실패: {MAX_HISTORY_PAGES}페이지 초과")
         return history
 
 
@@ -408,19 +795,51 @@ class MockKISApi:
     실제 주문을 실행하지 않으며 콘솔 출력으로 대체합니다.
     """
 
-    def __init__(self):
-        self._holdings = {}
+    def __init__(self, quote_ttl_sec: float = QUOTE_TTL_SEC, lost_response_rate: float = 0.0):
+        """
+        Args:
+            lost_response_rate: 주문은 처리됐지만 응답이 유실(Timeout)되는 비율 (재시도 테스트용)
+        """
+        self._holdings: dict[str, dict] = {}
         self._cash = 10_000_000  # 가상 예수금 1천만원
+        self._orders: list[dict] = []
+        self._order_seq = 0
+        self._lock = threading.Lock()  # 동시 주문 시 잔고/주문 목록 보호
+        self.lost_response_rate = lost_response_rate
+        self.quotes = QuoteCache(quote_ttl_sec)
+        self.price_table = None
+        self.price_max_age: float | None = None
         print("  🔵 모의 API 모드 (실제 주문 없음)")
 
     def authenticate(self): return True
 
+    def get_approval_key(self) -> str: return "MOCK-APPROVAL"
+
     def get_current_price(self, code: str) -> dict:
-        import random
+        if self.price_table is not None:
+            streamed = self.price_table.get(code, self.price_max_age)
+            if streamed is not None:
+                return streamed
+        return self.quotes.get(code, self._fetch_current_price)
+
+    def invalidate_quotes(self, codes=None):
+        self.quotes.invalidate(codes)
+
+    def attach_prices(self, table, max_age_sec: float | None = None):
+        self.price_table = table
+        self.price_max_age = max_age_sec
+
+    def _fetch_current_price(self, code: str) -> dict:
         price = random.randint(5000, 100000)
         return {"code": code, "name": f"종목_{code}", "price": price,
                 "change_rate": round(random.uniform(-3, 3), 2)}
 
+    async def get_prices_batch_async(self, codes: list, concurrency: int | None = None) -> dict:
+        return {code: self.get_current_price(code) for code in dict.fromkeys(codes)}
+
+    def get_prices_batch(self, codes: list, concurrency: int | None = None) -> dict:
+        return {code: self.get_current_price(code) for code in dict.fromkeys(codes)}
+
     def get_account_balance(self) -> dict:
         return {
             "cash":     self._cash,
@@ -438,27 +857,37 @@ class MockKISApi:
 
         print(f"  [모의] {side_kr}: {code} {qty}주 @ {exec_price:,}원 = {amount:,}원")
 
-        if side == "buy":
-            self._cash -= amount
-            if code in self._holdings:
-                old = self._holdings[code]
-                total_qty   = old["qty"] + qty
-                avg_price   = (old["avg_price"] * old["qty"] + exec_price * qty) // total_qty
-                self._holdings[code] = {"code": code, "name": code,
-                                        "qty": total_qty, "avg_price": avg_price,
-                                        "current_price": exec_price}
+        with self._lock:
+            if side == "buy":
+                self._cash -= amount
+                if code in self._holdings:
+                    old = self._holdings[code]
+                    total_qty   = old["qty"] + qty
+                    avg_price   = (old["avg_price"] * old["qty"] + exec_price * qty) // total_qty
+                    self._holdings[code] = {"code": code, "name": code,
+                                            "qty": total_qty, "avg_price": avg_price,
+                                            "current_price": exec_price}
+                else:
+                    self._holdings[code] = {"code": code, "name": code,
+                                            "qty": qty, "avg_price": exec_price,
+                                            "current_price": exec_price}
             else:
-                self._holdings[code] = {"code": code, "name": code,
-                                        "qty": qty, "avg_price": exec_price,
-                                        "current_price": exec_price}
-        else:
-            self._cash += amount
-            if code in self._holdings:
-                self._holdings[code]["qty"] -= qty
-                if self._holdings[code]["qty"] <= 0:
-                    del self._holdings[code]
-
-        return {"success": True, "order_no": f"MOCK-{int(time.time())}", "message": f"{side_kr} 완료"}
+                self._cash += amount
+                if code in self._holdings:
+                    self._holdings[code]["qty"] -= qty
+                    if self._holdings[code]["qty"] <= 0:
+                        del self._holdings[code]
+
+            self._order_seq += 1
+            order_no = f"MOCK-{self._order_seq:06d}"
+            self._orders.append({"code": code, "name": code, "side": side_kr, "qty": qty,
+                                 "price": exec_price, "status": datetime.now().strftime("%H%M%S"),
+                                 "order_no": order_no, "filled_qty": qty})
+
+        self.invalidate_quotes(code)
+        if random.random() < self.lost_response_rate:
+            raise requests.ReadTimeout(f"[모의] {code} 주문 응답 유실")
+        return {"success": True, "order_no": order_no, "message": f"{side_kr} 완료"}
 
     def place_market_order(self, code: str, side: str, qty: int) -> dict:
         return self.place_order(code, side, qty)
@@ -467,5 +896,6 @@ class MockKISApi:
         price = self.get_current_price(code)["price"]
         return budget // price
 
-    def get_order_history(self, date=None) -> list:
-        return []
+    def get_order_history(self, date=None, filled_only: bool = True, strict: bool = False) -> list:
+        with self._lock:
+            return [dict(o) for o in self._orders]
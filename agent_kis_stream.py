@@ -0,0 +1,469 @@
+# agent_kis_stream.py
+# 한국투자증권 (KIS) 실시간 체결가 WebSocket 구독
+# 공식 문서: https://apiportal.koreainvestment.com/ (실시간시세 → 국내주식 실시간체결가 H0STCNT0)
+#
+# 구성:
+#   - PriceTable   : 종목별 최신 체결가 (스레드 안전). KISApi.attach_prices()로 연결하면
+#                    get_current_price가 REST 대신 이 표를 먼저 읽는다
+#   - KISStream    : asyncio 구독/수신 루프 (백그라운드 스레드에서 실행, 끊기면 재접속)
+#   - 리플레이 서버 : 기록해 둔 수신 원문(JSONL)을 KIS와 같은 프로토콜로 재생 (오프라인 테스트용)
+#
+# 실행:
+#   python agent_kis_stream.py record ticks.jsonl 005930,000660   # KIS 실시간 체결가 기록
+#   python agent_kis_stream.py replay ticks.jsonl --port 8765     # 기록 재생 서버
+#   (STREAM_CONFIG["ws_url"] = "ws://127.0.0.1:8765" 로 두면 agent_main이 재생 서버에 붙는다)
+#
+# 프로토콜 요약:
+#   구독 요청  : {"header": {"approval_key", "custtype": "P", "tr_type": "1"(등록)|"2"(해제),
+#                "content-type": "utf-8"}, "body": {"input": {"tr_id": "H0STCNT0", "tr_key": 종목코드}}}
+#   실시간 데이터: "0|H0STCNT0|건수|필드^필드^..." (건수만큼 레코드가 이어 붙음, 첫 글자 1이면 암호화)
+#   제어 메시지 : JSON (구독 응답, PINGPONG → 그대로 pong 응답)
+
+import asyncio
+import json
+import threading
+import time
+from typing import IO
+
+try:
+    import aiohttp
+    from aiohttp import web
+except ImportError:
+    aiohttp = None  # type: ignore[assignment]
+    web = None  # type: ignore[assignment]
+
+
+WS_URLS = {
+    "real":  "ws://ops.koreainvestment.com:21000",
+    "paper": "ws://ops.koreainvestment.com:31000",
+}
+TR_EXECUTION = "H0STCNT0"  # 국내주식 실시간체결가
+MAX_SUBSCRIPTIONS = 41     # 세션당 실시간 등록 한도
+RECONNECT_SEC = 3.0
+
+# H0STCNT0 레코드 필드 위치 (전체 46개 중 사용하는 것만)
+_FIELDS = {
+    "code":        0,   # MKSC_SHRN_ISCD  유가증권 단축 종목코드
+    "time":        1,   # STCK_CNTG_HOUR  체결 시간 (HHMMSS)
+    "price":       2,   # STCK_PRPR       현재가
+    "change_rate": 5,   # PRDY_CTRT       전일 대비율
+    "open":        7,   # STCK_OPRC       시가
+    "high":        8,   # STCK_HGPR       고가
+    "low":         9,   # STCK_LWPR       저가
+    "volume":      13,  # ACML_VOL        누적 거래량
+}
+
+
+def _require_aiohttp():
+    if aiohttp is None:
+        raise ImportError("실시간 시세는 aiohttp가 필요합니다 (pip install aiohttp)")
+
+
+# =============================================================================
+# 메시지 변환
+# =============================================================================
+
+def parse_frame(data: str) -> list:
+    """
+    실시간 데이터 원문 → 체결가 dict 목록 (get_current_price와 같은 키 + "time")
+
+    암호화 프레임이나 H0STCNT0 이외의 TR은 빈 목록.
+    형식이 깨진 프레임(구분자·필드 누락, 숫자 아님)은 ValueError / IndexError.
+    """
+    encrypted, tr_id, count, payload = data.split("|", 3)
+    if encrypted != "0" or tr_id != TR_EXECUTION:
+        return []
+    fields = payload.split("^")
+    n = int(count)
+    if n <= 0:
+        raise ValueError(f"레코드 수 오류: {count}")
+    width = len(fields) // n
+    quotes = []
+    for i in range(n):
+        record = fields[i * width:(i + 1) * width]
+        quotes.append({
+            "code":        record[_FIELDS["code"]],
+            "time":        record[_FIELDS["time"]],
+            "price":       int(record[_FIELDS["price"]]),
+            "open":        int(record[_FIELDS["open"]]),
+            "high":        int(record[_FIELDS["high"]]),
+            "low":         int(record[_FIELDS["low"]]),
+            "volume":      int(record[_FIELDS["volume"]]),
+            "change_rate": float(record[_FIELDS["change_rate"]]),
+        })
+    return quotes
+
+
+def _frame_code(data: str) -> str:
+    """실시간 데이터 원문의 (첫 레코드) 종목코드"""
+    return data.split("|", 3)[3].split("^", 1)[0]
+
+
+def subscribe_message(approval_key: str, code: str, subscribe: bool = True) -> str:
+    """구독 등록/해제 요청 JSON"""
+    return json.dumps({
+        "header": {
+            "approval_key": approval_key,
+            "custtype":     "P",
+            "tr_type":      "1" if subscribe else "2",
+            "content-type": "utf-8",
+        },
+        "body": {"input": {"tr_id": TR_EXECUTION, "tr_key": code}},
+    })
+
+
+# =============================================================================
+# 최신 체결가 표
+# =============================================================================
+
+class PriceTable:
+    """
+    감시 종목(watchlist)의 최신 체결가 (스레드 안전)
+
+    수신 루프(백그라운드 스레드)가 update()로 쓰고, 메뉴 쪽(메인 스레드)이 get()으로 읽는다.
+    """
+
+    def __init__(self):
+        self._names = {}    # 감시 종목 {code: name} (종합 랭킹 순서)
+        self._quotes = {}   # code → (수신 시각, quote)
+        self._lock = threading.Lock()
+
+    def watch(self, names: dict):
+        """감시 종목 교체 ({종목코드: 종목명}, 순서 = 우선순위)"""
+        with self._lock:
+            self._names = dict(names)
+
+    @property
+    def watchlist(self) -> list:
+        with self._lock:
+            return list(self._names)
+
+    def update(self, quote: dict):
+        with self._lock:
+            self._quotes[quote["code"]] = (time.monotonic(), quote)
+
+    def get(self, code: str, max_age: float | None = None):
+        """최신 체결가 (없거나 max_age초보다 오래됐으면 None)"""
+        with self._lock:
+            hit = self._quotes.get(code)
+            name = self._names.get(code, "")
+        if hit is None or (max_age is not None and time.monotonic() - hit[0] > max_age):
+            return None
+        return {**hit[1], "name": name, "source": "stream"}
+
+    def __len__(self):
+        with self._lock:
+            return len(self._quotes)
+
+
+# =============================================================================
+# 구독 / 수신 루프
+# =============================================================================
+
+class KISStream:
+    """
+    실시간 체결가 구독기
+
+    사용 예시:
+        table = PriceTable()
+        table.watch({"005930": "삼성전자"})
+        stream = KISStream(WS_URLS["paper"], api.get_approval_key(), table)
+        stream.start()                  # 백그라운드 스레드에서 asyncio 루프 실행
+        api.attach_prices(table)        # 이후 get_current_price는 표를 먼저 읽음
+        ...
+        stream.set_watchlist({...})     # 감시 종목 변경 → 구독 등록/해제
+        stream.stop()
+    """
+
+    def __init__(self, url: str, approval_key: str, table: PriceTable,
+                 record_path: str | None = None, reconnect_sec: float = RECONNECT_SEC):
+        _require_aiohttp()
+        self.url = url
+        self.approval_key = approval_key
+        self.table = table
+        self.record_path = record_path
+        self.reconnect_sec = reconnect_sec
+
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._stopping = asyncio.Event()
+        self._changed = asyncio.Event()  # 감시 종목 변경
+        self._ws: aiohttp.ClientWebSocketResponse[bool] | None = None
+        self._record: IO[str] | None = None
+
+    # ------------------------------------------------------------------
+    # 백그라운드 실행 (메인 스레드에서 호출)
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """백그라운드 스레드에서 수신 루프 시작"""
+        if self._thread is not None:
+            return
+        ready = threading.Event()
+
+        def _run():
+            loop = self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            # Event는 처음 쓰는 루프에 묶이므로 start()마다 새로 만든다
+            self._stopping = asyncio.Event()
+            self._changed = asyncio.Event()
+            ready.set()
+            try:
+                loop.run_until_complete(self.run())
+            finally:
+                loop.close()
+
+        self._thread = threading.Thread(target=_run, name="kis-stream", daemon=True)
+        self._thread.start()
+        ready.wait()
+
+    def stop(self, timeout: float = 5.0):
+        """수신 루프 종료 (구독 해제 후 연결 닫음)"""
+        if self._thread is None:
+            return
+        # 루프 스레드가 이미 끝났으면 루프도 닫혀 있으므로 종료 요청 없이 정리만 한다
+        if self._thread.is_alive() and self._loop is not None and not self._loop.is_closed():
+            try:
+                asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop)
+            except RuntimeError:
+                pass  # 확인 직후 루프가 닫힘
+            else:
+                self._thread.join(timeout)
+        self._thread = None
+        self._loop = None
+
+    def set_watchlist(self, names: dict):
+        """감시 종목 교체 → 실행 중이면 구독 등록/해제"""
+        self.table.watch(names)
+        if self._loop is not None and self._thread is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._changed.set)
+
+    # ------------------------------------------------------------------
+    # asyncio 루프
+    # ------------------------------------------------------------------
+
+    async def run(self):
+        """연결 → 구독 → 수신, 끊기면 reconnect_sec 후 재접속 (stop()까지)"""
+        self._record = open(self.record_path, "a", encoding="utf-8") if self.record_path else None
+        try:
+            async with aiohttp.ClientSession() as session:
+                while not self._stopping.is_set():
+                    try:
+                        async with session.ws_connect(self.url) as ws:
+                            self._ws = ws
+                            print(f"  📡 실시간 체결가 연결: {self.url}")
+                            await self._consume(ws)
+                    except asyncio.CancelledError:
+                        raise
+                    except Exception as e:
+                        # 연결 실패뿐 아니라 수신 중 예상 못 한 오류도 끊김으로 보고 재접속
+                        print(f"  ⚠️ 실시간 체결가 연결 끊김: {type(e).__name__}: {e}")
+                    finally:
+                        self._ws = None
+                    if not self._stopping.is_set():
+                        try:
+                            await asyncio.wait_for(self._stopping.wait(), self.reconnect_sec)
+                        except asyncio.TimeoutError:
+                            pass
+        finally:
+            if self._record is not None:
+                self._record.close()
+
+    async def _shutdown(self):
+        self._stopping.set()
+        if self._ws is not None:
+            for code in self.table.watchlist[:MAX_SUBSCRIPTIONS]:
+                await self._ws.send_str(subscribe_message(self.approval_key, code, subscribe=False))
+            await self._ws.close()
+
+    async def _consume(self, ws):
+        self._changed.set()  # 새 연결마다 감시 종목 전체 등록
+        sync = asyncio.ensure_future(self._sync_subscriptions(ws))
+        try:
+            async for msg in ws:
+                if msg.type == aiohttp.WSMsgType.TEXT:
+                    await self._handle(ws, msg.data)
+                elif msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                    break
+        finally:
+            sync.cancel()
+
+    async def _sync_subscriptions(self, ws):
+        """감시 종목이 바뀔 때마다 차이만 등록/해제 (세션당 MAX_SUBSCRIPTIONS건)"""
+        subscribed: set[str] = set()
+        while True:
+            await self._changed.wait()
+            self._changed.clear()
+            wanted = set(self.table.watchlist[:MAX_SUBSCRIPTIONS])
+            for code in sorted(subscribed - wanted):
+                await ws.send_str(subscribe_message(self.approval_key, code, subscribe=False))
+            for code in sorted(wanted - subscribed):
+                await ws.send_str(subscribe_message(self.approval_key, code))
+            subscribed = wanted
+
+    async def _handle(self, ws, data: str):
+        """수신 메시지 1건 처리 (형식이 깨진 메시지는 경고 후 건너뜀)"""
+        if data[:1] in ("0", "1"):
+            try:
+                quotes = parse_frame(data)
+            except (ValueError, IndexError) as e:
+                print(f"  ⚠️ 실시간 체결가 프레임 건너뜀 ({e}): {data[:80]!r}")
+                return
+            for quote in quotes:
+                self.table.update(quote)
+            if self._record is not None:
+                self._record.write(json.dumps({"ts": time.time(), "data": data}) + "\n")
+            return
+
+        try:
+            msg = json.loads(data)
+        except ValueError as e:
+            print(f"  ⚠️ 실시간 메시지 건너뜀 ({e}): {data[:80]!r}")
+            return
+        if not isinstance(msg, dict):
+            return
+        header = msg.get("header", {})
+        if header.get("tr_id") == "PINGPONG":
+            await ws.pong(data.encode())
+            return
+        body = msg.get("body", {})
+        if body.get("rt_cd") not in (None, "0"):
+            print(f"  ⚠️ 실시간 구독 실패 [{header.get('tr_key', '')}]: {body.get('msg1', '')}")
+
+
+# =============================================================================
+# 리플레이 서버 (기록한 수신 원문 재생)
+# =============================================================================
+
+def load_ticks(path: str) -> list:
+    """record 결과 JSONL → [(수신 시각, 원문), ...] (시각 순)"""
+    ticks = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                d = json.loads(line)
+                ticks.append((float(d["ts"]), d["data"]))
+    return sorted(ticks, key=lambda t: t[0])
+
+
+def make_replay_app(ticks: list, speed: float = 1.0, repeat: bool = False):
+    """
+    KIS 실시간 서버 흉내 aiohttp 앱
+
+    - 구독 요청마다 KIS 형식의 성공 응답을 보내고, 구독한 종목의 틱만 보낸다
+    - speed: 재생 배속 (0이면 대기 없이 전부), repeat: 끝나면 처음부터 반복
+    - 첫 구독 요청을 받은 뒤부터 재생한다
+    """
+    _require_aiohttp()
+
+    async def handler(request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        subscribed = set()
+        feeder = None
+
+        async def feed():
+            if not ticks:
+                return  # 재생할 틱이 없으면 repeat여도 돌 필요가 없다
+            while True:
+                start = time.monotonic()
+                t0 = ticks[0][0]
+                for ts, data in ticks:
+                    if speed > 0:
+                        delay = (ts - t0) / speed - (time.monotonic() - start)
+                        if delay > 0:
+                            await asyncio.sleep(delay)
+                    if _frame_code(data) in subscribed:
+                        await ws.send_str(data)
+                if not repeat:
+                    return
+                await asyncio.sleep(0)
+
+        try:
+            async for msg in ws:
+                if msg.type != aiohttp.WSMsgType.TEXT:
+                    continue
+                req = json.loads(msg.data)
+                header, body_input = req["header"], req["body"]["input"]
+                code = body_input["tr_key"]
+                if header.get("tr_type") == "1":
+                    subscribed.add(code)
+                    msg1 = "SUBSCRIBE SUCCESS"
+                else:
+                    subscribed.discard(code)
+                    msg1 = "UNSUBSCRIBE SUCCESS"
+                await ws.send_str(json.dumps({
+                    "header": {"tr_id": body_input["tr_id"], "tr_key": code, "encrypt": "N"},
+                    "body": {"rt_cd": "0", "msg_cd": "OPSP0000", "msg1": msg1},
+                }))
+                if feeder is None:
+                    feeder = asyncio.ensure_future(feed())
+        finally:
+            if feeder is not None:
+                feeder.cancel()
+        return ws
+
+    app = web.Application()
+    app.router.add_get("/", handler)
+    return app
+
+
+def serve_replay(path: str, host: str = "127.0.0.1", port: int = 8765,
+                 speed: float = 1.0, repeat: bool = False):
+    """리플레이 서버 실행 (Ctrl+C로 종료)"""
+    ticks = load_ticks(path)
+    print(f"  ▶️ 리플레이 서버: ws://{host}:{port} ({len(ticks):,}틱, {speed}배속)")
+    web.run_app(make_replay_app(ticks, speed, repeat), host=host, port=port, print=None)
+
+
+# =============================================================================
+# 실행
+# =============================================================================
+
+def _record(path: str, codes: list, seconds: float | None = None):
+    """KIS 실시간 체결가를 path에 기록 (Ctrl+C 또는 seconds 경과 시 종료)"""
+    from agent_config import KIS_CONFIG, STREAM_CONFIG
+    from agent_kis_api import KISApi
+
+    api = KISApi(KIS_CONFIG)
+    url = STREAM_CONFIG.get("ws_url") or WS_URLS["paper" if api.is_paper else "real"]
+    table = PriceTable()
+    table.watch({code: "" for code in codes})
+    stream = KISStream(url, api.get_approval_key(), table, record_path=path)
+    stream.start()
+    print(f"  ⏺️ 기록 중: {', '.join(codes)} → {path}")
+    try:
+        time.sleep(seconds) if seconds else threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stream.stop()
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="KIS 실시간 체결가 기록 / 재생")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="KIS 실시간 체결가 기록 (JSONL)")
+    rec.add_argument("path")
+    rec.add_argument("codes", help="종목코드 (쉼표 구분)")
+    rec.add_argument("--seconds", type=float, default=None)
+
+    rep = sub.add_parser("replay", help="기록 재생 서버")
+    rep.add_argument("path")
+    rep.add_argument("--host", default="127.0.0.1")
+    rep.add_argument("--port", type=int, default=8765)
+    rep.add_argument("--speed", type=float, default=1.0, help="재생 배속 (0: 대기 없음)")
+    rep.add_argument("--repeat", action="store_true", help="끝나면 처음부터 반복")
+
+    args = parser.parse_args()
+    if args.command == "record":
+        _record(args.path, [c.strip().zfill(6) for c in args.codes.split(",")], args.seconds)
+    else:
+        serve_replay(args.path, args.host, args.port, args.speed, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -20,7 +20,7 @@ import pandas as pd
 # 로컬 모듈
 from agent_config import (
     KIS_CONFIG, DATA_CONFIG, STRATEGY_CONFIG,
-    COMPOSITE_WEIGHTS, TRADING_CONFIG, COMMON_FILTERS
+    COMPOSITE_WEIGHTS, TRADING_CONFIG, COMMON_FILTERS, STREAM_CONFIG
 )
 import agent_strategies as strats
 from fin_utils import save_styled_excel
@@ -73,7 +73,7 @@ def init_api(use_mock: bool = False):
 
     if use_mock:
         print("\n🔵 모의 API 모드로 실행합니다 (실제 주문 없음)")
-        return MockKISApi()
+        return MockKISApi(quote_ttl_sec=KIS_CONFIG.get("quote_ttl_sec", 2.0))
 
     if KIS_CONFIG["app_key"] == "YOUR_APP_KEY":
         print("\n⚠️  KIS API 키가 설정되지 않았습니다.")
@@ -88,6 +88,45 @@ def init_api(use_mock: bool = False):
     return api
 
 
+# =============================================================================
+# 실시간 체결가 구독 (STREAM_CONFIG)
+# =============================================================================
+
+def update_stream(api, stream, results):
+    """
+    종합 랭킹 상위 종목을 실시간 체결가 감시 종목으로 설정
+
+    처음 호출 시 구독을 시작하고 api에 체결가 표를 연결한다. 이후 현재가 표시·수량 계산은
+    REST 대신 표의 최신 체결가를 쓴다. 반환값은 다음 호출에 넘길 stream (미사용 시 None).
+    """
+    if api is None or not STREAM_CONFIG.get("enabled") or not results:
+        return stream
+    composite = results.get("composite")
+    if composite is None or composite.empty:
+        return stream
+
+    top = composite.head(STREAM_CONFIG.get("watchlist_size", 30))
+    names = dict(zip(top["종목코드"], top["종목명"]))
+
+    if stream is None:
+        from agent_kis_stream import WS_URLS, KISStream, PriceTable
+        url = STREAM_CONFIG.get("ws_url") or WS_URLS["paper" if getattr(api, "is_paper", True) else "real"]
+        try:
+            approval_key = api.get_approval_key()
+        except Exception as e:
+            print(f"  ⚠️ 실시간 접속키 발급 실패, REST 조회로 계속합니다: {e}")
+            return None
+        table = PriceTable()
+        table.watch(names)
+        stream = KISStream(url, approval_key, table, record_path=STREAM_CONFIG.get("record_path"))
+        stream.start()
+        api.attach_prices(table, STREAM_CONFIG.get("max_age_sec"))
+    else:
+        stream.set_watchlist(names)
+    print(f"  📡 실시간 체결가 구독: 종합 랭킹 상위 {len(names)}종목")
+    return stream
+
+
 # =============================================================================
 # 메뉴 1: 전략 분석 실행
 # =============================================================================
@@ -250,15 +289,17 @@ def review_and_order(results: dict, api) -> None:
     if budget_input.isdigit():
         invest_per = int(budget_input)
 
+    # 선택 종목 현재가는 초당 한도 내에서 한 번에 조회
+    selected_idx = [idx for idx in selected_idx if 1 <= idx <= len(top30)]
+    prices = api.get_prices_batch([top30.iloc[idx - 1]["종목코드"] for idx in selected_idx])
+
     orders = []
     for idx in selected_idx:
-        if idx < 1 or idx > len(top30):
-            continue
         row = top30.iloc[idx - 1]
         code = row["종목코드"]
         name = row["종목명"]
 
-        price_info = api.get_current_price(code)
+        price_info = prices[code]
         if "error" in price_info:
             print(f"  ❌ {code} 현재가 조회 실패: {price_info['error']}")
             continue
@@ -302,18 +343,13 @@ def review_and_order(results: dict, api) -> None:
         print("  주문 취소됨.")
         return
 
-    # 주문 실행
+    # 주문 실행 (초당 한도 내 동시 제출)
     section("주문 실행")
-    success_count = 0
-    for o in orders:
-        result = api.place_order(o["code"], "buy", o["qty"], o["price"], order_type)
-        if result["success"]:
-            print(f"  ✅ {o['name']} 매수 완료 (주문번호: {result['order_no']})")
-            success_count += 1
-        else:
-            print(f"  ❌ {o['name']} 주문 실패: {result.get('message', '')}")
-
-    print(f"\n  총 {success_count}/{len(orders)}개 종목 주문 완료")
+    from agent_orders import execute_orders, print_order_report
+    report = execute_orders(api, orders, "buy", order_type,
+                            max_workers=TRADING_CONFIG.get("order_workers"),
+                            max_retries=TRADING_CONFIG.get("order_max_retries", 2))
+    print_order_report(report, "buy")
 
 
 def _select_only_mode(composite: pd.DataFrame) -> None:
@@ -435,6 +471,7 @@ def main():
     api = init_api(use_mock=use_mock)
 
     results = None
+    stream = None
 
     while True:
         print(MENU)
@@ -442,9 +479,11 @@ def main():
 
         if choice == "1":
             results = run_analysis()
+            stream = update_stream(api, stream, results)
 
         elif choice == "2":
             results = load_recent_results()
+            stream = update_stream(api, stream, results)
 
         elif choice == "3":
             if results is None:
@@ -462,6 +501,8 @@ def main():
             show_price(api)
 
         elif choice == "0":
+            if stream is not None:
+                stream.stop()
             print("\n👋 Agent를 종료합니다. 수익나세요! 📈\n")
             break
 
@@ -0,0 +1,215 @@
+# agent_orders.py
+# 일괄 주문 실행기 — 여러 종목 주문을 초당 호출 한도 내에서 동시에 제출하고 결과를 집계
+#
+# 흐름:
+#   1. 제출 전 당일 주문번호 목록을 기록 (응답이 유실된 주문의 접수 여부 판별용)
+#   2. worker 스레드마다 place_order (호출 간격은 KISApi의 RateLimiter가 맞춤)
+#   3. 주문별 결과 분류
+#        접수 성공                 → accepted
+#        업무 거절 (rt_cd ≠ 0)      → rejected (잔고 부족, 호가 오류 등은 재시도하지 않음)
+#        연결 실패 (ConnectTimeout) → 요청이 나가지 않았으므로 그대로 재시도
+#        응답 유실 / HTTP 5xx        → 접수 여부 불명: 주문 내역에서 같은 주문을 찾아
+#                                     있으면 accepted, 없을 때만 재시도 (중복 주문 방지)
+#                                     (실패 응답 본문에 주문번호가 있으면 그 번호로만 찾음)
+#        재시도 소진                 → failed (접수되지 않았음을 확인한 경우)
+#        주문 내역 조회 실패          → unknown (중복 위험 때문에 재시도하지 않음, 수동 확인 필요)
+#   4. 주문 내역의 체결 수량과 합쳐 보고서 반환
+#
+# KISApi / MockKISApi 모두 사용 가능 (MockKISApi(lost_response_rate=...)로 응답 유실 재현)
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+ACCEPTED = "accepted"
+REJECTED = "rejected"
+FAILED   = "failed"
+UNKNOWN  = "unknown"
+STATE_LABELS = {ACCEPTED: "접수", REJECTED: "거절", FAILED: "실패", UNKNOWN: "확인 필요"}
+
+MAX_RETRIES = 2
+RETRY_BACKOFF_SEC = 0.5
+DEFAULT_WORKERS = 4  # api에 rate_limit이 없을 때 (MockKISApi)
+
+
+# =============================================================================
+# 주문번호 대조
+# =============================================================================
+
+class _OrderBook:
+    """
+    이미 누군가의 것으로 확인된 주문번호 집합
+
+    응답이 유실된 주문을 주문 내역에서 찾을 때, 배치 이전 주문이나
+    다른 worker가 이미 가져간 주문을 자기 것으로 잘못 잡지 않도록 한다.
+    """
+
+    def __init__(self, known=()):
+        self._claimed = set(known)
+        self._lock = threading.Lock()
+
+    def claim(self, order_no: str):
+        with self._lock:
+            self._claimed.add(order_no)
+
+    def find(self, history: list, order: dict, side_kr: str, order_no: str = ""):
+        """
+        주문 내역에서 order의 미배정 주문번호 → 배정 후 반환
+
+        order_no(실패 응답 본문에 실려 온 ODNO)가 있으면 그 번호만 찾고,
+        없으면 같은 (종목, 매매구분, 수량) 주문 중 첫 번째를 잡는다.
+        """
+        with self._lock:
+            for item in history:
+                candidate = item.get("order_no", "")
+                if not candidate or candidate in self._claimed:
+                    continue
+                if order_no:
+                    matched = candidate.lstrip("0") == order_no.lstrip("0")
+                else:
+                    matched = (item["code"] == order["code"] and item["side"] == side_kr
+                               and item["qty"] == order["qty"])
+                if matched:
+                    self._claimed.add(candidate)
+                    return candidate
+        return None
+
+
+def _is_server_error(result: dict) -> bool:
+    """place_order 실패 결과가 HTTP 5xx / 429 (접수 여부 불명)인지"""
+    error = str(result.get("error", ""))
+    return error.startswith("HTTP 5") or error == "HTTP 429"
+
+
+# =============================================================================
+# 주문 1건 (worker)
+# =============================================================================
+
+def _submit(api, order: dict, side: str, order_type: str, book: _OrderBook,
+            max_retries: int, retry_backoff: float) -> dict:
+    side_kr = "매수" if side == "buy" else "매도"
+    order.update(state=None, order_no="", message="", attempts=0)
+
+    while True:
+        order["attempts"] += 1
+        uncertain = False
+        try:
+            result = api.place_order(order["code"], side, order["qty"], order.get("price", 0), order_type)
+        except requests.ConnectTimeout as e:
+            result = {"success": False, "message": f"연결 실패: {e}"}
+        except requests.RequestException as e:
+            result = {"success": False, "message": f"응답 없음: {e}"}
+            uncertain = True
+        else:
+            if result.get("success"):
+                book.claim(result.get("order_no", ""))
+                order.update(state=ACCEPTED, order_no=result.get("order_no", ""),
+                             message=result.get("message", ""))
+                return order
+            if not _is_server_error(result):
+                order.update(state=REJECTED, message=result.get("message", ""))
+                return order
+            uncertain = True
+        order["message"] = result.get("message", "")
+
+        if uncertain:
+            # 접수됐는지 주문 내역으로 확인한 뒤에만 다시 보낸다
+            time.sleep(retry_backoff)
+            try:
+                history = api.get_order_history(filled_only=False, strict=True)
+            except Exception as e:
+                order.update(state=UNKNOWN, message=f"접수 여부 확인 실패: {e}")
+                return order
+            order_no = book.find(history, order, side_kr, result.get("order_no", ""))
+            if order_no:
+                order.update(state=ACCEPTED, order_no=order_no, message="응답 유실 — 주문 내역에서 접수 확인")
+                return order
+
+        if order["attempts"] > max_retries:
+            order["state"] = FAILED
+            return order
+        time.sleep(retry_backoff * order["attempts"])
+
+
+# =============================================================================
+# 일괄 실행
+# =============================================================================
+
+def execute_orders(api, orders: list, side: str = "buy", order_type: str = "00",
+                   max_workers: int | None = None, max_retries: int = MAX_RETRIES,
+                   retry_backoff: float = RETRY_BACKOFF_SEC) -> dict:
+    """
+    여러 주문을 동시에 제출 → 집계 보고서
+
+    Args:
+        api:         KISApi 또는 MockKISApi
+        orders:      [{"code", "name", "qty", "price"}, ...] (review_and_order 형식, 원본은 수정하지 않음)
+        side:        "buy" | "sell"
+        order_type:  "00" 지정가 | "01" 시장가
+        max_workers: 동시 제출 수 (None이면 api의 초당 호출 한도)
+        max_retries: 주문별 재시도 횟수 (접수되지 않았음이 확인된 경우만)
+
+    Returns:
+        {
+            "orders":      [주문 + state, order_no, message, attempts, filled_qty], (입력 순서)
+            "counts":      {state: 건수},
+            "amount":      접수 주문 금액 합계 (원),
+            "filled_qty":  체결 수량 합계,
+            "elapsed_sec": 소요 시간,
+        }
+    """
+    orders = [dict(o) for o in orders]
+    start = time.monotonic()
+
+    try:
+        known = [h["order_no"] for h in api.get_order_history(filled_only=False, strict=True)]
+    except Exception as e:
+        print(f"  ⚠️ 기존 주문 내역 조회 실패 ({e}) — 응답 유실 주문 확인이 부정확할 수 있습니다")
+        known = []
+    book = _OrderBook(known)
+
+    workers = max_workers or int(getattr(api, "rate_limit", DEFAULT_WORKERS))
+    workers = max(1, min(workers, len(orders)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(lambda o: _submit(api, o, side, order_type, book, max_retries, retry_backoff),
+                          orders))
+
+    # 체결 수량 (주문 내역 1회 조회)
+    try:
+        filled = {h["order_no"]: h.get("filled_qty", 0)
+                  for h in api.get_order_history(filled_only=False, strict=True)}
+    except Exception:
+        filled = {}
+    for o in orders:
+        o["filled_qty"] = filled.get(o["order_no"], 0) if o["state"] == ACCEPTED else 0
+
+    counts = {state: sum(o["state"] == state for o in orders) for state in STATE_LABELS}
+    return {
+        "orders":      orders,
+        "counts":      counts,
+        "amount":      sum(o["qty"] * o.get("price", 0) for o in orders if o["state"] == ACCEPTED),
+        "filled_qty":  sum(o["filled_qty"] for o in orders),
+        "elapsed_sec": round(time.monotonic() - start, 3),
+    }
+
+
+def print_order_report(report: dict, side: str = "buy") -> None:
+    """execute_orders 보고서 출력"""
+    side_kr = "매수" if side == "buy" else "매도"
+    icons = {ACCEPTED: "✅", REJECTED: "❌", FAILED: "❌", UNKNOWN: "⚠️"}
+    for o in report["orders"]:
+        label = o.get("name") or o["code"]
+        if o["state"] == ACCEPTED:
+            retry = f", {o['attempts']}회 시도" if o["attempts"] > 1 else ""
+            print(f"  {icons[ACCEPTED]} {label} {side_kr} 접수 (주문번호: {o['order_no']}, "
+                  f"체결 {o['filled_qty']}/{o['qty']}주{retry})")
+        else:
+            print(f"  {icons[o['state']]} {label} {STATE_LABELS[o['state']]}: {o['message']}")
+
+    counts = report["counts"]
+    print(f"\n  총 {counts[ACCEPTED]}/{len(report['orders'])}개 종목 주문 완료"
+          f" (접수 금액 {report['amount']:,}원, {report['elapsed_sec']:.1f}초)")
+    if counts[UNKNOWN]:
+        print(f"  ⚠️ {counts[UNKNOWN]}건은 접수 여부를 확인하지 못했습니다. 5번(체결 내역)에서 확인하세요.")
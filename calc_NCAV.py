@@ -9,6 +9,17 @@ import fnguideFinance as fnFI
 from fin_utils import save_styled_excel
 
 
+def collected_file_path(now=None):
+    """NCAV 수집 데이터 파일 경로 (fngCollect 통합 수집에서도 같은 경로로 저장)"""
+    now = now or datetime.datetime.now()
+    return "derived/ncav_{0}-{1:02d}-{2:02d}.xlsx".format(now.year, now.month, now.day)
+
+
+def build_record(code, finance):
+    """파싱된 Finance dict → NCAV 입력 행"""
+    return {**finance, 'code': code}
+
+
 def code_to_dict(code):
     """개별 종목의 NCAV 계산에 필요한 데이터 수집"""
     try:
@@ -18,8 +29,7 @@ def code_to_dict(code):
         # snapshot = fnSS.parseFnguideSnapshot(snapshotHtml)  # TODO: fngCollect 결과 DataFrame으로 대체 예정
         finance = fnFI.parseFnguideFinance(financeHtml)
 
-        result = {**finance, 'code': code}
-        return result
+        return build_record(code, finance)
     except Exception as e:
         print(f"Error processing {code}: {e}")
         return {'code': code}
@@ -106,7 +116,7 @@ def calculate_ncav(collected_df):
 def main():
     """NCAV 데이터 수집 및 계산 메인 함수"""
     now = datetime.datetime.now()
-    collectedFilePath = "derived/ncav_{0}-{1:02d}-{2:02d}.xlsx".format(now.year, now.month, now.day)
+    collectedFilePath = collected_file_path(now)
 
     # 데이터 수집
     if not os.path.exists(collectedFilePath):
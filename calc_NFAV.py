@@ -10,6 +10,17 @@ import fnguideFinanceRatio as fnFR
 from fin_utils import save_styled_excel
 
 
+def collected_file_path(now=None):
+    """NFAV 수집 데이터 파일 경로 (fngCollect 통합 수집에서도 같은 경로로 저장)"""
+    now = now or datetime.datetime.now()
+    return "derived/nfav_{0}-{1:02d}-{2:02d}.xlsx".format(now.year, now.month, now.day)
+
+
+def build_record(code, finance, fi_ratio):
+    """파싱된 Finance/FinanceRatio dict → NFAV 입력 행"""
+    return {**finance, **fi_ratio, 'code': code}
+
+
 def code_to_dict(code):
     """
     개별 종목의 NFAV 계산에 필요한 데이터 수집
@@ -29,8 +40,7 @@ def code_to_dict(code):
         finance = fnFI.parseFnguideFinance(financeHtml)
         fiRatio = fnFR.parseFnguideFiRatio(fiRatioHtml)
 
-        result = {**finance, **fiRatio, 'code': code}
-        return result
+        return build_record(code, finance, fiRatio)
     except Exception as e:
         print(f"Error processing {code}: {e}")
         return {'code': code}
@@ -142,7 +152,7 @@ def calculate_nfav(collected_df):
 def main():
     """NFAV 데이터 수집 및 계산 메인 함수"""
     now = datetime.datetime.now()
-    collectedFilePath = "derived/nfav_{0}-{1:02d}-{2:02d}.xlsx".format(now.year, now.month, now.day)
+    collectedFilePath = collected_file_path(now)
 
     # 데이터 수집
     if not os.path.exists(collectedFilePath):
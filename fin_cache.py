@@ -0,0 +1,555 @@
+"""
+FnGuide 페이지 캐시 저장소
+
+월 단위로 캐시 디렉토리를 통째로 지우고 다시 받는 대신, 항목별로
+받은 시각과 ETag/Last-Modified를 인덱스에 기록해 두고 페이지 종류별
+TTL이 지난 항목만 조건부 GET으로 재검증한다.
+
+캐시 키: '{namespace}/{filename}' (예: 'fnguide_finance/005930.html')
+  namespace = cache_prefix 끝의 '_' 제거 (예: 'fnguide_finance_' → 'fnguide_finance')
+
+구성:
+  CACHE_ROOT / CACHE_INDEX_PATH : 캐시 파일 / 인덱스(SQLite) 위치
+  CACHE_TTL                     : namespace별 TTL (초)
+  cache_key(cache_prefix, filename)  : 캐시 키 생성
+  ttl_for(key)                  : 키의 TTL (초)
+  CacheIndex                    : 항목별 fetched_at / etag / last_modified 인덱스 (SQLite)
+  FileBackend / SQLiteBackend   : 본문 저장 백엔드 (CACHE_BACKEND로 선택)
+  CacheManager                  : 본문/인덱스 메모리 색인 + 실행당 1회 housekeeping
+  prune_parse_cache()           : 오래된 파싱 결과 캐시(fin_utils.cached_parse) 삭제 (housekeeping에서 호출)
+  get_cache_manager()           : 프로세스 공용 CacheManager
+
+CLI:
+  python fin_cache.py verify | export <dir> | migrate <files|sqlite>
+"""
+import hashlib
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import time
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # zstandard 미설치 시 zlib로 압축
+    zstandard = None
+
+CACHE_ROOT = 'derived/fnguide_cache'
+CACHE_INDEX_PATH = f'{CACHE_ROOT}/index.sqlite'
+
+# 본문 저장 백엔드: 'sqlite' (압축, 파일 하나) 또는 'files' (페이지당 파일 하나)
+CACHE_BACKEND = 'sqlite'
+
+DAY = 24 * 60 * 60
+
+# namespace별 TTL — 지나면 조건부 GET으로 재검증 (304면 본문 재사용)
+CACHE_TTL = {
+    'fnguide_snapshot': 1 * DAY,         # 시세 연동 지표 포함
+    'fnguide_finance': 91 * DAY,         # 분기 재무제표
+    'fnguide_FinanceRatio': 91 * DAY,    # 분기 재무비율
+    'fnguide_InvestIdx': 30 * DAY,       # 기업가치 지표
+    'fnguide_MultiFactor': 1 * DAY,      # 멀티팩터 스타일 분석 JSON
+}
+DEFAULT_TTL = 30 * DAY
+
+# 파싱 결과 캐시 (fin_utils.cached_parse) — 저장한 지 PARSE_CACHE_MAX_AGE가 지난 pickle은
+# housekeeping에서 지운다. 지운 항목은 다음 실행에서 다시 파싱해 저장되므로, 파서 버전이
+# 바뀌어 더는 읽지 않는 디렉토리나 HTML이 바뀐 페이지의 옛 결과가 쌓이지 않는다.
+PARSE_CACHE_DIR = 'derived/parse_cache'
+PARSE_CACHE_MAX_AGE = 91 * DAY
+
+
+def cache_key(cache_prefix, filename):
+    """cache_prefix + 파일명 → 캐시 키"""
+    return f"{cache_prefix.rstrip('_')}/{filename}"
+
+
+def ttl_for(key):
+    """캐시 키의 namespace에 해당하는 TTL (초)"""
+    return CACHE_TTL.get(key.split('/', 1)[0], DEFAULT_TTL)
+
+
+def is_fresh(meta, ttl, now=None):
+    """인덱스 항목이 TTL 이내인지 여부"""
+    if meta is None:
+        return False
+    now = time.time() if now is None else now
+    return now - meta['fetched_at'] < ttl
+
+
+def _thread_connection(local, path, schema):
+    """
+    현재 스레드 전용 SQLite 커넥션 (없거나 fork 후면 새로 연결, WAL + 테이블 생성)
+
+    local: 객체별 threading.local() — 스레드마다 커넥션과 만든 pid를 보관
+    """
+    conn = getattr(local, 'conn', None)
+    if conn is None or local.pid != os.getpid():
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        conn = sqlite3.connect(path, timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(schema)
+        local.conn = conn
+        local.pid = os.getpid()
+    return conn
+
+
+# ── 인덱스 ────────────────────────────────────────────────────────────────────
+
+class CacheIndex:
+    """
+    캐시 항목 메타데이터 인덱스 (SQLite)
+
+    multiprocessing worker가 동시에 갱신하므로 WAL 모드 + busy timeout을 사용한다.
+    sqlite3 커넥션은 만든 스레드에서만 쓸 수 있으므로 스레드마다 따로 연결하고
+    (예: 파이프라인 모드의 다운로드 스레드), fork 후에도 pid가 바뀌면 다시 연결한다.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or CACHE_INDEX_PATH
+        self._local = threading.local()
+
+    def _connection(self):
+        return _thread_connection(
+            self._local, self.path,
+            'CREATE TABLE IF NOT EXISTS entries ('
+            ' key TEXT PRIMARY KEY, fetched_at REAL NOT NULL,'
+            ' etag TEXT, last_modified TEXT)'
+        )
+
+    def get(self, key):
+        """항목 메타데이터 dict (fetched_at, etag, last_modified) 또는 None"""
+        row = self._connection().execute(
+            'SELECT fetched_at, etag, last_modified FROM entries WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {'fetched_at': row[0], 'etag': row[1], 'last_modified': row[2]}
+
+    def load_all(self):
+        """전체 항목 → {key: 메타데이터 dict} (CacheManager 초기 적재용)"""
+        rows = self._connection().execute('SELECT key, fetched_at, etag, last_modified FROM entries')
+        return {key: {'fetched_at': f, 'etag': e, 'last_modified': lm} for key, f, e, lm in rows}
+
+    def put(self, key, etag=None, last_modified=None, fetched_at=None):
+        """항목 메타데이터 기록 (fetched_at 생략 시 현재 시각)"""
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO entries (key, fetched_at, etag, last_modified) VALUES (?, ?, ?, ?)',
+                (key, time.time() if fetched_at is None else fetched_at, etag, last_modified),
+            )
+
+    def touch(self, key):
+        """304 Not Modified 응답 후 fetched_at만 갱신"""
+        conn = self._connection()
+        with conn:
+            conn.execute('UPDATE entries SET fetched_at = ? WHERE key = ?', (time.time(), key))
+
+    def expire(self, keys):
+        """TTL과 무관하게 다음 조회에서 재검증하도록 fetched_at을 0으로 (ETag/Last-Modified는 유지)"""
+        conn = self._connection()
+        with conn:
+            conn.executemany('UPDATE entries SET fetched_at = 0 WHERE key = ?', [(key,) for key in keys])
+
+
+def conditional_headers(meta):
+    """인덱스 항목 → 조건부 GET 헤더 (If-None-Match / If-Modified-Since)"""
+    headers = {}
+    if meta:
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+    return headers
+
+
+# ── 본문 저장 백엔드 ───────────────────────────────────────────────────────────
+# 공통 인터페이스: keys() / has(key) / read(key) / read_many(keys) / write(key, text)
+#                 verify() / export(dest_dir) / cleanup()
+
+class FileBackend:
+    """페이지당 파일 하나 ({root}/{key}) — 기존 캐시 형식"""
+
+    name = 'files'
+
+    def __init__(self, root):
+        self.root = root
+        self._dirs = set()
+
+    def path(self, key):
+        return os.path.join(self.root, key)
+
+    def keys(self):
+        keys: set[str] = set()
+        for dirpath, _, filenames in os.walk(self.root):
+            rel = os.path.relpath(dirpath, self.root)
+            if rel == '.':
+                continue
+            self._dirs.add(dirpath)
+            ns = rel.replace(os.sep, '/')
+            keys.update(f'{ns}/{name}' for name in filenames if not name.endswith('.tmp'))
+        return keys
+
+    def has(self, key):
+        return os.path.exists(self.path(key))
+
+    def read(self, key):
+        try:
+            with open(self.path(key), encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def read_many(self, keys):
+        result = {}
+        for key in keys:
+            text = self.read(key)
+            if text is not None:
+                result[key] = text
+        return result
+
+    def write(self, key, text):
+        # 임시 파일 후 교체 (동시에 읽는 worker가 반쯤 쓴 파일을 보지 않도록)
+        path = self.path(key)
+        dirpath = os.path.dirname(path)
+        if dirpath not in self._dirs:
+            os.makedirs(dirpath, exist_ok=True)
+            self._dirs.add(dirpath)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+    def verify(self):
+        """UTF-8로 읽을 수 없는 항목의 키 목록"""
+        bad = []
+        for key in sorted(self.keys()):
+            try:
+                self.read(key)
+            except (OSError, UnicodeDecodeError):
+                bad.append(key)
+        return bad
+
+    def export(self, dest_dir):
+        return _export(self, dest_dir)
+
+    def cleanup(self):
+        """쓰다 남은 임시 파일(*.tmp) 삭제"""
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if name.endswith('.tmp'):
+                    os.remove(os.path.join(dirpath, name))
+
+
+class SQLiteBackend:
+    """
+    전체 페이지를 압축하여 SQLite 파일 하나에 저장
+
+    - 압축: zstandard가 설치되어 있으면 zstd, 없으면 zlib (행마다 codec 기록)
+    - 무결성: 원문 SHA-256을 함께 저장하여 verify()에서 대조
+    """
+
+    name = 'sqlite'
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    def _connection(self):
+        return _thread_connection(
+            self._local, self.path,
+            'CREATE TABLE IF NOT EXISTS pages ('
+            ' key TEXT PRIMARY KEY, codec TEXT NOT NULL, sha256 TEXT NOT NULL,'
+            ' size INTEGER NOT NULL, body BLOB NOT NULL)'
+        )
+
+    def keys(self):
+        return {row[0] for row in self._connection().execute('SELECT key FROM pages')}
+
+    def has(self, key):
+        return self._connection().execute('SELECT 1 FROM pages WHERE key = ?', (key,)).fetchone() is not None
+
+    def read(self, key):
+        row = self._connection().execute('SELECT codec, body FROM pages WHERE key = ?', (key,)).fetchone()
+        return None if row is None else _decompress(row[0], row[1]).decode('utf-8')
+
+    def read_many(self, keys, chunk_size=500):
+        """여러 키를 SELECT ... IN 묶음으로 한 번에 읽기 → {key: text}"""
+        keys = list(keys)
+        result = {}
+        conn = self._connection()
+        for i in range(0, len(keys), chunk_size):
+            chunk = keys[i:i + chunk_size]
+            placeholders = ','.join('?' * len(chunk))
+            for key, codec, body in conn.execute(
+                f'SELECT key, codec, body FROM pages WHERE key IN ({placeholders})', chunk
+            ):
+                result[key] = _decompress(codec, body).decode('utf-8')
+        return result
+
+    def write(self, key, text):
+        raw = text.encode('utf-8')
+        codec, body = _compress(raw)
+        conn = self._connection()
+        with conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO pages (key, codec, sha256, size, body) VALUES (?, ?, ?, ?, ?)',
+                (key, codec, hashlib.sha256(raw).hexdigest(), len(raw), body),
+            )
+
+    def verify(self):
+        """압축 해제 실패 또는 SHA-256 불일치 항목의 키 목록"""
+        bad = []
+        for key, codec, sha256, size, body in self._connection().execute(
+            'SELECT key, codec, sha256, size, body FROM pages ORDER BY key'
+        ):
+            try:
+                raw = _decompress(codec, body)
+            except Exception:
+                bad.append(key)
+                continue
+            if len(raw) != size or hashlib.sha256(raw).hexdigest() != sha256:
+                bad.append(key)
+        return bad
+
+    def export(self, dest_dir):
+        return _export(self, dest_dir)
+
+    def cleanup(self):
+        pass
+
+
+def _compress(raw):
+    if zstandard is not None:
+        return 'zstd', zstandard.ZstdCompressor(level=9).compress(raw)
+    return 'zlib', zlib.compress(raw, 6)
+
+
+def _decompress(codec, body):
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError('zstd로 압축된 캐시를 읽으려면 zstandard 패키지가 필요합니다.')
+        return zstandard.ZstdDecompressor().decompress(body)
+    if codec == 'zlib':
+        return zlib.decompress(body)
+    raise ValueError(f"Unknown codec: {codec}")
+
+
+def _export(backend, dest_dir):
+    """백엔드 전체 항목을 {dest_dir}/{key} 파일로 내보내기 → 내보낸 항목 수"""
+    target = FileBackend(dest_dir)
+    keys = sorted(backend.keys())
+    for i in range(0, len(keys), 500):
+        for key, text in backend.read_many(keys[i:i + 500]).items():
+            target.write(key, text)
+    return len(keys)
+
+
+def make_backend(name=None, root=None):
+    """백엔드 이름('files' / 'sqlite') → 백엔드 객체"""
+    name = name or CACHE_BACKEND
+    root = root or CACHE_ROOT
+    if name == 'files':
+        return FileBackend(root)
+    if name == 'sqlite':
+        return SQLiteBackend(os.path.join(root, 'pages.sqlite'))
+    raise ValueError(f"Unknown cache backend: {name}")
+
+
+# ── 캐시 관리자 ───────────────────────────────────────────────────────────────
+
+_LEGACY_DIR_RE = re.compile(r'^fnguide_\w+_\d{4}-\d{2}$')
+
+
+class CacheManager:
+    """
+    캐시 본문(백엔드) + 인덱스를 메모리 색인으로 관리
+
+    프로세스에서 처음 쓸 때 인덱스 전체와 캐시 키 목록을 한 번에 읽어 두고,
+    이후 페이지별 조회(has/meta/is_fresh)는 dict 조회로 처리한다.
+    다른 프로세스(예: 파이프라인 모드의 다운로드 스레드)가 나중에 쓴 항목은
+    메모리 색인에 없으므로, 색인 miss일 때만 백엔드/인덱스를 한 번 확인해 보충한다.
+
+    사용 예시:
+        cache = get_cache_manager()
+        if cache.is_fresh(key):
+            text = cache.read(key)
+    """
+
+    def __init__(self, root=None, index=None, backend=None):
+        self.root = root or CACHE_ROOT
+        self.index = index or CacheIndex(os.path.join(self.root, 'index.sqlite'))
+        self.backend = backend or make_backend(root=self.root)
+        self._meta: dict[str, dict] | None = None
+        self._present: set[str] | None = None
+
+    def _load(self) -> tuple[dict[str, dict], set[str]]:
+        """메모리 색인 (인덱스 항목, 캐시 키 집합) — 처음 호출 때 한 번 읽음"""
+        if self._meta is None or self._present is None:
+            os.makedirs(self.root, exist_ok=True)
+            self._meta = self.index.load_all()
+            self._present = self.backend.keys()
+        return self._meta, self._present
+
+    def housekeeping(self, derived_dir='derived'):
+        """
+        실행 시작 시 한 번 호출하는 캐시 정리
+
+        - 예전 월별 캐시 디렉토리(derived/fnguide_*_YYYY-MM) 삭제
+        - 백엔드 정리 (파일 백엔드: 쓰다 남은 임시 파일 삭제)
+        - 오래된 파싱 결과 캐시 삭제 (prune_parse_cache)
+
+        Returns:
+            int: 삭제한 월별 디렉토리 수
+        """
+        removed = 0
+        if os.path.isdir(derived_dir):
+            for entry in os.listdir(derived_dir):
+                if _LEGACY_DIR_RE.match(entry):
+                    shutil.rmtree(os.path.join(derived_dir, entry), ignore_errors=True)
+                    removed += 1
+        self.backend.cleanup()
+        prune_parse_cache()
+        self._present = None
+        self._load()
+        return removed
+
+    def has(self, key):
+        """캐시 본문 존재 여부"""
+        _, present = self._load()
+        if key in present:
+            return True
+        if self.backend.has(key):
+            present.add(key)
+            return True
+        return False
+
+    def meta(self, key):
+        """인덱스 항목 (fetched_at, etag, last_modified) 또는 None"""
+        metas, _ = self._load()
+        meta = metas.get(key)
+        if meta is None:
+            meta = self.index.get(key)
+            if meta is not None:
+                metas[key] = meta
+        return meta
+
+    def is_fresh(self, key, ttl=None):
+        """캐시 본문이 있고 TTL 이내인지 여부 (ttl 생략 시 ttl_for(key))"""
+        return self.has(key) and is_fresh(self.meta(key), ttl_for(key) if ttl is None else ttl)
+
+    def read(self, key):
+        """캐시 본문 읽기 (없으면 None)"""
+        if not self.has(key):
+            return None
+        return self.backend.read(key)
+
+    def read_many(self, keys):
+        """여러 캐시 본문 한 번에 읽기 → {key: text} (없는 키는 제외)"""
+        return self.backend.read_many(keys)
+
+    def write(self, key, text, etag=None, last_modified=None):
+        """캐시 본문 쓰기 + 인덱스 기록"""
+        metas, present = self._load()
+        self.backend.write(key, text)
+        present.add(key)
+        self.index.put(key, etag=etag, last_modified=last_modified)
+        metas[key] = {'fetched_at': time.time(), 'etag': etag, 'last_modified': last_modified}
+
+    def touch(self, key):
+        """304 Not Modified 후 fetched_at 갱신"""
+        metas, _ = self._load()
+        self.index.touch(key)
+        if key in metas:
+            metas[key] = {**metas[key], 'fetched_at': time.time()}
+
+    def expire(self, keys):
+        """지정 항목을 만료 처리 (다음 조회 때 조건부 GET으로 재검증) → 만료한 항목 수"""
+        metas, _ = self._load()
+        keys = [key for key in keys if self.meta(key) is not None]
+        self.index.expire(keys)
+        for key in keys:
+            metas[key] = {**metas[key], 'fetched_at': 0}
+        return len(keys)
+
+    def migrate_from(self, source):
+        """다른 백엔드의 전체 항목을 현재 백엔드로 복사 (인덱스는 공유) → 복사한 항목 수"""
+        _, present = self._load()
+        keys = sorted(source.keys())
+        for i in range(0, len(keys), 500):
+            for key, text in source.read_many(keys[i:i + 500]).items():
+                self.backend.write(key, text)
+                present.add(key)
+        return len(keys)
+
+
+def prune_parse_cache(root=None, max_age=PARSE_CACHE_MAX_AGE, now=None):
+    """
+    저장한 지 max_age(초)가 지난 파싱 결과 pickle과 빈 디렉토리 삭제 → 삭제한 파일 수
+
+    쓰다 남은 임시 파일(*.tmp)도 같은 기준으로 지운다.
+    """
+    root = root or PARSE_CACHE_DIR
+    if not os.path.isdir(root):
+        return 0
+    cutoff = (time.time() if now is None else now) - max_age
+    removed = 0
+    for dirpath, _, filenames in os.walk(root, topdown=False):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                pass  # 다른 프로세스가 이미 지움
+        if dirpath != root:
+            try:
+                os.rmdir(dirpath)
+            except OSError:
+                pass  # 비어 있지 않음
+    return removed
+
+
+_manager = None
+_manager_pid = None
+
+
+def get_cache_manager():
+    """프로세스 공용 CacheManager 반환 (fork 후에는 새로 만들어 색인을 다시 읽음)"""
+    global _manager, _manager_pid
+    if _manager is None or _manager_pid != os.getpid():
+        _manager = CacheManager()
+        _manager_pid = os.getpid()
+    return _manager
+
+
+# ── CLI ────────────────────────────────────────────────────
+
+if __name__ == '__main__':
+    import sys
+
+    # python fin_cache.py verify               -> 현재 백엔드 무결성 검사
+    # python fin_cache.py export <dir>         -> 현재 백엔드 전체를 파일로 내보내기
+    # python fin_cache.py migrate files        -> 파일 캐시를 현재 백엔드로 옮기기
+
+    args = sys.argv[1:]
+    manager = get_cache_manager()
+
+    if args[:1] == ['verify']:
+        bad = manager.backend.verify()
+        print(f"[{manager.backend.name}] 손상 항목: {len(bad)}개")
+        for key in bad:
+            print(f"  {key}")
+    elif args[:1] == ['export'] and len(args) == 2:
+        count = manager.backend.export(args[1])
+        print(f"[{manager.backend.name}] {count}개 항목 내보내기 완료: {args[1]}")
+    elif args[:1] == ['migrate'] and len(args) == 2:
+        count = manager.migrate_from(make_backend(args[1]))
+        print(f"{args[1]} → {manager.backend.name}: {count}개 항목 복사 완료")
+    else:
+        print("사용법: python fin_cache.py verify | export <dir> | migrate <files|sqlite>")
+        sys.exit(1)
@@ -0,0 +1,320 @@
+"""
+FnGuide 산출물 컬럼명 분류
+
+컬럼명을 한 번만 파싱해 (기간 타입, 연도, 분기, 지표)로 나누고,
+지표 순서 정렬 / 업종 지표 추출 / 최근 연도 컬럼 탐색을 dict 조회로 처리한다.
+
+컬럼명 형식:
+  '2023(연간)_매출액'   → 연간  (PERIOD_ANNUAL,  2023, 0, '매출액')
+  '2024/1Q_매출액'      → 분기  (PERIOD_QUARTER, 2024, 1, '매출액')
+  '2023_영업이익률(%)'  → 기타  (PERIOD_OTHER,   2023, 0, '영업이익률(%)')
+  '발행주식수(천주)'    → 기타  (PERIOD_OTHER,   None, 0, '발행주식수(천주)')
+
+구성:
+  parse_column(col)                  : ColumnInfo (캐싱)
+  column_sort_key(col)               : 지표 내 정렬 키 (연간 → 분기 → 기타)
+  group_by_indicator(cols, indicators): 지표 순서별 컬럼 묶음 + 미매칭 컬럼
+  year_suffix_index(cols)            : {suffix: '{YYYY}{suffix}' 컬럼 연도 내림차순} (프레임당 1회)
+  recent_year_columns(cols, suffix, n): '{YYYY}{suffix}' 컬럼을 연도 내림차순으로 n개
+
+Long(tidy) 테이블:
+  LONG_COLUMNS = [종목코드, source, metric, period_type, period_end, value]
+  종목코드/source/metric/period_type은 category, period_end는 datetime64, value는 float64.
+  period_type:
+    'annual'     '2024(연간)_매출액'   → period_end = 2024-{결산월} 말일
+    'cumulative' '2025(누적)_ROE'      → period_end = 2025-{결산월} 말일
+    'quarter'    '2024/4Q_당기순이익'  → period_end = 2024-12-31
+    'fiscal'     '2023_PER(배)'        → period_end = 2023-{결산월} 말일
+    'none'       '발행주식수(천주)'    → period_end = NaT
+  to_long(df, source)   : wide DataFrame → long 테이블
+  pivot_wide(long, ...) : long 테이블 → wide DataFrame (원래 컬럼명으로 복원)
+"""
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+PERIOD_ANNUAL = 0
+PERIOD_QUARTER = 1
+PERIOD_OTHER = 2
+
+ColumnInfo = namedtuple('ColumnInfo', ['period_type', 'year', 'quarter', 'indicator'])
+
+_ANNUAL_RE = re.compile(r'^(\d{4})\(연간\)')
+_QUARTER_RE = re.compile(r'^(\d{4})/(\d)Q')
+_YEAR_RE = re.compile(r'^(\d{4})')
+
+
+@lru_cache(maxsize=None)
+def parse_column(col):
+    """컬럼명 → ColumnInfo(period_type, year, quarter, indicator)"""
+    m = _ANNUAL_RE.match(col)
+    if m:
+        return ColumnInfo(PERIOD_ANNUAL, int(m.group(1)), 0, col[m.end():].lstrip('_'))
+    m = _QUARTER_RE.match(col)
+    if m:
+        return ColumnInfo(PERIOD_QUARTER, int(m.group(1)), int(m.group(2)), col[m.end():].lstrip('_'))
+    m = _YEAR_RE.match(col)
+    if m:
+        return ColumnInfo(PERIOD_OTHER, int(m.group(1)), 0, col[m.end():].lstrip('_'))
+    return ColumnInfo(PERIOD_OTHER, None, 0, col)
+
+
+def column_sort_key(col):
+    """컬럼 정렬 키: 연간 데이터가 분기 데이터보다 먼저 오도록 정렬
+
+    예: 2023(연간)_매출액 → (0, 2023, 0, ...)   ← 연간 타입=0 으로 분기보다 항상 앞
+        2024/1Q_매출액    → (1, 2024, 1, ...)   ← 분기 타입=1
+        2025(연간)_매출액 → (0, 2025, 0, ...)   ← 연도가 커도 연간은 분기보다 앞
+    """
+    info = parse_column(col)
+    if info.period_type == PERIOD_OTHER:
+        return (PERIOD_OTHER, 0, 0, col)
+    return (info.period_type, info.year, info.quarter, col)
+
+
+def _indicator_candidates(col, lengths):
+    """col이 속할 수 있는 지표 후보 문자열
+
+    매칭 규칙 (기존 지표 매칭과 동일):
+      - 정확히 일치: '발행주식수(천주)'
+      - {indicator}_{suffix}: 'EPS_y-3'           → '_' 앞부분
+      - ..._{indicator}...  : '2023_영업이익률(%)' → '_' 뒤에서 시작하는 지표 길이만큼의 접두
+    """
+    yield col
+    start = col.find('_')
+    while start != -1:
+        yield col[:start]
+        rest = col[start + 1:]
+        for n in lengths:
+            if n > len(rest):
+                break
+            yield rest[:n]
+        start = col.find('_', start + 1)
+
+
+def group_by_indicator(columns, indicators):
+    """
+    컬럼을 지표 순서대로 묶기 (한 컬럼은 먼저 나오는 지표 하나에만 속함)
+
+    Returns:
+        (groups, unmatched)
+        groups   : indicators와 같은 길이의 리스트, 각 원소는 column_sort_key로 정렬된 컬럼 목록
+        unmatched: 어떤 지표에도 속하지 않은 컬럼 (입력 순서 유지)
+    """
+    rank: dict[str, int] = {}
+    for i, indicator in enumerate(indicators):
+        rank.setdefault(indicator, i)
+    lengths = sorted({len(ind) for ind in rank if ind})
+
+    groups: list[list[str]] = [[] for _ in indicators]
+    unmatched = []
+    for col in columns:
+        best = min((rank[c] for c in _indicator_candidates(col, lengths) if c in rank), default=None)
+        if best is None:
+            unmatched.append(col)
+        else:
+            groups[best].append(col)
+
+    for group in groups:
+        group.sort(key=column_sort_key)
+    return groups, unmatched
+
+
+def year_suffix_index(columns) -> dict[str, list[str]]:
+    """
+    '{YYYY}{suffix}' 컬럼 색인 → {suffix: [col, ...] 연도 내림차순}
+
+    프레임당 한 번 만들어 recent_year_columns에 넘기면 suffix마다 컬럼을 다시 훑지 않는다.
+    """
+    index: dict[str, list[tuple[int, str]]] = {}
+    for col in columns:
+        info = parse_column(col)
+        if info.year is not None:
+            index.setdefault(col[4:], []).append((info.year, col))
+    return {suffix: [col for _, col in sorted(items, reverse=True)] for suffix, items in index.items()}
+
+
+def recent_year_columns(columns, suffix, n=3) -> list[str]:
+    """
+    컬럼명이 '{YYYY}{suffix}' 패턴인 것을 연도 내림차순으로 최대 n개 반환
+
+    columns: 컬럼 목록 또는 year_suffix_index 결과
+    """
+    index = columns if isinstance(columns, dict) else year_suffix_index(columns)
+    return index.get(suffix, [])[:n]
+
+
+# ── Long(tidy) 테이블 ────────────────────────────────────────
+
+LONG_COLUMNS = ['종목코드', 'source', 'metric', 'period_type', 'period_end', 'value']
+PERIOD_TYPES = ['annual', 'cumulative', 'quarter', 'fiscal', 'none']
+_ID_COLS = ['종목코드', '종목명', '업종', '주요제품', '마켓분야', 'FICS분야', '결산월']
+
+
+@lru_cache(maxsize=None)
+def split_period(col):
+    """컬럼명 → (period_type, year, quarter, metric)  (column_name의 역함수)"""
+    info = parse_column(col)
+    if info.period_type == PERIOD_ANNUAL:
+        return 'annual', info.year, 0, info.indicator
+    if info.period_type == PERIOD_QUARTER:
+        return 'quarter', info.year, info.quarter, info.indicator
+    if info.year is not None:
+        rest = col[4:]
+        if rest.startswith('(누적)_'):
+            return 'cumulative', info.year, 0, rest[len('(누적)_'):]
+        if rest.startswith('_'):
+            return 'fiscal', info.year, 0, rest[1:]
+    return 'none', None, 0, col
+
+
+def column_name(period_type, year, quarter, metric):
+    """(period_type, year, quarter, metric) → wide 컬럼명"""
+    if period_type == 'annual':
+        return f'{year}(연간)_{metric}'
+    if period_type == 'cumulative':
+        return f'{year}(누적)_{metric}'
+    if period_type == 'quarter':
+        return f'{year}/{quarter}Q_{metric}'
+    if period_type == 'fiscal':
+        return f'{year}_{metric}'
+    return metric
+
+
+def _numeric_columns(df):
+    """지표 컬럼 중 값이 모두 숫자인 컬럼 → {컬럼: float64 ndarray}"""
+    values = {}
+    for col in df.columns:
+        if col in _ID_COLS:
+            continue
+        s = df[col]
+        if pd.api.types.is_bool_dtype(s):
+            continue
+        numeric = pd.to_numeric(s, errors='coerce')
+        if numeric.notna().sum() == s.notna().sum():
+            values[col] = numeric.to_numpy(dtype='float64', na_value=np.nan)
+    return values
+
+
+def _period_end(years, months):
+    """연도/월 배열 → 해당 월 말일 (datetime64), 연도 없으면 NaT"""
+    valid = ~np.isnan(years)
+    out = np.full(len(years), np.datetime64('NaT'), dtype='datetime64[ns]')
+    if valid.any():
+        start = pd.to_datetime({'year': years[valid].astype(int), 'month': months[valid].astype(int), 'day': 1})
+        out[valid] = (start + pd.offsets.MonthEnd(0)).to_numpy()
+    return out
+
+
+def to_long(df, source):
+    """
+    wide DataFrame (fngCollect 모듈 산출물) → long 테이블
+
+    값이 숫자인 지표 컬럼만 포함하고 빈 값(NaN)은 행을 만들지 않는다.
+    연간/누적/연도 컬럼의 period_end는 행의 결산월(없으면 12월) 말일이다.
+
+    Returns:
+        DataFrame[LONG_COLUMNS]
+    """
+    values = _numeric_columns(df)
+    cols = list(values)
+    n_rows, n_cols = len(df), len(cols)
+    if not n_rows or not n_cols:
+        return _empty_long()
+
+    parsed = [split_period(c) for c in cols]
+    col_type = np.array([PERIOD_TYPES.index(p[0]) for p in parsed])
+    col_year = np.array([np.nan if p[1] is None else p[1] for p in parsed], dtype='float64')
+    col_quarter = np.array([p[2] for p in parsed])
+    metric_codes: dict[str, int] = {}
+    col_metric = np.array([metric_codes.setdefault(p[3], len(metric_codes)) for p in parsed])
+    metrics = list(metric_codes)
+
+    matrix = np.column_stack([values[c] for c in cols])       # (종목, 컬럼)
+    row_idx, col_idx = np.nonzero(~np.isnan(matrix))
+
+    if '결산월' in df.columns:
+        fiscal = pd.to_numeric(df['결산월'], errors='coerce').fillna(12).to_numpy(dtype='float64')
+    else:
+        fiscal = np.full(n_rows, 12.0)
+    months = np.where(col_type[col_idx] == PERIOD_TYPES.index('quarter'),
+                      col_quarter[col_idx] * 3, fiscal[row_idx])
+
+    codes = df['종목코드'].astype(str).str.zfill(6).to_numpy()
+    return pd.DataFrame({
+        '종목코드': pd.Categorical(codes[row_idx]),
+        'source': pd.Categorical([source] * len(row_idx)),
+        'metric': pd.Categorical.from_codes(col_metric[col_idx], metrics),
+        'period_type': pd.Categorical.from_codes(col_type[col_idx], PERIOD_TYPES),
+        'period_end': _period_end(col_year[col_idx], months),
+        'value': matrix[row_idx, col_idx],
+    })
+
+
+def _empty_long():
+    return pd.DataFrame({
+        '종목코드': pd.Categorical([]),
+        'source': pd.Categorical([]),
+        'metric': pd.Categorical([]),
+        'period_type': pd.Categorical([], categories=PERIOD_TYPES),
+        'period_end': pd.Series([], dtype='datetime64[ns]'),
+        'value': pd.Series([], dtype='float64'),
+    })
+
+
+def concat_long(frames):
+    """여러 long 테이블 합치기 (category 범주 합집합 유지)"""
+    frames = [f for f in frames if f is not None and len(f)]
+    if not frames:
+        return _empty_long()
+    out = pd.concat([f.astype({c: 'object' for c in ('종목코드', 'source', 'metric')}) for f in frames],
+                    ignore_index=True)
+    for c in ('종목코드', 'source', 'metric'):
+        out[c] = out[c].astype('category')
+    out['period_type'] = pd.Categorical(out['period_type'], categories=PERIOD_TYPES)
+    return out
+
+
+def pivot_wide(long, source=None, metrics=None, period_types=None):
+    """
+    long 테이블 → wide DataFrame (index=종목코드, 컬럼명은 원래 wide 컬럼명)
+
+    Args:
+        source      : 모듈명 또는 목록 (None이면 전체, 같은 컬럼은 먼저 나온 값 사용)
+        metrics     : 지표명 목록 (None이면 전체)
+        period_types: period_type 목록 (None이면 전체)
+
+    컬럼은 column_sort_key 순서로 정렬된다.
+    """
+    mask = np.ones(len(long), dtype=bool)
+    if source is not None:
+        mask &= long['source'].isin([source] if isinstance(source, str) else source).to_numpy()
+    if metrics is not None:
+        mask &= long['metric'].isin(metrics).to_numpy()
+    if period_types is not None:
+        mask &= long['period_type'].isin(period_types).to_numpy()
+    sub = long[mask]
+    if sub.empty:
+        return pd.DataFrame(index=pd.Index([], name='종목코드'))
+
+    # (period_type, period_end, metric) 조합마다 컬럼명을 한 번만 만든다
+    keys = sub[['period_type', 'period_end', 'metric']].drop_duplicates()
+    names = {}
+    for ptype, end, metric in keys.itertuples(index=False):
+        year = None if pd.isna(end) else end.year
+        quarter = 0 if pd.isna(end) else (end.month - 1) // 3 + 1
+        names[(ptype, end, metric)] = column_name(ptype, year, quarter, metric)
+    key_index = pd.MultiIndex.from_frame(keys)
+    col_codes = key_index.get_indexer(pd.MultiIndex.from_frame(sub[['period_type', 'period_end', 'metric']]))
+    col_names = np.array([names[k] for k in key_index], dtype=object)
+
+    wide = (pd.DataFrame({'종목코드': sub['종목코드'].astype(str).to_numpy(),
+                          'column': col_names[col_codes],
+                          'value': sub['value'].to_numpy()})
+            .drop_duplicates(['종목코드', 'column'])
+            .pivot(index='종목코드', columns='column', values='value'))
+    wide.columns.name = None
+    return wide[sorted(wide.columns, key=column_sort_key)]
@@ -0,0 +1,289 @@
+"""
+FnGuide 비동기 HTTP 수집 엔진 (asyncio + aiohttp)
+
+fin_utils.fetch_fnguide_page 는 종목 × 페이지마다 동기 요청을 보내므로
+전종목 수집 속도가 프로세스 수에 묶인다. 이 모듈은 keep-alive 커넥션 풀로
+여러 페이지를 동시에 내려받아 캐시에 미리 채워 넣고, 이후 파싱 단계는
+캐시 적중으로 처리되게 한다.
+
+구성:
+  FETCH_CONFIG               : 기본 동시성/속도 제한 설정
+  FetchJob                   : (url, cache_key, kind) 다운로드 단위 (cache_key: fin_cache 키)
+  TokenBucket                : 초당 요청 수 제한 (토큰 버킷)
+  AsyncFetcher               : 커넥션 풀 + 호스트별 동시 요청 수 / 요청 속도 제한
+  prefetch_to_cache(jobs)    : 캐시에 없거나 TTL이 지난 FetchJob만 비동기로 받아 저장 → 통계 dict
+                               (만료 항목은 조건부 GET, 304면 재검증만 기록)
+                               응답은 fin_utils.validate_body 통과 시에만 캐시에 쓰고,
+                               transient/throttled 실패는 fin_utils.RETRY_CONFIG대로 재시도
+  prefetch_groups_to_queue(groups, out_queue, slots)
+                             : 묶음(key, [FetchJob]) 단위로 받아 끝난 key를 큐에 넣음
+                               (파이프라인 모드의 I/O 단계, 끝나면 None 전달,
+                                slots 세마포어로 처리 중인 묶음 수 제한)
+"""
+import asyncio
+import time
+from collections import namedtuple
+from typing import Any
+from urllib.parse import urlsplit
+
+import aiohttp
+
+import fin_cache
+from fin_utils import (
+    FAILURE_PERMANENT,
+    FAILURE_TRANSIENT,
+    HTTP_HEADERS,
+    HTTP_TIMEOUT,
+    RETRY_CONFIG,
+    FetchError,
+    backoff_delay,
+    body_kind,
+    classify_status,
+    parse_retry_after,
+    validate_body,
+)
+
+# 기본 동시성 설정 (AsyncFetcher 인자로 덮어쓸 수 있음)
+FETCH_CONFIG: dict[str, Any] = {
+    'max_per_host': 8,      # 호스트별 동시 요청 수 (in-flight)
+    'rate_per_sec': 10.0,   # 호스트별 초당 요청 수 (토큰 충전 속도)
+    'burst': 10,            # 토큰 버킷 용량 (순간 최대 요청 수)
+    'timeout': HTTP_TIMEOUT,
+}
+
+# kind: 'html' → UTF-8 텍스트 그대로 저장
+#       'json' → UTF-8 BOM 제거 후 저장 (getFnGuideMultiFactor 캐시 형식)
+FetchJob = namedtuple('FetchJob', ['url', 'cache_key', 'kind'])
+
+
+class TokenBucket:
+    """
+    토큰 버킷 속도 제한기
+
+    rate개/초 속도로 토큰이 충전되며 최대 capacity개까지 쌓인다.
+    acquire()는 토큰 하나를 얻을 때까지 대기한다.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(1.0, self.rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class AsyncFetcher:
+    """
+    keep-alive 커넥션 풀 기반 비동기 HTTP 클라이언트
+
+    - 호스트별 동시 요청 수: max_per_host (TCPConnector + Semaphore)
+    - 호스트별 요청 속도  : rate_per_sec / burst (TokenBucket)
+
+    사용 예시:
+        async with AsyncFetcher(max_per_host=8) as fetcher:
+            body = await fetcher.get(url)
+    """
+
+    def __init__(self, max_per_host=None, rate_per_sec=None, burst=None, timeout=None):
+        self.max_per_host = max_per_host or FETCH_CONFIG['max_per_host']
+        self.rate_per_sec = rate_per_sec or FETCH_CONFIG['rate_per_sec']
+        self.burst = burst or FETCH_CONFIG['burst']
+        self.timeout = timeout or FETCH_CONFIG['timeout']
+        self._session: aiohttp.ClientSession | None = None
+        self._buckets: dict[str, TokenBucket] = {}
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit_per_host=self.max_per_host, keepalive_timeout=30)
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            headers=HTTP_HEADERS,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        if self._session is not None:
+            await self._session.close()
+
+    def _host_limits(self, url):
+        host = urlsplit(url).netloc
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(self.rate_per_sec, self.burst)
+            self._semaphores[host] = asyncio.Semaphore(self.max_per_host)
+        return self._buckets[host], self._semaphores[host]
+
+    async def request(self, url, headers=None):
+        """(status, 응답 헤더, 본문 bytes) 반환 — 304는 오류로 취급하지 않음, 4xx/5xx는 FetchError"""
+        assert self._session is not None, "async with AsyncFetcher(...) 안에서만 사용"
+        bucket, semaphore = self._host_limits(url)
+        async with semaphore:
+            await bucket.acquire()
+            async with self._session.get(url, headers=headers) as resp:
+                if resp.status >= 400:
+                    raise FetchError(url, classify_status(resp.status), f'HTTP {resp.status}', status=resp.status,
+                                     retry_after=parse_retry_after(resp.headers.get('Retry-After')))
+                return resp.status, resp.headers, await resp.read()
+
+    async def get(self, url):
+        """URL 응답 본문(bytes) 반환 (HTTP 오류 시 FetchError)"""
+        _, _, body = await self.request(url)
+        return body
+
+    async def fetch_job(self, job):
+        """
+        FetchJob 하나를 내려받아 캐시에 저장 → 받은 바이트 수
+
+        캐시 본문이 있으면 조건부 GET을 보내고, 304면 fetched_at만 갱신하고 None 반환.
+        본문 검증(validate_body)에 실패하면 캐시에 쓰지 않고 FetchError(permanent).
+        """
+        cache = fin_cache.get_cache_manager()
+        meta = cache.meta(job.cache_key) if cache.has(job.cache_key) else None
+        status, headers, body = await self.request(job.url, fin_cache.conditional_headers(meta))
+        if status == 304:
+            cache.touch(job.cache_key)
+            return None
+        encoding = 'utf-8-sig' if job.kind == 'json' else 'utf-8'
+        text = body.decode(encoding, errors='replace')
+        validate_body(job.url, body_kind(job.cache_key), text)
+        cache.write(job.cache_key, text, etag=headers.get('ETag'), last_modified=headers.get('Last-Modified'))
+        return len(body)
+
+
+def _is_fresh(job):
+    """캐시 본문이 있고 TTL 이내인지 여부"""
+    return fin_cache.get_cache_manager().is_fresh(job.cache_key)
+
+
+def _new_stats(requested=0):
+    return {'requested': requested, 'fetched': 0, 'revalidated': 0, 'cached': 0, 'failed': 0, 'bytes': 0,
+            'retried': 0, 'failures': {}}
+
+
+def _as_fetch_error(url, exc):
+    """aiohttp/asyncio 예외 → FetchError (연결/타임아웃 계열은 transient)"""
+    if isinstance(exc, FetchError):
+        return exc
+    if isinstance(exc, (asyncio.TimeoutError, aiohttp.ClientError, ConnectionError)):
+        return FetchError(url, FAILURE_TRANSIENT, f'{type(exc).__name__}: {exc}')
+    return FetchError(url, FAILURE_PERMANENT, f'{type(exc).__name__}: {exc}')
+
+
+async def _run_job(fetcher, job, stats):
+    """FetchJob 1개 실행 (transient/throttled는 백오프 후 재시도), 결과를 stats에 반영"""
+    attempts = RETRY_CONFIG['max_attempts']
+    for attempt in range(attempts):
+        try:
+            nbytes = await fetcher.fetch_job(job)
+            break
+        except Exception as e:
+            err = _as_fetch_error(job.url, e)
+            if err.kind == FAILURE_PERMANENT or attempt == attempts - 1:
+                stats['failed'] += 1
+                stats['failures'][err.kind] = stats['failures'].get(err.kind, 0) + 1
+                print(f"  ERROR [fetch] {err}")
+                return
+            stats['retried'] += 1
+            await asyncio.sleep(backoff_delay(attempt, err.kind, err.retry_after))
+
+    if nbytes is None:
+        stats['revalidated'] += 1
+    else:
+        stats['bytes'] += nbytes
+        stats['fetched'] += 1
+
+
+async def _prefetch(jobs, fetcher_kwargs):
+    stats = _new_stats(len(jobs))
+
+    pending = []
+    for job in jobs:
+        if _is_fresh(job):
+            stats['cached'] += 1
+        else:
+            pending.append(job)
+
+    async with AsyncFetcher(**fetcher_kwargs) as fetcher:
+        await asyncio.gather(*(_run_job(fetcher, job, stats) for job in pending))
+
+    return stats
+
+
+def prefetch_to_cache(jobs, **fetcher_kwargs):
+    """
+    캐시에 없거나 TTL이 지난 FetchJob을 비동기로 내려받아 캐시에 저장
+
+    Args:
+        jobs          : FetchJob iterable
+        fetcher_kwargs: AsyncFetcher 인자 (max_per_host, rate_per_sec, burst, timeout)
+
+    Returns:
+        dict: requested, fetched, revalidated, cached, failed, bytes, retried,
+              failures ({FAILURE_*: 건수})
+    """
+    return asyncio.run(_prefetch(list(jobs), fetcher_kwargs))
+
+
+async def _prefetch_groups(groups, out_queue, slots, fetcher_kwargs):
+    stats = _new_stats()
+    loop = asyncio.get_running_loop()
+
+    async with AsyncFetcher(**fetcher_kwargs) as fetcher:
+        async def run(job):
+            stats['requested'] += 1
+            if _is_fresh(job):
+                stats['cached'] += 1
+                return
+            await _run_job(fetcher, job, stats)
+
+        async def run_group(key, jobs):
+            await asyncio.gather(*(run(job) for job in jobs))
+            await loop.run_in_executor(None, out_queue.put, key)
+
+        tasks = []
+        for key, jobs in groups:
+            if slots is not None:
+                # 처리 중인 묶음이 상한에 닿으면(파싱 단계가 밀리면) 다음 묶음 다운로드를 시작하지 않는다.
+                # 이벤트 루프는 막지 않도록 executor에서 대기
+                await loop.run_in_executor(None, slots.acquire)
+            tasks.append(asyncio.ensure_future(run_group(key, jobs)))
+        await asyncio.gather(*tasks)
+
+    return stats
+
+
+def prefetch_groups_to_queue(groups, out_queue, slots=None, **fetcher_kwargs):
+    """
+    묶음 단위로 비동기 다운로드 후 완료된 묶음의 key를 out_queue에 전달
+
+    한 묶음의 FetchJob이 모두 끝나면(성공/실패 무관) key를 큐에 넣는다.
+    전체가 끝나면 None을 넣어 소비자에게 종료를 알린다.
+    별도 스레드에서 실행하여 파싱 단계와 겹쳐 돌리는 용도이다.
+
+    Args:
+        groups        : [(key, [FetchJob, ...]), ...]
+        out_queue     : queue.Queue
+        slots         : threading.Semaphore (파싱 단계 backpressure). 묶음 다운로드를 시작하기 전에
+                        acquire하므로, 소비자가 묶음 처리를 마칠 때마다 release해야 한다.
+                        None이면 모든 묶음을 한꺼번에 시작
+        fetcher_kwargs: AsyncFetcher 인자 (max_per_host, rate_per_sec, burst, timeout)
+
+    Returns:
+        dict: requested, fetched, revalidated, cached, failed, bytes, retried,
+              failures ({FAILURE_*: 건수})
+    """
+    try:
+        return asyncio.run(_prefetch_groups(list(groups), out_queue, slots, fetcher_kwargs))
+    finally:
+        out_queue.put(None)
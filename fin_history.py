@@ -0,0 +1,201 @@
+"""
+시점 기준(point-in-time) 재무 데이터 이력 저장소
+
+월별 산출물(Excel / derived/*.parquet)은 다음 달 실행이 덮어쓰므로, 수집할 때마다
+모듈별 전체 DataFrame(fngCollect.to_dataset_schema 스키마)을 수집 시각별 Parquet
+파티션으로 추가 저장해 둔다. 한 번 쓴 파티션은 수정하지 않는다 (append-only).
+
+  derived/history/{source}/collected=YYYY-MM-DD/part-HHMMSS.parquet
+
+as_of(when, source)는 when 시점까지 수집된 것 중 가장 최근 파티션 하나만 읽으므로
+몇 년치가 쌓여도 조회 비용은 파티션 1개 읽기 + 디렉토리 목록 조회다.
+파티션 하나가 그 시점의 전체 종목 스냅샷이므로, 이후 상장폐지된 종목이나
+나중에 정정된 값은 섞이지 않는다.
+
+구성:
+  HISTORY_DIR                         : 저장소 루트
+  SOURCES                             : fngCollect 모듈명 (snapshot, finance, ratio, investidx)
+  append(df, source, collected_at)    : 스냅샷 1건 추가 → 파일 경로
+  collections(source)                 : 수집 시각 목록 (오름차순)
+  collected_as_of(whens, source)      : 시점별로 as_of가 읽을 수집 시각 (벡터화, 없으면 NaT)
+  as_of(when, source, columns, codes) : when 시점에 알 수 있었던 DataFrame (없으면 None)
+  as_of_all(when, sources)            : {source: DataFrame 또는 None}
+  history(source, columns, ...)       : 기간 내 전체 스냅샷을 '수집시각' 컬럼과 함께 합침
+"""
+import os
+import re
+from datetime import date, datetime, time
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+HISTORY_DIR = 'derived/history'
+SOURCES = ('snapshot', 'finance', 'ratio', 'investidx')
+
+COLLECTED_COLUMN = '수집시각'  # history() 결과에 붙는 컬럼
+
+_PARTITION_RE = re.compile(r'^collected=(\d{4}-\d{2}-\d{2})$')
+_PART_RE = re.compile(r'^part-(\d{6})(?:-(\d+))?\.parquet$')
+
+
+def _require_pyarrow():
+    if pq is None:
+        raise ImportError("fin_history는 pyarrow가 필요합니다 (pip install pyarrow)")
+
+
+def _to_timestamp(when, end_of_day=True):
+    """
+    조회 시점 → Timestamp
+
+    날짜만 주면(date, 'YYYY-MM-DD') end_of_day=True일 때 그날 수집분까지 포함하도록
+    23:59:59.999999로, False이면 그날 0시로 본다.
+    """
+    if isinstance(when, str) and len(when) == 10:
+        when = date.fromisoformat(when)
+    if isinstance(when, date) and not isinstance(when, datetime):
+        return pd.Timestamp(datetime.combine(when, time.max if end_of_day else time.min))
+    return pd.Timestamp(when)
+
+
+def _parts(source, root=HISTORY_DIR):
+    """[(수집 시각, 파일 경로), ...] 오름차순 (같은 초에 저장한 파일은 저장 순서)"""
+    source_dir = os.path.join(root, source)
+    if not os.path.isdir(source_dir):
+        return []
+    parts = []
+    for partition in os.scandir(source_dir):
+        day = _PARTITION_RE.match(partition.name)
+        if not day or not partition.is_dir():
+            continue
+        for entry in os.scandir(partition.path):
+            part = _PART_RE.match(entry.name)
+            if part:
+                collected = datetime.strptime(f"{day.group(1)} {part.group(1)}", '%Y-%m-%d %H%M%S')
+                parts.append((pd.Timestamp(collected), int(part.group(2) or 0), entry.path))
+    return [(collected, path) for collected, _, path in sorted(parts)]
+
+
+def append(df, source, collected_at=None, root=HISTORY_DIR):
+    """
+    모듈 DataFrame 스냅샷 1건 추가 (기존 파티션은 건드리지 않음)
+
+    Args:
+        df          : fngCollect.to_dataset_schema 형식 DataFrame
+        source      : SOURCES 중 하나
+        collected_at: 수집 시각 (None이면 현재 시각, 초 단위로 잘림)
+
+    Returns:
+        str: 저장한 파일 경로
+    """
+    _require_pyarrow()
+    if source not in SOURCES:
+        raise ValueError(f"Unknown source: {source}")
+
+    collected_at = (collected_at or datetime.now()).replace(microsecond=0)
+    partition = os.path.join(root, source, f"collected={collected_at:%Y-%m-%d}")
+    os.makedirs(partition, exist_ok=True)
+
+    # 같은 초에 두 번 저장해도 덮어쓰지 않도록 접미어를 붙인다
+    stem = f"part-{collected_at:%H%M%S}"
+    path = os.path.join(partition, f"{stem}.parquet")
+    n = 0
+    while os.path.exists(path):
+        n += 1
+        path = os.path.join(partition, f"{stem}-{n}.parquet")
+
+    tmp = path + '.tmp'
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+    return path
+
+
+def collections(source, root=HISTORY_DIR):
+    """수집 시각 목록 (Timestamp, 오름차순)"""
+    return [collected for collected, _ in _parts(source, root)]
+
+
+def collected_as_of(whens, source, root=HISTORY_DIR):
+    """
+    여러 시점에 대해 as_of가 읽을 수집 시각을 한 번에 계산 (디렉토리 목록 1회 + searchsorted)
+
+    백테스트처럼 시점이 많을 때, 같은 스냅샷을 가리키는 시점끼리 결과를 재사용하는 데 쓴다.
+
+    Returns:
+        DatetimeIndex: whens와 같은 길이, 그 이전 수집분이 없으면 NaT
+    """
+    cutoffs = np.array([_to_timestamp(w).to_datetime64() for w in whens], dtype='datetime64[ns]')
+    collected = np.array(collections(source, root), dtype='datetime64[ns]')
+    pos = np.searchsorted(collected, cutoffs, side='right') - 1
+    out = collected[pos.clip(0)] if len(collected) else np.full(len(cutoffs), np.datetime64('NaT', 'ns'))
+    return pd.DatetimeIndex(np.where(pos >= 0, out, np.datetime64('NaT', 'ns')))
+
+
+def _read_part(path, columns=None, codes=None):
+    if columns is not None:
+        available = set(pq.read_schema(path).names)
+        columns = list(dict.fromkeys(['종목코드', *[c for c in columns if c in available]]))
+    filters = [('종목코드', 'in', [str(c).zfill(6) for c in codes])] if codes is not None else None
+    return pq.read_table(path, columns=columns, filters=filters).to_pandas()
+
+
+def as_of(when, source, columns=None, codes=None, root=HISTORY_DIR):
+    """
+    when 시점에 알 수 있었던 모듈 DataFrame (when 이전 가장 최근 수집분)
+
+    Args:
+        when   : datetime / date / 'YYYY-MM-DD' (날짜만 주면 그날 수집분 포함)
+        source : SOURCES 중 하나
+        columns: 읽을 컬럼 목록 (종목코드는 항상 포함, 없는 컬럼은 무시). None이면 전체
+        codes  : 종목코드 목록 (None이면 전체, Parquet row group 필터로 읽음)
+
+    Returns:
+        DataFrame (attrs['collected_at']에 수집 시각), when 이전 수집분이 없으면 None
+    """
+    _require_pyarrow()
+    cutoff = _to_timestamp(when)
+    known = [(collected, path) for collected, path in _parts(source, root) if collected <= cutoff]
+    if not known:
+        return None
+    collected, path = known[-1]
+    df = _read_part(path, columns, codes)
+    df.attrs['collected_at'] = collected
+    return df
+
+
+def as_of_all(when, sources=SOURCES, root=HISTORY_DIR):
+    """모듈별 as_of → {source: DataFrame 또는 None}"""
+    return {source: as_of(when, source, root=root) for source in sources}
+
+
+def history(source, columns=None, codes=None, start=None, end=None, root=HISTORY_DIR):
+    """
+    기간 내 모든 스냅샷을 하나로 합침 (지표 추이 분석용)
+
+    파티션마다 컬럼 구성이 다를 수 있으므로 (연도 컬럼 이동) 없는 컬럼은 NaN이 된다.
+
+    Args:
+        start / end: 수집 시각 범위 (날짜만 주면 start는 그날 0시, end는 그날 끝까지 포함)
+        columns / codes: as_of와 동일
+
+    Returns:
+        DataFrame: COLLECTED_COLUMN('수집시각') + 종목코드 + columns
+    """
+    _require_pyarrow()
+    start = _to_timestamp(start, end_of_day=False) if start is not None else None
+    end = _to_timestamp(end) if end is not None else None
+
+    frames = []
+    for collected, path in _parts(source, root):
+        if (start is not None and collected < start) or (end is not None and collected > end):
+            continue
+        df = _read_part(path, columns, codes)
+        df.insert(0, COLLECTED_COLUMN, collected)
+        frames.append(df)
+    if not frames:
+        return pd.DataFrame(columns=[COLLECTED_COLUMN, '종목코드', *(columns or [])])
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,225 @@
+"""
+수집 실행 저널 (재개용)
+
+종목 × 모듈 파싱 결과를 끝날 때마다 JSON Lines 파일에 한 줄씩 추가한다.
+실행이 중간에 죽어도 그때까지의 결과가 남으므로, --resume 실행은
+저널에 없거나 실패한 종목만 다시 처리하고 최종 산출물은 저널에서 조립한다.
+
+레코드 (한 줄):
+  {"code": "005930", "module": "finance", "status": "ok",
+   "row": {scode, sname, industry, products}, "data": {...} 또는 null,
+   "error": null 또는 {"kind": "transient|throttled|permanent", "message": "..."},
+   "at": "2026-04-01T09:00:00"}
+
+status:
+  ok    : 파싱 성공 (data에 결과)
+  empty : 페이지는 받았으나 추출할 데이터 없음 (재개 시 다시 처리하지 않음)
+  error : 예외 발생 (재개 시 다시 처리)
+
+결과는 받았지만 일부 데이터만 실패한 경우(예: investidx의 멀티팩터 JSON)는
+모듈 레코드는 ok로 두고 'investidx.multifactor' 같은 하위 모듈 error 레코드를 따로 남긴다.
+하위 모듈은 재개 대상 판정에 쓰지 않으므로 실패 보고에만 나타난다.
+
+같은 (code, module)이 여러 번 기록되면 마지막 레코드가 유효하다.
+기록 도중 죽어서 잘린 마지막 줄은 재개할 때 파일에서 잘라낸다
+(남겨 두면 이어 쓰는 첫 레코드가 그 줄에 붙어 함께 버려진다).
+
+변경분 수집(--delta)은 종목별 최근 실적 기간을 module='_period' 레코드
+(data={"period": "2026/06"})로 함께 남겨 다음 실행의 비교 기준으로 쓴다.
+"""
+import json
+import os
+import re
+import shutil
+import threading
+from datetime import datetime
+
+JOURNAL_DIR = 'derived/journal'
+
+STATUS_OK = 'ok'
+STATUS_EMPTY = 'empty'
+STATUS_ERROR = 'error'
+_DONE_STATUSES = (STATUS_OK, STATUS_EMPTY)
+
+PERIOD_MODULE = '_period'  # 변경분 수집용 최근 실적 기간 레코드
+
+_MONTHLY_RE = re.compile(r'^(?P<prefix>.+)_\d{4}_\d{2}\.jsonl$')
+
+
+def previous_journal(path):
+    """
+    같은 접두어의 월별 저널 중 path보다 앞선 가장 최근 파일 (없으면 None)
+
+    예: 'derived/journal/finance_2026_05.jsonl' → 'derived/journal/finance_2026_04.jsonl'
+    """
+    directory, name = os.path.split(path)
+    match = _MONTHLY_RE.match(name)
+    if not match or not os.path.isdir(directory or '.'):
+        return None
+    candidates = sorted(
+        entry for entry in os.listdir(directory or '.')
+        if entry < name and (m := _MONTHLY_RE.match(entry)) and m.group('prefix') == match.group('prefix')
+    )
+    return os.path.join(directory, candidates[-1]) if candidates else None
+
+
+def seed_journal(path):
+    """
+    path가 없으면 직전 월 저널을 복사해 시작점으로 삼음 (변경분 수집용) → 복사한 원본 경로 또는 None
+    """
+    if os.path.exists(path):
+        return None
+    source = previous_journal(path)
+    if source:
+        shutil.copyfile(source, path)
+    return source
+
+
+class RunJournal:
+    """append-only 실행 저널"""
+
+    def __init__(self, path, resume=False):
+        """
+        Args:
+            path  : 저널 파일 경로 (예: 'derived/journal/finance_2026_04.jsonl')
+            resume: False면 기존 저널을 비우고 새로 시작, True면 이어서 기록
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._records = {}
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        if resume and os.path.exists(path):
+            self._records = self._load()
+        self._fh = open(path, 'a' if resume else 'w', encoding='utf-8')
+
+    def _load(self):
+        records = {}
+        complete = 0  # 줄바꿈까지 기록된 부분의 바이트 수
+        with open(self.path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # 기록 중 중단된 마지막 줄
+                complete += len(line)
+                try:
+                    rec = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # 기록 중 중단된 줄
+                records[(rec['code'], rec['module'])] = rec
+        if complete < os.path.getsize(self.path):
+            os.truncate(self.path, complete)
+        return records
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        with self._lock:
+            if not self._fh.closed:
+                self._fh.close()
+
+    def record(self, stock_row, module, status, data=None, error=None):
+        """(종목, 모듈) 결과 1건 기록 (즉시 flush)"""
+        rec = {
+            'code': stock_row['scode'],
+            'module': module,
+            'status': status,
+            'row': stock_row,
+            'data': data,
+            'error': error,
+            'at': datetime.now().isoformat(timespec='seconds'),
+        }
+        line = json.dumps(rec, ensure_ascii=False, default=str)
+        with self._lock:
+            self._fh.write(line + '\n')
+            self._fh.flush()
+            self._records[(rec['code'], module)] = rec
+
+    def record_stock(self, stock_row, parsed, errors):
+        """parse_stock_pages 결과 1종목분 기록 → 모듈별 ok / empty / error (+ 하위 모듈 부분 실패)"""
+        for module, data in parsed.items():
+            if module in errors:
+                self.record(stock_row, module, STATUS_ERROR, error=errors[module])
+            elif data is None:
+                self.record(stock_row, module, STATUS_EMPTY)
+            else:
+                self.record(stock_row, module, STATUS_OK, data=data)
+        for module, error in errors.items():
+            if module not in parsed:
+                self.record(stock_row, module, STATUS_ERROR, error=error)
+
+    def record_period(self, stock_row, period):
+        """종목의 최근 실적 기간 기록 (변경분 수집 비교 기준)"""
+        self.record(stock_row, PERIOD_MODULE, STATUS_OK, data={'period': period})
+
+    def period(self, code):
+        """마지막으로 기록한 최근 실적 기간 (없으면 None)"""
+        rec = self._records.get((code, PERIOD_MODULE))
+        return rec['data']['period'] if rec else None
+
+    def is_done(self, code, modules):
+        """모든 모듈이 ok/empty로 기록된 종목인지"""
+        for module in modules:
+            rec = self._records.get((code, module))
+            if rec is None or rec['status'] not in _DONE_STATUSES:
+                return False
+        return True
+
+    def pending(self, stock_rows, modules):
+        """아직 처리하지 않았거나 실패한 종목만 반환 (stock_rows 순서 유지)"""
+        return [row for row in stock_rows if not self.is_done(row['scode'], modules)]
+
+    def parsed(self, code, modules):
+        """저널 기준 {module: dict 또는 None} (parse_stock_pages 결과 형식)"""
+        out = {}
+        for module in modules:
+            rec = self._records.get((code, module))
+            out[module] = rec['data'] if rec and rec['status'] == STATUS_OK else None
+        return out
+
+    def failures(self):
+        """현재 error 상태인 레코드 목록"""
+        return [rec for rec in self._records.values() if rec['status'] == STATUS_ERROR]
+
+    def write_failure_report(self, path=None):
+        """
+        실패 보고서 저장 (JSON) → (경로, {(module, kind): 건수})
+
+        경로 기본값: 저널 파일명 + '_failures.json'. 실패가 없으면 파일을 쓰지 않고 (None, {}).
+        """
+        failures = self.failures()
+        path = path or os.path.splitext(self.path)[0] + '_failures.json'
+        if not failures:
+            if os.path.exists(path):
+                os.remove(path)  # 이전 실행의 보고서 (재개 후 모두 성공)
+            return None, {}
+
+        counts: dict[tuple, int] = {}
+        items = []
+        for rec in failures:
+            error = rec['error'] if isinstance(rec['error'], dict) else {'kind': None, 'message': rec['error']}
+            counts[(rec['module'], error['kind'])] = counts.get((rec['module'], error['kind']), 0) + 1
+            items.append({'code': rec['code'], 'module': rec['module'], 'kind': error['kind'],
+                          'message': error['message'], 'at': rec['at']})
+
+        report = {
+            'journal': self.path,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'counts': [{'module': m, 'kind': k, 'count': n} for (m, k), n in sorted(counts.items(), key=str)],
+            'failures': items,
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        return path, counts
+
+    def summary(self):
+        """status별 레코드 수"""
+        counts = {STATUS_OK: 0, STATUS_EMPTY: 0, STATUS_ERROR: 0}
+        for rec in self._records.values():
+            if rec['module'] == PERIOD_MODULE:
+                continue
+            counts[rec['status']] = counts.get(rec['status'], 0) + 1
+        return counts
@@ -0,0 +1,146 @@
+"""
+수집 진행률 / 처리량 측정
+
+worker가 종목 하나를 끝낼 때마다 모듈별 페이지 조회 통계(fin_utils.fetch_counters 차이)를
+넘겨주면 누적해서 진행률을 주기적으로 출력하고, 실행이 끝나면 요약과
+(선택) 실행별 지표 레코드를 남긴다.
+
+출력 예:
+  [진행] 1200/2500 (48.0%) 12.3종목/s 1.20MB/s 캐시 적중 85.1% ETA 1m45s
+
+구성:
+  PROGRESS_INTERVAL      : 진행률 출력 간격 (초)
+  METRICS_PATH           : 실행별 지표 누적 파일 (JSON Lines, 추이 비교용)
+  RunMetrics             : 진행률/처리량 누적기
+  append_metrics(record) : 실행 지표 1건을 METRICS_PATH에 추가
+"""
+import json
+import os
+import time
+from datetime import datetime
+
+PROGRESS_INTERVAL = 5.0  # 초
+METRICS_PATH = 'derived/metrics/collect_runs.jsonl'
+
+# 모듈별 누적 항목 (fin_utils.fetch_counters 키 + 페이지 조회/파싱에 쓴 worker 시간)
+_COUNTER_KEYS = ('cache_hits', 'revalidated', 'fetched', 'stale', 'bytes', 'seconds')
+
+
+def _fmt_duration(seconds):
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+def _hit_ratio(c):
+    lookups = c['cache_hits'] + c['revalidated'] + c['fetched'] + c['stale']
+    return c['cache_hits'] / lookups if lookups else None
+
+
+class RunMetrics:
+    """
+    종목 단위 진행률 / 처리량 누적기
+
+    사용 예시:
+        metrics = RunMetrics('finance', total=len(rows))
+        for stock_metrics in results:
+            metrics.update(stock_metrics)   # {module: {cache_hits, revalidated, fetched, stale, bytes, seconds}}
+        metrics.print_summary()
+    """
+
+    def __init__(self, label, total, interval=PROGRESS_INTERVAL):
+        self.label = label
+        self.total = total
+        self.interval = interval
+        self.done = 0
+        self.modules = {}
+        self.extra = {}  # summary()에 그대로 붙일 항목 (예: 'prefetch': fin_fetch 통계)
+        self.started_at = datetime.now()
+        self._start = time.monotonic()
+        self._last_print = self._start
+
+    def update(self, stock_metrics=None):
+        """종목 1개 완료 반영 (interval마다 진행률 출력)"""
+        self.done += 1
+        for module, counters in (stock_metrics or {}).items():
+            acc = self.modules.setdefault(module, dict.fromkeys(_COUNTER_KEYS, 0))
+            for key in _COUNTER_KEYS:
+                acc[key] += counters.get(key, 0)
+
+        now = time.monotonic()
+        if now - self._last_print >= self.interval and self.done < self.total:
+            self._last_print = now
+            print(self.progress_line())
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self._start
+
+    def _totals(self):
+        totals = dict.fromkeys(_COUNTER_KEYS, 0)
+        for acc in self.modules.values():
+            for key in _COUNTER_KEYS:
+                totals[key] += acc[key]
+        return totals
+
+    def progress_line(self):
+        """현재 진행률 한 줄"""
+        elapsed = max(self.elapsed, 1e-9)
+        rate = self.done / elapsed
+        totals = self._totals()
+        pct = 100.0 * self.done / self.total if self.total else 100.0
+        hit = _hit_ratio(totals)
+        eta = (self.total - self.done) / rate if rate > 0 else 0
+        return (f"  [진행] {self.done}/{self.total} ({pct:.1f}%) {rate:.1f}종목/s "
+                f"{totals['bytes'] / elapsed / 1e6:.2f}MB/s "
+                f"캐시 적중 {'-' if hit is None else f'{hit * 100:.1f}%'} ETA {_fmt_duration(eta)}")
+
+    def summary(self):
+        """실행 지표 dict (append_metrics 레코드 형식)"""
+        elapsed = self.elapsed
+        modules = {}
+        for module, acc in self.modules.items():
+            hit = _hit_ratio(acc)
+            modules[module] = {
+                **{k: acc[k] for k in _COUNTER_KEYS if k != 'seconds'},
+                'busy_seconds': round(acc['seconds'], 3),
+                'cache_hit_ratio': None if hit is None else round(hit, 4),
+                'seconds_per_ticker': round(acc['seconds'] / self.done, 4) if self.done else None,
+            }
+        totals = self._totals()
+        hit = _hit_ratio(totals)
+        return {
+            'label': self.label,
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'finished_at': datetime.now().isoformat(timespec='seconds'),
+            'elapsed_sec': round(elapsed, 3),
+            'tickers_total': self.total,
+            'tickers_done': self.done,
+            'tickers_per_sec': round(self.done / elapsed, 3) if elapsed else None,
+            'bytes': totals['bytes'],
+            'bytes_per_sec': round(totals['bytes'] / elapsed, 1) if elapsed else None,
+            'cache_hit_ratio': None if hit is None else round(hit, 4),
+            'modules': modules,
+            **self.extra,
+        }
+
+    def print_summary(self):
+        """종료 요약 출력 (전체 + 모듈별)"""
+        s = self.summary()
+        print(f"\n처리: {s['tickers_done']}/{s['tickers_total']}종목, {_fmt_duration(s['elapsed_sec'])} "
+              f"({s['tickers_per_sec'] or 0:.1f}종목/s, {(s['bytes_per_sec'] or 0) / 1e6:.2f}MB/s)")
+        for module, m in s['modules'].items():
+            hit = '-' if m['cache_hit_ratio'] is None else f"{m['cache_hit_ratio'] * 100:.1f}%"
+            print(f"  [{module}] 캐시 적중 {hit}, 재검증 {m['revalidated']}, 다운로드 {m['fetched']} "
+                  f"({m['bytes'] / 1e6:.2f}MB), worker 누적 {m['busy_seconds']:.1f}s")
+
+
+def append_metrics(record, path=METRICS_PATH):
+    """실행 지표 1건을 JSON Lines 파일에 추가 → 경로"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    return path
@@ -6,22 +6,138 @@ Excel 저장:
   save_styled_excel_multisheet(sheets, filepath): 멀티시트 서식 저장
 
 HTTP / 캐싱:
+  get_http_session()                              : 프로세스 공용 keep-alive requests.Session
+  fnguide_page_url(code, asp_page, menu_id)       : FnGuide ASP 페이지 URL
+  fnguide_cache_key(code, cache_prefix, filename) : 페이지 캐시 키 (fin_cache)
+  fetch_cached(url, key, ttl, encoding)           : TTL + 조건부 GET 캐시 조회 (응답 검증 + 재시도)
+  FetchError / classify_status / backoff_delay    : 실패 분류 (transient / throttled / permanent) 및 백오프
+  PARTIAL_FAILURES_KEY                            : 수집 결과 dict에 담는 부분 실패 ({부분명: {kind, message}})
+  fetch_counters()                                : 프로세스별 fetch_cached 누계 (캐시 적중/다운로드 바이트)
   fetch_fnguide_page(code, asp_page, menu_id, cache_prefix): FnGuide 페이지 다운로드 (캐싱)
+  cached_parse(html, parser_name, parser_version, parse_fn): HTML 해시 기준 파싱 결과 캐싱
 
 HTML 파싱 공통 헬퍼 (모든 FnGuide 모듈에서 공유):
+  make_soup(html, module, xpaths, engine)  : 파서 엔진별 BeautifulSoup 생성
   parse_company_name(soup): 페이지 title에서 종목명 추출
   parse_kse_fics(soup)    : KSE/FICS 분야 및 결산월 추출
 """
 import datetime
+import hashlib
+import json
 import os
+import pickle
+import random
 import re
-import shutil
+import time
+from copy import copy
+from typing import Any
 
+import lxml.html
 import requests
+import requests.adapters
+from bs4 import BeautifulSoup
+from lxml import etree
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, Alignment
 from openpyxl.utils.dataframe import dataframe_to_rows
 
+import fin_cache
+
+try:
+    import xlsxwriter
+except ImportError:  # xlsxwriter 미설치 시 openpyxl write-only로 저장
+    xlsxwriter = None
+
+
+# 모든 셀: 맑은 고딕 10pt + 상하/좌우 가운데, 숫자(int/float) 셀은 추가로 '#,##0.##',
+# 날짜(date/datetime/pd.Timestamp) 셀은 날짜 서식 (시각이 있으면 시각까지)
+EXCEL_FONT = dict(name="맑은 고딕", size=10)
+EXCEL_ALIGNMENT = dict(horizontal="center", vertical="center")
+EXCEL_NUMBER_FORMAT = '#,##0.##'
+EXCEL_DATE_FORMAT = 'yyyy-mm-dd'
+EXCEL_DATETIME_FORMAT = 'yyyy-mm-dd hh:mm:ss'
+_EXCEL_FORMATS = {'number': EXCEL_NUMBER_FORMAT, 'date': EXCEL_DATE_FORMAT, 'datetime': EXCEL_DATETIME_FORMAT}
+
+
+def _excel_cell(value):
+    """
+    셀 값 → (서식 종류, 쓸 값): 'text' / 'number' / 'date' / 'datetime'
+
+    None / NaN / NaT는 빈 셀(값 None), datetime의 시간대는 제거 (Excel은 시간대를 저장하지 않음)
+    """
+    if value is None:
+        return 'text', None
+    if isinstance(value, (int, float)):
+        return 'number', (None if value != value else value)
+    if isinstance(value, datetime.date):  # pd.Timestamp / pd.NaT 포함
+        if value != value:  # NaT
+            return 'date', None
+        if isinstance(value, datetime.datetime):
+            value = value.replace(tzinfo=None)
+            if value.time() != datetime.time(0):
+                return 'datetime', value
+        return 'date', value
+    return 'text', value
+
+
+def _write_xlsxwriter(sheets, filepath, index):
+    """xlsxwriter로 저장 (constant_memory: 행 단위 스트리밍, 서식 종류별 서식 객체 공유)"""
+    wb = xlsxwriter.Workbook(filepath, {
+        'constant_memory': True,
+        'strings_to_urls': False,  # openpyxl과 동일하게 URL 문자열을 하이퍼링크로 바꾸지 않음
+    })
+    base = {'font_name': EXCEL_FONT['name'], 'font_size': EXCEL_FONT['size'],
+            'align': 'center', 'valign': 'vcenter'}
+    formats = {'text': wb.add_format(base)}
+    for kind, num_format in _EXCEL_FORMATS.items():
+        formats[kind] = wb.add_format({**base, 'num_format': num_format})
+
+    for sheet_name, df in sheets:
+        ws = wb.add_worksheet(sheet_name)
+        for r, row in enumerate(dataframe_to_rows(df, index=index, header=True)):
+            for c, value in enumerate(row):
+                kind, value = _excel_cell(value)
+                fmt = formats[kind]
+                if value is None:  # 서식만 있는 빈 셀
+                    ws.write_blank(r, c, None, fmt)
+                elif kind == 'number':
+                    ws.write_number(r, c, value, fmt)
+                elif kind != 'text':
+                    ws.write_datetime(r, c, value, fmt)
+                else:
+                    ws.write(r, c, value, fmt)
+    if not sheets:
+        wb.add_worksheet("Sheet")
+    wb.close()
+
+
+def _write_openpyxl(sheets, filepath, index):
+    """openpyxl write-only로 저장 (xlsxwriter 미설치 시), 셀 스타일은 템플릿 복사"""
+    wb = Workbook(write_only=True)
+    for sheet_name, df in sheets:
+        ws = wb.create_sheet(title=sheet_name)
+        styles = {}
+        for kind in ('text', *_EXCEL_FORMATS):
+            template = WriteOnlyCell(ws)
+            template.font = Font(**EXCEL_FONT)
+            template.alignment = Alignment(**EXCEL_ALIGNMENT)
+            if kind in _EXCEL_FORMATS:
+                template.number_format = _EXCEL_FORMATS[kind]
+            styles[kind] = template._style
+
+        for row in dataframe_to_rows(df, index=index, header=True):
+            cells = []
+            for value in row:
+                kind, value = _excel_cell(value)
+                cell = WriteOnlyCell(ws, value)
+                cell._style = copy(styles[kind])
+                cells.append(cell)
+            ws.append(cells)
+    if not wb.worksheets:
+        wb.create_sheet(title="Sheet")
+    wb.save(filepath)
+
 
 def save_styled_excel(df, filepath, sheet_name="Sheet1", index=False):
     """DataFrame을 서식이 적용된 Excel 파일로 저장한다.
@@ -29,28 +145,12 @@ def save_styled_excel(df, filepath, sheet_name="Sheet1", index=False):
     서식:
         - 글꼴: 맑은 고딕, 10pt
         - 맞춤: 상하 가운데, 좌우 가운데
+        - 숫자 셀: '#,##0.##', 날짜 셀: 'yyyy-mm-dd'
     """
-    wb = Workbook()
-    ws = wb.active
-    ws.title = sheet_name
-
-    font = Font(name="맑은 고딕", size=10)
-    alignment = Alignment(horizontal="center", vertical="center")
-
-    for row in dataframe_to_rows(df, index=index, header=True):
-        ws.append(row)
-
-    for row in ws.iter_rows(min_row=1, max_row=ws.max_row, max_col=ws.max_column):
-        for cell in row:
-            cell.font = font
-            cell.alignment = alignment
-            if isinstance(cell.value, (int, float)):
-                cell.number_format = '#,##0.##'
-
-    wb.save(filepath)
+    save_styled_excel_multisheet([(sheet_name, df)], filepath, index=index)
 
 
-def save_styled_excel_multisheet(sheets, filepath):
+def save_styled_excel_multisheet(sheets, filepath, index=False):
     """여러 시트를 담은 서식 적용 Excel 파일 저장
 
     Args:
@@ -60,31 +160,233 @@ def save_styled_excel_multisheet(sheets, filepath):
     서식:
         - 글꼴: 맑은 고딕, 10pt
         - 맞춤: 상하 가운데, 좌우 가운데
+        - 숫자 셀: '#,##0.##'
+        - 날짜 셀: 'yyyy-mm-dd' (시각이 있으면 'yyyy-mm-dd hh:mm:ss'), NaN/NaT/None은 빈 셀
+
+    셀마다 Font/Alignment를 만들지 않고 공유 서식(일반/숫자/날짜)을 행 단위로 스트리밍한다.
+    xlsxwriter가 있으면 사용하고, 없으면 openpyxl write-only 모드로 저장한다.
     """
-    wb = Workbook()
-    font = Font(name="맑은 고딕", size=10)
-    alignment = Alignment(horizontal="center", vertical="center")
+    sheets = list(sheets)
+    if xlsxwriter is not None:
+        _write_xlsxwriter(sheets, filepath, index)
+    else:
+        _write_openpyxl(sheets, filepath, index)
 
-    first = True
-    for sheet_name, df in sheets:
-        if first:
-            ws = wb.active
-            ws.title = sheet_name
-            first = False
-        else:
-            ws = wb.create_sheet(title=sheet_name)
 
-        for row in dataframe_to_rows(df, index=False, header=True):
-            ws.append(row)
+# ── HTTP 세션 ─────────────────────────────────────────────────────────────────
+# 종목 × 페이지마다 새 TLS 연결을 맺지 않도록 프로세스별 Session 하나를 재사용한다.
+# (multiprocessing fork 후 소켓을 공유하지 않도록 pid가 바뀌면 새로 만든다.)
+
+HTTP_TIMEOUT = 10  # 초
+HTTP_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+}
+
+_session = None
+_session_pid = None
 
-        for row_cells in ws.iter_rows(min_row=1, max_row=ws.max_row, max_col=ws.max_column):
-            for cell in row_cells:
-                cell.font = font
-                cell.alignment = alignment
-                if isinstance(cell.value, (int, float)):
-                    cell.number_format = '#,##0.##'
 
-    wb.save(filepath)
+def get_http_session():
+    """프로세스 공용 requests.Session 반환 (keep-alive 커넥션 풀)"""
+    global _session, _session_pid
+    if _session is None or _session_pid != os.getpid():
+        _session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16)
+        _session.mount('https://', adapter)
+        _session.mount('http://', adapter)
+        _session.headers.update(HTTP_HEADERS)
+        _session_pid = os.getpid()
+    return _session
+
+
+def fnguide_page_url(code, asp_page, menu_id):
+    """FnGuide ASP 페이지 URL 생성"""
+    return (f"https://comp.fnguide.com/SVO2/ASP/{asp_page}?pGB=1&gicode=A{code}"
+            f"&cID=&MenuYn=Y&ReportGB=&NewMenuID={menu_id}&stkGb=701")
+
+
+def fnguide_cache_key(code, cache_prefix, filename=None):
+    """FnGuide 페이지 캐시 키 (filename 생략 시 '{code}.html', 예: 'fnguide_finance/005930.html')"""
+    return fin_cache.cache_key(cache_prefix, filename or f'{code}.html')
+
+
+# ── 응답 검증 / 재시도 ────────────────────────────────────────────────────────
+# 오류 페이지가 캐시에 들어가 TTL 동안 파싱을 망치지 않도록, 응답은 상태 코드와
+# 본문 표식(marker)을 확인한 뒤에만 캐시에 쓴다. 실패는 세 종류로 분류한다.
+#   transient : 타임아웃/연결 오류/5xx → 지수 백오프(+jitter) 후 재시도
+#   throttled : 429/503 → Retry-After(없으면 throttle_delay) 만큼 쉬고 재시도
+#   permanent : 그 외 4xx, 본문 검증 실패 → 재시도하지 않음
+# 재시도를 모두 실패해도 만료된 캐시 본문이 있으면 그것을 사용한다.
+
+FAILURE_TRANSIENT = 'transient'
+FAILURE_THROTTLED = 'throttled'
+FAILURE_PERMANENT = 'permanent'
+
+RETRY_CONFIG: dict[str, Any] = {
+    'max_attempts': 4,       # 첫 요청 포함 최대 시도 횟수
+    'base_delay': 1.0,       # 초, 시도마다 2배 (full jitter)
+    'max_delay': 30.0,       # 초, 백오프 상한
+    'throttle_delay': 10.0,  # 초, 429/503에 Retry-After가 없을 때
+}
+
+# 본문 종류별 정상 응답 표식 (하나라도 있어야 캐시에 저장)
+RESPONSE_MARKERS = {
+    'html': ('corp_group1',),  # 종목 헤더 영역 (모든 SVD_*.asp 종목 페이지에 존재)
+}
+
+
+class FetchError(Exception):
+    """분류된 수집 실패 (kind: FAILURE_*)"""
+
+    def __init__(self, url, kind, reason, status=None, retry_after=None):
+        super().__init__(f"[{kind}] {reason} - {url}")
+        self.url = url
+        self.kind = kind
+        self.reason = reason
+        self.status = status
+        self.retry_after = retry_after
+
+
+# collect_fn 결과 dict에서 일부 데이터만 실패했을 때 쓰는 키 (나머지 결과는 그대로 사용)
+#   예: {'종목명': ..., PARTIAL_FAILURES_KEY: {'multifactor': {'kind': 'throttled', 'message': '...'}}}
+# fngCollect가 꺼내어 '{module}.{부분명}' 실패로 저널/실패 보고에 기록한다.
+PARTIAL_FAILURES_KEY = '_partial_failures'
+
+
+def classify_status(status):
+    """HTTP 상태 코드 → FAILURE_*"""
+    if status in (429, 503):
+        return FAILURE_THROTTLED
+    if status >= 500 or status == 408:
+        return FAILURE_TRANSIENT
+    return FAILURE_PERMANENT
+
+
+def classify_exception(exc):
+    """예외 → FAILURE_* (FetchError는 자체 분류, 네트워크/타임아웃 계열은 transient)"""
+    if isinstance(exc, FetchError):
+        return exc.kind
+    if isinstance(exc, (requests.Timeout, requests.ConnectionError, TimeoutError, ConnectionError)):
+        return FAILURE_TRANSIENT
+    return FAILURE_PERMANENT
+
+
+def parse_retry_after(value):
+    """Retry-After 헤더(초) → float 또는 None (HTTP-date 형식은 무시)"""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def body_kind(key):
+    """캐시 키 → 본문 종류 ('json' 또는 'html')"""
+    return 'json' if key.endswith('.json') else 'html'
+
+
+def validate_body(url, kind, text):
+    """본문이 정상 응답인지 확인, 아니면 FetchError(permanent)"""
+    if not text.strip():
+        raise FetchError(url, FAILURE_PERMANENT, 'empty body')
+    if kind == 'json':
+        try:
+            json.loads(text)
+        except ValueError as e:
+            raise FetchError(url, FAILURE_PERMANENT, 'invalid JSON') from e
+        return
+    markers = RESPONSE_MARKERS.get(kind, ())
+    if markers and not any(m in text for m in markers):
+        raise FetchError(url, FAILURE_PERMANENT, 'expected marker not found')
+
+
+def backoff_delay(attempt, kind, retry_after=None):
+    """attempt(0부터)번째 실패 후 대기 시간 (초)"""
+    if kind == FAILURE_THROTTLED:
+        wait = retry_after if retry_after is not None else RETRY_CONFIG['throttle_delay']
+        return min(RETRY_CONFIG['max_delay'], wait) * random.uniform(1.0, 1.2)
+    cap = min(RETRY_CONFIG['max_delay'], RETRY_CONFIG['base_delay'] * 2 ** attempt)
+    return random.uniform(0, cap)
+
+
+def _http_get_validated(url, key, headers, encoding):
+    """GET 1회 → (304 여부, 응답, 본문 문자열), 실패는 FetchError로 분류"""
+    try:
+        response = get_http_session().get(url, headers=headers, timeout=HTTP_TIMEOUT)
+    except requests.RequestException as e:
+        raise FetchError(url, classify_exception(e), f'{type(e).__name__}: {e}') from e
+    if response.status_code == 304:
+        return True, response, None
+    if response.status_code >= 400:
+        raise FetchError(url, classify_status(response.status_code), f'HTTP {response.status_code}',
+                         status=response.status_code,
+                         retry_after=parse_retry_after(response.headers.get('Retry-After')))
+    text = response.content.decode(encoding, errors='replace')
+    validate_body(url, body_kind(key), text)
+    return False, response, text
+
+
+# 프로세스별 fetch_cached 누계 (진행률/처리량 측정용, fetch_counters()로 사본 조회)
+_fetch_counters = {'cache_hits': 0, 'revalidated': 0, 'fetched': 0, 'stale': 0, 'bytes': 0}
+
+
+def fetch_counters():
+    """현재 프로세스의 fetch_cached 누계 사본 (cache_hits, revalidated, fetched, stale, bytes)"""
+    return dict(_fetch_counters)
+
+
+def fetch_cached(url, key, ttl=None, encoding='utf-8'):
+    """URL 본문을 캐시 키 기준으로 가져오기 (TTL + 조건부 GET)
+
+    - TTL 이내          : 캐시 본문 그대로 반환 (요청 없음)
+    - TTL 경과          : ETag/Last-Modified로 조건부 GET, 304면 캐시 본문 재사용
+    - 응답 검증 실패     : 캐시에 쓰지 않음 (transient/throttled는 RETRY_CONFIG대로 재시도)
+    - 요청 실패 + 캐시 있음: 만료된 캐시 본문 반환
+
+    Parameters:
+        url      : 요청 URL
+        key      : fin_cache 캐시 키
+        ttl      : 초 단위 TTL (None이면 fin_cache.ttl_for(key))
+        encoding : 응답 디코딩 인코딩 (FnGuide JSON은 BOM 때문에 'utf-8-sig')
+
+    Returns:
+        str : 본문 문자열
+
+    Raises:
+        FetchError: 재시도 후에도 실패했고 캐시 본문도 없는 경우
+    """
+    cache = fin_cache.get_cache_manager()
+    ttl = fin_cache.ttl_for(key) if ttl is None else ttl
+
+    if cache.is_fresh(key, ttl):
+        _fetch_counters['cache_hits'] += 1
+        return cache.read(key)
+
+    cached = cache.read(key)
+    headers = fin_cache.conditional_headers(cache.meta(key)) if cached is not None else {}
+    attempts = RETRY_CONFIG['max_attempts']
+    for attempt in range(attempts):
+        try:
+            not_modified, response, text = _http_get_validated(url, key, headers, encoding)
+            break
+        except FetchError as e:
+            if e.kind == FAILURE_PERMANENT or attempt == attempts - 1:
+                if cached is not None:
+                    _fetch_counters['stale'] += 1
+                    return cached
+                raise
+            time.sleep(backoff_delay(attempt, e.kind, e.retry_after))
+
+    if not_modified:
+        if cached is not None:
+            _fetch_counters['revalidated'] += 1
+            cache.touch(key)
+            return cached
+        raise FetchError(url, FAILURE_PERMANENT, 'HTTP 304 without cached body', status=304)
+
+    _fetch_counters['fetched'] += 1
+    _fetch_counters['bytes'] += len(response.content)
+    cache.write(key, text, etag=response.headers.get('ETag'), last_modified=response.headers.get('Last-Modified'))
+    return text
 
 
 def fetch_fnguide_page(code, asp_page, menu_id, cache_prefix):
@@ -94,39 +396,110 @@ def fetch_fnguide_page(code, asp_page, menu_id, cache_prefix):
         code         : 종목코드 (6자리 문자열)
         asp_page     : FnGuide ASP 페이지명 (예: 'SVD_Finance.asp')
         menu_id      : FnGuide NewMenuID 값 (예: '103')
-        cache_prefix : 캐시 디렉토리 접두어 (예: 'fnguide_finance_')
+        cache_prefix : 캐시 namespace 접두어 (예: 'fnguide_finance_', TTL은 fin_cache.CACHE_TTL)
 
     Returns:
         str : HTML 문자열
     """
-    now = datetime.datetime.now()
-    url = f"https://comp.fnguide.com/SVO2/ASP/{asp_page}?pGB=1&gicode=A{code}&cID=&MenuYn=Y&ReportGB=&NewMenuID={menu_id}&stkGb=701"
+    url = fnguide_page_url(code, asp_page, menu_id)
+    return fetch_cached(url, fnguide_cache_key(code, cache_prefix))
+
+
+# ── 파싱 결과 캐시 ────────────────────────────────────────────────────────────
+# 캐시된 HTML이 그대로면 BeautifulSoup 파싱을 건너뛰도록 파서 출력 dict를
+# (HTML SHA-256, 파서 이름, 파서 버전) 키로 pickle 저장한다.
+# 파서 로직이 바뀌면 각 모듈의 PARSER_VERSION을 올려 이전 결과를 무효화한다.
+# 오래된 결과는 fin_cache.CacheManager.housekeeping이 정리한다 (fin_cache.PARSE_CACHE_MAX_AGE).
+
+PARSE_CACHE_DIR = fin_cache.PARSE_CACHE_DIR
+PARSE_CACHE_ENABLED = True
 
-    downloadedFileDirectory = 'derived/{0}{1}-{2:02d}'.format(cache_prefix, now.year, now.month)
-    downloadedFilePath = '{0}/{1}.html'.format(downloadedFileDirectory, code)
 
-    os.makedirs(downloadedFileDirectory, exist_ok=True)
+def parse_cache_path(html, parser_name, parser_version):
+    """파싱 결과 캐시 파일 경로 (예: 'derived/parse_cache/finance_v1/ab/ab12....pkl')"""
+    digest = hashlib.sha256(html.encode('utf-8')).hexdigest()
+    return os.path.join(PARSE_CACHE_DIR, f'{parser_name}_v{parser_version}', digest[:2], f'{digest}.pkl')
 
-    # 이전 달 캐시 디렉토리 삭제
-    currentDirName = os.path.basename(downloadedFileDirectory)
-    for entry in os.listdir('derived'):
-        if entry.startswith(cache_prefix) and entry != currentDirName:
-            shutil.rmtree(os.path.join('derived', entry))
 
-    if os.path.exists(downloadedFilePath):
-        return open(downloadedFilePath, "r", encoding="utf-8").read()
+def cached_parse(html, parser_name, parser_version, parse_fn):
+    """parse_fn(html) 결과를 HTML 해시 기준으로 캐싱하여 반환 (None 결과도 캐싱)"""
+    if not PARSE_CACHE_ENABLED:
+        return parse_fn(html)
 
-    response = requests.get(url)
-    response.encoding = 'utf-8'
-    with open(downloadedFilePath, "w", encoding="utf-8") as f:
-        f.write(response.text)
-    return response.text
+    path = parse_cache_path(html, parser_name, parser_version)
+    try:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        pass
+
+    result = parse_fn(html)
+
+    # 여러 worker가 동시에 쓰더라도 깨진 파일이 남지 않도록 임시 파일 후 교체
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    return result
 
 
 # ── FnGuide HTML 공통 파싱 헬퍼 ────────────────────────────────────────────────
 # 모든 FnGuide 페이지(Snapshot/Finance/FinanceRatio/InvestIdx)가 공유하는
 # 공통 헤더 파싱 로직. 각 모듈에 중복 선언하지 않고 여기서 import하여 사용한다.
 
+# 파서 엔진
+#   'html.parser': 전체 페이지를 BeautifulSoup(html.parser)로 빌드 (기존 방식)
+#   'lxml'       : 전체 페이지를 BeautifulSoup(lxml)로 빌드
+#   'lxml-xpath' : lxml로 전체 페이지를 파싱한 뒤 XPath로 필요한 서브트리만 골라
+#                  BeautifulSoup으로 빌드 (파싱 결과 dict는 동일, 트리 크기만 작아짐)
+PARSER_ENGINES = ('html.parser', 'lxml', 'lxml-xpath')
+
+# 모듈별 파서 엔진 (make_soup의 engine 인자로 호출 단위 덮어쓰기 가능)
+PARSER_CONFIG = {
+    'snapshot': 'lxml-xpath',
+    'finance': 'lxml-xpath',
+    'ratio': 'lxml-xpath',
+    'investidx': 'lxml-xpath',
+}
+
+# parse_company_name / parse_kse_fics가 참조하는 공통 헤더 영역
+_HEADER_XPATHS = [
+    '//title',
+    "//div[contains(concat(' ', normalize-space(@class), ' '), ' corp_group1 ')]",
+    "//p[contains(concat(' ', normalize-space(@class), ' '), ' stxt_group ')]",
+]
+
+
+def make_soup(html, module, xpaths=(), engine=None):
+    """파서 엔진에 맞춰 BeautifulSoup 객체 생성
+
+    Args:
+        html   : FnGuide 페이지 HTML 문자열
+        module : PARSER_CONFIG 키 (engine 생략 시 기본 엔진 선택에 사용)
+        xpaths : 'lxml-xpath' 엔진에서 남길 서브트리 XPath 목록 (공통 헤더는 자동 포함)
+        engine : PARSER_ENGINES 중 하나 (None이면 PARSER_CONFIG[module])
+    """
+    engine = engine or PARSER_CONFIG.get(module, 'html.parser')
+    if engine == 'html.parser':
+        return BeautifulSoup(html, 'html.parser')
+    if engine == 'lxml':
+        return BeautifulSoup(html, 'lxml')
+    if engine != 'lxml-xpath':
+        raise ValueError(f"Unknown parser engine: {engine}")
+
+    root = lxml.html.document_fromstring(html)
+    nodes: list[lxml.html.HtmlElement] = []
+    # XPath union 결과는 문서 순서이므로 soup.find의 첫 번째 매칭 순서도 그대로 유지된다
+    for node in root.xpath(' | '.join([*_HEADER_XPATHS, *xpaths])):
+        # 이미 고른 서브트리 안쪽 노드는 중복으로 넣지 않는다
+        if not nodes or nodes[-1] not in node.iterancestors():
+            nodes.append(node)
+
+    fragment = ''.join(etree.tostring(n, encoding='unicode', method='html', with_tail=False) for n in nodes)
+    return BeautifulSoup(f'<html><body>{fragment}</body></html>', 'lxml')
+
+
 def parse_company_name(soup) -> str:
     """페이지 title 태그에서 종목명 추출
 
@@ -11,17 +11,23 @@ krxStocks 종목 기본정보 + FnGuide 각 페이지 투자지표를 결합하
   investidx - FnGuide Investment Index (SVD_Invest)
   all       - 위 모듈 전체를 순차적으로 수집하여 하나로 합침
 """
-import re
+import os
+import queue
+import threading
+import time
+from typing import Any
 import pandas as pd
 from datetime import datetime
 import multiprocessing as mp
 import krxStocks
-from fin_utils import save_styled_excel, save_styled_excel_multisheet
+from fin_columns import column_sort_key, concat_long, group_by_indicator, to_long
+from fin_utils import (PARTIAL_FAILURES_KEY, classify_exception, fetch_counters, save_styled_excel,
+                       save_styled_excel_multisheet)
 
 
 # ── 모듈 설정 ──────────────────────────────────────────────
 
-MODULE_CONFIG = {
+MODULE_CONFIG: dict[str, dict[str, Any]] = {
     'snapshot': {
         'extra_base_fields': ['마켓분야', 'FICS분야', '결산월'],
         'skip_keys': {'종목명', '마켓분야', 'FICS분야', '결산월'},
@@ -109,6 +115,9 @@ MODULE_CONFIG = {
 # 'all' 모드에서 순차 처리할 모듈 목록
 _ALL_MODULES = ['snapshot', 'finance', 'ratio', 'investidx']
 
+# 파이프라인 모드: 다운로드 시작 ~ 파싱 완료 사이에 있는 종목 수 상한 (I/O ↔ 파싱 backpressure)
+PIPELINE_QUEUE_SIZE = 64
+
 
 def _get_module_fns(module_name):
     """모듈명에 해당하는 collect_fn(code) 반환 (worker 프로세스 내에서 import)"""
@@ -128,6 +137,34 @@ def _get_module_fns(module_name):
         raise ValueError(f"Unknown module: {module_name}")
 
 
+def _get_module_targets(module_name):
+    """모듈명에 해당하는 fetchTargets(code) 반환 (비동기 prefetch용)"""
+    if module_name == 'snapshot':
+        from fnguideSnapshot import fetchTargets
+    elif module_name == 'finance':
+        from fnguideFinance import fetchTargets
+    elif module_name == 'ratio':
+        from fnguideFinanceRatio import fetchTargets
+    elif module_name == 'investidx':
+        from fnguideInvestIdx import fetchTargets
+    else:
+        raise ValueError(f"Unknown module: {module_name}")
+    return fetchTargets
+
+
+def build_fetch_jobs(codes, module_name):
+    """종목코드 목록 × 모듈 페이지 → fin_fetch.FetchJob 리스트"""
+    from fin_fetch import FetchJob
+
+    modules = _ALL_MODULES if module_name == 'all' else [module_name]
+    jobs: list[FetchJob] = []
+    for mod in modules:
+        targets_fn = _get_module_targets(mod)
+        for code in codes:
+            jobs.extend(FetchJob(*t) for t in targets_fn(code))
+    return jobs
+
+
 def _get_indicator_order(module_name):
     """모듈에 해당하는 indicator_order 반환 ('all'이면 전체 합산)"""
     if module_name == 'all':
@@ -140,22 +177,72 @@ def _get_indicator_order(module_name):
 
 # ── 단일 종목 처리 ─────────────────────────────────────────
 
-def process_single_stock(args):
+def parse_stock_pages(args):
     """
-    단일 종목 처리 (multiprocessing용)
+    단일 종목의 모듈별 페이지를 한 번씩 가져와 파싱 (multiprocessing용)
 
     Args:
-        args: (stock_row, module_name) 튜플
-              stock_row - scode, sname, industry, products 키를 가진 딕셔너리
-              module_name - MODULE_CONFIG 키 ('all' 포함)
+        args: (stock_row, module_name) 튜플 — process_single_stock과 동일
 
     Returns:
-        dict 또는 None
+        (stock_row, {module: dict 또는 None})
+    """
+    stock_row, parsed, _, _ = _parse_stock_pages(args)
+    return stock_row, parsed
+
+
+def _parse_stock_pages(args):
+    """
+    parse_stock_pages + 모듈별 실패 정보 / 조회 통계
+
+    Returns:
+        (stock_row, parsed, errors, metrics)
+        errors : {module: {'kind': FAILURE_*, 'message': str}} — 실패한 모듈만
+                 결과는 살리고 일부만 실패한 경우(PARTIAL_FAILURES_KEY)는 '{module}.{부분명}' 키로 추가
+        metrics: {module: fin_utils.fetch_counters 증가분 + 'seconds'} — fin_metrics.RunMetrics 입력
     """
     stock_row, module_name = args
 
     modules_to_process = _ALL_MODULES if module_name == 'all' else [module_name]
 
+    code = stock_row['scode']
+    parsed = {}
+    errors = {}
+    metrics = {}
+
+    for mod in modules_to_process:
+        before = fetch_counters()
+        started = time.perf_counter()
+        try:
+            collect_fn = _get_module_fns(mod)
+            parsed[mod] = collect_fn(code)
+            partial = parsed[mod].pop(PARTIAL_FAILURES_KEY, {}) if parsed[mod] else {}
+            for part, error in partial.items():
+                errors[f'{mod}.{part}'] = error
+                print(f"  ERROR [{mod}.{part}] - {stock_row.get('sname', '')}({code}): {error['message']}")
+        except Exception as e:
+            parsed[mod] = None
+            errors[mod] = {'kind': classify_exception(e), 'message': f'{type(e).__name__}: {e}'}
+            print(f"  ERROR [{mod}] - {stock_row.get('sname', '')}({code}): {e}")
+        after = fetch_counters()
+        metrics[mod] = {k: after[k] - before[k] for k in after}
+        metrics[mod]['seconds'] = time.perf_counter() - started
+
+    return stock_row, parsed, errors, metrics
+
+
+def merge_stock_row(stock_row, parsed, modules):
+    """
+    krxStocks 기본정보 + 모듈별 파싱 결과를 하나의 행 dict로 합침
+
+    Args:
+        stock_row: scode, sname, industry, products 키를 가진 딕셔너리
+        parsed   : {module: dict 또는 None} (parse_stock_pages 결과)
+        modules  : 합칠 모듈 목록 (순서대로 덮어씀)
+
+    Returns:
+        dict 또는 None (모든 모듈에 데이터가 없는 경우)
+    """
     code = stock_row['scode']
 
     # krxStocks 기본정보 + FnGuide 파싱 데이터 합치기
@@ -168,31 +255,26 @@ def process_single_stock(args):
 
     has_data = False
 
-    for mod in modules_to_process:
+    for mod in modules:
         config = MODULE_CONFIG[mod]
-        try:
-            collect_fn = _get_module_fns(mod)
-            indicators = collect_fn(code)
-            if indicators is None:
-                continue
-
-            has_data = True
+        indicators = parsed.get(mod)
+        if indicators is None:
+            continue
 
-            # 종목명 보완 (krxStocks에 없을 경우 파싱 데이터에서 가져오기)
-            if not row['종목명']:
-                row['종목명'] = indicators.get('종목명', '')
+        has_data = True
 
-            # 모듈별 추가 기본 필드 (예: snapshot의 마켓분야, FICS분야)
-            for field in config['extra_base_fields']:
-                row[field] = indicators.get(field, '')
+        # 종목명 보완 (krxStocks에 없을 경우 파싱 데이터에서 가져오기)
+        if not row['종목명']:
+            row['종목명'] = indicators.get('종목명', '')
 
-            # 파싱 데이터 중 skip_keys를 제외한 나머지 추가
-            for k, v in indicators.items():
-                if k not in config['skip_keys']:
-                    row[k] = v
+        # 모듈별 추가 기본 필드 (예: snapshot의 마켓분야, FICS분야)
+        for field in config['extra_base_fields']:
+            row[field] = indicators.get(field, '')
 
-        except Exception as e:
-            print(f"  ERROR [{mod}] - {stock_row.get('sname', '')}({code}): {e}")
+        # 파싱 데이터 중 skip_keys를 제외한 나머지 추가
+        for k, v in indicators.items():
+            if k not in config['skip_keys']:
+                row[k] = v
 
     if not has_data:
         return None
@@ -200,41 +282,26 @@ def process_single_stock(args):
     return row
 
 
-# ── 컬럼 정렬 ──────────────────────────────────────────────
-
-def _col_sort_key(col):
-    """컬럼 정렬 키: 연간 데이터가 분기 데이터보다 먼저 오도록 정렬
-
-    예: 2023(연간)_매출액 → (0, 2023, 0, ...)   ← 연간 타입=0 으로 분기보다 항상 앞
-        2024/1Q_매출액    → (1, 2024, 1, ...)   ← 분기 타입=1
-        2025(연간)_매출액 → (0, 2025, 0, ...)   ← 연도가 커도 연간은 분기보다 앞
+def process_single_stock(args):
     """
-    m_annual = re.match(r'^(\d{4})\(연간\)', col)
-    if m_annual:
-        return (0, int(m_annual.group(1)), 0, col)
-    m_quarter = re.match(r'^(\d{4})/(\d)Q', col)
-    if m_quarter:
-        return (1, int(m_quarter.group(1)), int(m_quarter.group(2)), col)
-    return (2, 0, 0, col)
-
+    단일 종목 처리 (multiprocessing용)
 
-def _col_matches_indicator(col, indicator):
-    """컬럼명이 해당 지표에 속하는지 판별
+    Args:
+        args: (stock_row, module_name) 튜플
+              stock_row - scode, sname, industry, products 키를 가진 딕셔너리
+              module_name - MODULE_CONFIG 키 ('all' 포함)
 
-    매칭 패턴:
-      - 정확히 일치: '발행주식수(천주)' == '발행주식수(천주)'
-      - {indicator}_{suffix}: 'EPS_y-3', '당기순이익_2022/09'
-      - {year}_{indicator}: '2023_영업이익률(%)'
+    Returns:
+        dict 또는 None
     """
-    if col == indicator:
-        return True
-    if col.startswith(f'{indicator}_'):
-        return True
-    if f'_{indicator}' in col:
-        return True
-    return False
+    stock_row, parsed = parse_stock_pages(args)
+    module_name = args[1]
+    modules = _ALL_MODULES if module_name == 'all' else [module_name]
+    return merge_stock_row(stock_row, parsed, modules)
 
 
+# ── 컬럼 정렬 ──────────────────────────────────────────────
+
 def _order_columns(df, indicator_order):
     """
     최종 DataFrame의 컬럼 순서 정렬
@@ -245,57 +312,381 @@ def _order_columns(df, indicator_order):
     base_cols = ['종목코드', '종목명', '업종', '주요제품', '마켓분야', 'FICS분야', '결산월']
     ordered = [c for c in base_cols if c in df.columns]
 
-    remaining = [c for c in df.columns if c not in ordered]
-
-    for indicator in indicator_order:
-        matched = sorted((c for c in remaining if _col_matches_indicator(c, indicator)), key=_col_sort_key)
+    remaining = [c for c in df.columns if c not in base_cols]
+    groups, unmatched = group_by_indicator(remaining, indicator_order)
+    for matched in groups:
         ordered.extend(matched)
-        remaining = [c for c in remaining if c not in matched]
 
     # indicator_order에 포함되지 않은 나머지 컬럼 추가
-    ordered.extend(sorted(remaining, key=_col_sort_key))
+    ordered.extend(sorted(unmatched, key=column_sort_key))
 
     return df[ordered]
 
 
 # ── 전종목 수집 ────────────────────────────────────────────
 
-def collect_all_stocks(module_name='snapshot', use_multiprocessing=True):
+def _print_fetch_stats(stats):
+    """fin_fetch 다운로드 통계 출력"""
+    print(f"요청: {stats['requested']}개, 다운로드: {stats['fetched']}개, 재검증(304): {stats['revalidated']}개, "
+          f"캐시: {stats['cached']}개, 실패: {stats['failed']}개, 재시도: {stats.get('retried', 0)}회")
+    if stats.get('failures'):
+        print("실패 분류: " + ", ".join(f"{kind} {n}개" for kind, n in sorted(stats['failures'].items())))
+
+
+def _collect_pipelined(stock_rows, module_name, fetch_options=None, worker=None, on_result=None):
+    """
+    다운로드/파싱 2단계 파이프라인 수집
+
+    - I/O 단계 : 별도 스레드의 fin_fetch 비동기 엔진이 종목별 페이지를 캐시에 저장하고
+                 완료된 종목코드를 bounded queue에 넣는다.
+    - 파싱 단계: 코어 수 크기의 mp.Pool이 큐에서 꺼낸 종목을 캐시 적중으로 파싱한다.
+
+    I/O 단계는 슬롯(PIPELINE_QUEUE_SIZE개)을 얻어야 종목 다운로드를 시작하고 파싱이 끝나야
+    슬롯이 반환되므로, 파싱이 밀리면 다운로드가 멈추고 다운로드가 밀리면 파싱 worker가 대기한다.
+
+    Args:
+        worker: (stock_row, module_name)을 받는 파싱 함수 (기본 process_single_stock)
+        on_result: worker 결과를 받을 때마다 호출할 함수 (결과 수신 스레드에서 호출)
+
+    Returns:
+        list: worker 결과 (stock_rows 순서, 실패 종목은 None)
+    """
+    worker = worker or process_single_stock
+    from fin_fetch import FetchJob, prefetch_groups_to_queue
+
+    modules = _ALL_MODULES if module_name == 'all' else [module_name]
+    targets_fns = [_get_module_targets(mod) for mod in modules]
+    groups = [
+        (i, [FetchJob(*t) for fn in targets_fns for t in fn(row['scode'])])
+        for i, row in enumerate(stock_rows)
+    ]
+
+    ready: queue.Queue[int | None] = queue.Queue()
+    slots = threading.BoundedSemaphore(PIPELINE_QUEUE_SIZE)
+    fetch_stats = {}
+
+    def fetch_stage():
+        fetch_stats.update(prefetch_groups_to_queue(groups, ready, slots, **(fetch_options or {})))
+
+    fetcher = threading.Thread(target=fetch_stage, name='fnguide-fetch', daemon=True)
+    fetcher.start()
+
+    results = [None] * len(stock_rows)
+
+    with mp.Pool(processes=mp.cpu_count()) as pool:
+        pending = []
+        while True:
+            i = ready.get()
+            if i is None:
+                break
+
+            def done(row, i=i):
+                results[i] = row
+                slots.release()
+                if on_result is not None:
+                    on_result(row)
+
+            def failed(e, i=i):
+                print(f"  ERROR [parse] {stock_rows[i]['scode']}: {e}")
+                slots.release()
+
+            pending.append(pool.apply_async(
+                worker, ((stock_rows[i], module_name),),
+                callback=done, error_callback=failed,
+            ))
+
+        for task in pending:
+            task.wait()
+
+    fetcher.join()
+    if fetch_stats:
+        _print_fetch_stats(fetch_stats)
+    return results
+
+
+def prepare_cache():
+    """수집 시작 전 1회 캐시 정리 (예전 월별 캐시 삭제, 캐시 색인 적재)"""
+    import fin_cache
+
+    removed = fin_cache.get_cache_manager().housekeeping()
+    if removed:
+        print(f"예전 월별 캐시 디렉토리 {removed}개 삭제")
+
+
+def load_stock_rows():
+    """krxStocks 전체 종목 → [{scode, sname, industry, products}, ...]"""
+    stock_list, _ = krxStocks.getCorpList()
+    print(f"\n총 {len(stock_list)}개 종목 발견")
+
+    # market 컬럼을 제외한 dict 리스트 생성
+    return stock_list.drop(columns=['market'], errors='ignore').to_dict('records')
+
+
+def journal_path(module_name, now=None):
+    """실행 저널 경로 (예: 'derived/journal/finance_2026_04.jsonl')"""
+    from fin_journal import JOURNAL_DIR
+
+    now = now or datetime.now()
+    prefix = MODULE_CONFIG[module_name]['output_prefix']
+    return os.path.join(JOURNAL_DIR, f"{prefix}_{now.year}_{now.month:02d}.jsonl")
+
+
+def _parse_into_journal(stock_rows, module_name, journal, use_multiprocessing=True, async_fetch=False,
+                        fetch_options=None, pipeline=False):
+    """
+    종목별 파싱 결과를 끝나는 대로 저널에 기록 (collect_all_stocks / collect_unified 공용)
+
+    pool.map처럼 전체가 끝날 때까지 결과를 들고 있지 않으므로, 중간에 중단되어도
+    그때까지 처리한 종목은 저널에 남는다. 결과는 끝난 순서대로(imap_unordered, chunksize=1)
+    받으므로 응답이 느린 종목이 다른 종목의 결과 전달을 막지 않는다.
+
+    Returns:
+        fin_metrics.RunMetrics: 진행률/처리량 누적 결과
+    """
+    from fin_metrics import RunMetrics
+
+    metrics = RunMetrics(module_name, total=len(stock_rows))
+    if not stock_rows:
+        return metrics
+
+    def on_result(result):
+        stock_row, parsed, errors, stock_metrics = result
+        journal.record_stock(stock_row, parsed, errors)
+        metrics.update(stock_metrics)
+
+    if async_fetch and not pipeline:
+        from fin_fetch import prefetch_to_cache
+
+        print("\n" + "=" * 50)
+        print("FnGuide 페이지 비동기 다운로드")
+        print("=" * 50)
+        jobs = build_fetch_jobs([row['scode'] for row in stock_rows], module_name)
+        stats = prefetch_to_cache(jobs, **(fetch_options or {}))
+        _print_fetch_stats(stats)
+        metrics.extra['prefetch'] = stats
+
+    args_list = [(row, module_name) for row in stock_rows]
+    if pipeline:
+        _collect_pipelined(stock_rows, module_name, fetch_options, worker=_parse_stock_pages, on_result=on_result)
+    elif use_multiprocessing:
+        with mp.Pool(processes=mp.cpu_count()) as pool:
+            for result in pool.imap_unordered(_parse_stock_pages, args_list, chunksize=1):
+                on_result(result)
+    else:
+        for args in args_list:
+            on_result(_parse_stock_pages(args))
+
+    metrics.print_summary()
+    return metrics
+
+
+def _save_metrics(metrics, path):
+    """실행 지표를 JSON Lines 파일에 추가 (path가 None이면 생략)"""
+    if path is None:
+        return
+    from fin_metrics import append_metrics
+
+    print(f"실행 지표 기록: {append_metrics(metrics.summary(), path)}")
+
+
+def _report_failures(journal):
+    """실행 종료 시 실패 보고 (모듈 × 실패 분류별 건수 출력 + JSON 보고서)"""
+    path, counts = journal.write_failure_report()
+    if not counts:
+        return
+    print("\n=== 실패 보고 ===")
+    for (module, kind), n in sorted(counts.items(), key=str):
+        print(f"  [{module}] {kind}: {n}개")
+    print(f"  상세: {path} (--resume으로 실패 종목만 재수집)")
+
+
+def _open_journal(module_name, stock_rows, resume, path=None, delta=False):
+    """
+    저널 열기 + 이번 실행에서 처리할 종목 (resume/delta이면 미완료/실패 종목만)
+
+    delta이면 이번 달 저널이 없을 때 직전 월 저널을 복사해 이어 받는다 (fin_journal.seed_journal).
+    """
+    from fin_journal import RunJournal, seed_journal
+
+    modules = _ALL_MODULES if module_name == 'all' else [module_name]
+    path = path or journal_path(module_name)
+    if delta:
+        source = seed_journal(path)
+        if source:
+            print(f"변경분 수집: 직전 저널에서 시작 ({source} → {path})")
+    resume = resume or delta
+    journal = RunJournal(path, resume=resume)
+    pending = journal.pending(stock_rows, modules) if resume else stock_rows
+    if resume:
+        print(f"재개: 완료 {len(stock_rows) - len(pending)}개, 남은 종목 {len(pending)}개 ({journal.path})")
+    return journal, pending
+
+
+# ── 변경분 수집 (--delta) ──────────────────────────────────
+# 종목별 최근 실적 기간(Snapshot Financial Highlight 헤더, TTL 1일)을 저널에 남겨 두고,
+# 다음 실행에서는 기간이 바뀐 종목만 페이지 캐시를 만료시켜 다시 받아 파싱한다.
+# 단, snapshot 모듈은 주가 연동 지표(PER, PBR, 배당수익률, 시가총액)가 매번 바뀌므로
+# 기간 확인 때 받은 페이지로 전 종목을 다시 파싱한다 (추가 다운로드 없음).
+# 결과는 이전 저널 레코드를 덮어쓰고, 산출물은 저널 전체에서 다시 조립한다.
+# 기간 기록이 없는 종목(첫 --delta 실행, 신규 상장)은 변경된 것으로 본다.
+
+def _latest_period(code):
+    """(code, 'YYYY/MM' 또는 None, 오류 메시지 또는 None) — multiprocessing용"""
+    from fnguideSnapshot import latestPeriod
+
+    try:
+        return code, latestPeriod(code), None
+    except Exception as e:
+        return code, None, f'{type(e).__name__}: {e}'
+
+
+def fetch_latest_periods(codes, use_multiprocessing=True, async_fetch=False, fetch_options=None):
+    """
+    종목별 최근 실적 기간 조회 (Snapshot 페이지 1개씩)
+
+    Returns:
+        {code: 'YYYY/MM' 또는 None} — 조회에 실패한 종목은 제외
+    """
+    if async_fetch:
+        from fin_fetch import prefetch_to_cache
+
+        _print_fetch_stats(prefetch_to_cache(build_fetch_jobs(codes, 'snapshot'), **(fetch_options or {})))
+
+    if use_multiprocessing and len(codes) > 1:
+        with mp.Pool(processes=mp.cpu_count()) as pool:
+            results = list(pool.imap_unordered(_latest_period, codes, chunksize=16))
+    else:
+        results = [_latest_period(code) for code in codes]
+
+    periods = {}
+    for code, period, error in results:
+        if error:
+            print(f"  ERROR [period] - {code}: {error}")
+        else:
+            periods[code] = period
+    return periods
+
+
+def _plan_delta(module_name, stock_rows, journal, pending, use_multiprocessing=True, async_fetch=False,
+                fetch_options=None):
+    """
+    변경분 수집 대상 결정 + 대상 종목의 페이지 캐시 만료
+
+    Returns:
+        (periods, targets, refresh)
+        periods: {code: 'YYYY/MM' 또는 None} — 이번에 조회한 최근 실적 기간
+        targets: 미완료/실패 종목 + 최근 실적 기간이 저널 기록과 다른 종목 (stock_rows 순서)
+        refresh: snapshot만 다시 파싱할 나머지 종목 (module_name에 snapshot이 없으면 빈 목록)
+    """
+    import fin_cache
+
+    print("\n" + "=" * 50)
+    print("최근 실적 기간 확인 (Snapshot)")
+    print("=" * 50)
+    periods = fetch_latest_periods([row['scode'] for row in stock_rows], use_multiprocessing, async_fetch,
+                                   fetch_options)
+
+    pending_codes = {row['scode'] for row in pending}
+    changed = [row for row in stock_rows
+               if row['scode'] not in pending_codes
+               and row['scode'] in periods and periods[row['scode']] != journal.period(row['scode'])]
+    target_codes = pending_codes | {row['scode'] for row in changed}
+    targets = [row for row in stock_rows if row['scode'] in target_codes]
+
+    # Snapshot 페이지는 방금 받았으므로 나머지 모듈 페이지만 재검증 대상으로
+    modules = _ALL_MODULES if module_name == 'all' else [module_name]
+    keys = [job.cache_key for mod in modules if mod != 'snapshot'
+            for job in build_fetch_jobs([row['scode'] for row in changed], mod)]
+    expired = fin_cache.get_cache_manager().expire(keys)
+
+    refresh = [row for row in stock_rows if row['scode'] not in target_codes] if 'snapshot' in modules else []
+
+    print(f"변경분: 기간 변경 {len(changed)}개, 미완료/실패 {len(pending)}개, "
+          f"기간 조회 실패 {len(stock_rows) - len(periods)}개 → 처리 {len(targets)}개 / 전체 {len(stock_rows)}개 "
+          f"(캐시 만료 {expired}개, Snapshot만 재파싱 {len(refresh)}개)")
+    return periods, targets, refresh
+
+
+def _refresh_snapshots(journal, rows, use_multiprocessing=True):
+    """
+    변경분 수집에서 제외된 종목의 snapshot만 다시 파싱 (주가 연동 지표 갱신)
+
+    Snapshot 페이지는 _plan_delta의 기간 확인 때 받아 두었으므로 캐시 적중으로 파싱만 한다.
+
+    Returns:
+        fin_metrics.RunMetrics
+    """
+    if rows:
+        print("\n" + "=" * 50)
+        print(f"Snapshot 재파싱 (실적 기간 변경 없음 {len(rows)}개)")
+        print("=" * 50)
+    return _parse_into_journal(rows, 'snapshot', journal, use_multiprocessing)
+
+
+def _record_periods(journal, rows, modules, periods):
+    """처리를 마친 종목의 최근 실적 기간 기록 (실패한 종목은 다음 실행에서 다시 대상)"""
+    for row in rows:
+        code = row['scode']
+        if code in periods and journal.is_done(code, modules):
+            journal.record_period(row, periods[code])
+
+
+def collect_all_stocks(module_name='snapshot', use_multiprocessing=True, async_fetch=False, fetch_options=None,
+                       pipeline=False, resume=False, metrics_path=None, delta=False):
     """
     KRX 전체 종목에 대해 투자지표 수집
 
     Args:
         module_name: MODULE_CONFIG 키 (snapshot, finance, ratio, investidx, all)
         use_multiprocessing: 멀티프로세싱 사용 여부
+        async_fetch: True면 파싱 전에 fin_fetch 비동기 엔진으로 캐시를 미리 채움
+                     (worker는 캐시 적중으로 파싱만 수행)
+        fetch_options: AsyncFetcher 인자 dict (max_per_host, rate_per_sec, burst, timeout)
+        pipeline: True면 다운로드와 파싱을 겹쳐 실행하는 2단계 파이프라인 사용
+                  (_collect_pipelined 참고, async_fetch/use_multiprocessing 무시)
+        resume: True면 이번 달 실행 저널을 이어 받아 미완료/실패 종목만 처리
+                (False면 저널을 새로 시작)
+        metrics_path: 지정하면 실행 지표(fin_metrics.RunMetrics.summary)를 이 JSON Lines 파일에 추가
+        delta: True면 저널(없으면 직전 월 저널)을 이어 받아 미완료/실패 종목과
+               최근 실적 기간이 바뀐 종목만 다시 수집 (_plan_delta 참고).
+               snapshot은 기간 확인 때 받은 페이지로 전 종목 다시 파싱
 
     Returns:
         DataFrame 또는 None
     """
     config = MODULE_CONFIG[module_name]
+    modules = _ALL_MODULES if module_name == 'all' else [module_name]
 
     print("=" * 50)
     print("종목 리스트 가져오기")
     print("=" * 50)
 
-    stock_list, _ = krxStocks.getCorpList()
-    print(f"\n총 {len(stock_list)}개 종목 발견")
-
-    # market 컬럼을 제외한 dict 리스트 생성
-    stock_rows = stock_list.drop(columns=['market'], errors='ignore').to_dict('records')
-    args_list = [(row, module_name) for row in stock_rows]
+    prepare_cache()
+    stock_rows = load_stock_rows()
+    journal, pending = _open_journal(module_name, stock_rows, resume, delta=delta)
+    periods = None
+    refresh = []
+    if delta:
+        periods, pending, refresh = _plan_delta(module_name, stock_rows, journal, pending, use_multiprocessing,
+                                                async_fetch, fetch_options)
 
     print("\n" + "=" * 50)
     print(f"{config['description']} 데이터 수집 시작")
     print("=" * 50)
 
-    if use_multiprocessing:
-        with mp.Pool(processes=mp.cpu_count()) as pool:
-            results = pool.map(process_single_stock, args_list)
-    else:
-        results = [process_single_stock(args) for args in args_list]
+    with journal:
+        metrics = _parse_into_journal(pending, module_name, journal, use_multiprocessing, async_fetch,
+                                      fetch_options, pipeline)
+        if periods is not None:
+            _record_periods(journal, pending, modules, periods)
+        if refresh:
+            metrics.extra['snapshot_refresh'] = _refresh_snapshots(journal, refresh, use_multiprocessing).summary()
+        _save_metrics(metrics, metrics_path)
+        results = [merge_stock_row(row, journal.parsed(row['scode'], modules), modules) for row in stock_rows]
+        _report_failures(journal)
 
     valid_results = [r for r in results if r is not None]
-    print(f"\n성공: {len(valid_results)}개 / 전체: {len(stock_list)}개")
+    print(f"\n성공: {len(valid_results)}개 / 전체: {len(stock_rows)}개")
 
     if not valid_results:
         print("수집된 데이터가 없습니다.")
@@ -312,13 +703,40 @@ def _filter_industry_columns(df, indicators):
     base_cols = [c for c in ['종목코드', '종목명', '업종', '주요제품', '마켓분야', 'FICS분야', '결산월'] if c in df.columns]
     remaining = [c for c in df.columns if c not in base_cols]
 
-    ordered = []
-    for indicator in indicators:
-        matched = sorted((c for c in remaining if _col_matches_indicator(c, indicator)), key=_col_sort_key)
-        ordered.extend(matched)
-        remaining = [c for c in remaining if c not in matched]
+    groups, _ = group_by_indicator(remaining, indicators)
+    return base_cols + [c for matched in groups for c in matched]
+
+
+def _split_industry_sheets(df, industry_order, indicators_by_type):
+    """
+    DataFrame을 업종 타입별 시트로 분리 (groupby 1회)
+
+    업종 타입은 (마켓분야, FICS분야) 고유 조합 단위로 분류하고(detect_industry_types),
+    각 업종 시트에는 해당 업종 지표 중 값이 하나라도 있는 컬럼만 남긴다 (기본 컬럼은 항상 포함).
+
+    Returns:
+        [(sheet_name, DataFrame), ...] — industry_order 순서, 데이터가 있는 업종만 포함
+    """
+    from fnguideFinanceRatio import detect_industry_types
+
+    empty = pd.Series('', index=df.index)
+    itypes = detect_industry_types(df['마켓분야'] if '마켓분야' in df.columns else empty,
+                                   df['FICS분야'] if 'FICS분야' in df.columns else empty)
+    groups = {itype: idf for itype, idf in df.groupby(itypes, sort=False)}
 
-    return base_cols + ordered
+    sheets = []
+    for itype in industry_order:
+        idf = groups.get(itype)
+        if idf is None:
+            continue
+        idf = idf.reset_index(drop=True)
+        cols = _filter_industry_columns(idf, indicators_by_type.get(itype, []))
+        base = [c for c in ['종목코드', '종목명', '업종', '주요제품', '마켓분야', 'FICS분야', '결산월'] if c in cols]
+        indicator_cols = [c for c in cols if c not in base]
+        has_value = idf[indicator_cols].notna().any()
+        sheets.append((itype, idf[base + [c for c in indicator_cols if has_value[c]]]))
+
+    return sheets
 
 
 def _build_ratio_sheets(df):
@@ -329,7 +747,7 @@ def _build_ratio_sheets(df):
         [(sheet_name, DataFrame), ...] — 데이터가 있는 업종만 포함
     """
     from fnguideFinanceRatio import (
-        detect_industry_type, INDUSTRY_INDICATORS,
+        INDUSTRY_INDICATORS,
         INDUSTRY_TYPE_MANUFACTURING, INDUSTRY_TYPE_BANKING,
         INDUSTRY_TYPE_SECURITIES, INDUSTRY_TYPE_INSURANCE,
         INDUSTRY_TYPE_VENTURE,
@@ -343,29 +761,7 @@ def _build_ratio_sheets(df):
         INDUSTRY_TYPE_VENTURE,
     ]
 
-    market_col = '마켓분야' if '마켓분야' in df.columns else None
-    fics_col   = 'FICS분야' if 'FICS분야' in df.columns else None
-
-    def get_type(row):
-        market = row[market_col] if market_col else ''
-        fics   = row[fics_col]   if fics_col   else ''
-        return detect_industry_type(market, fics)
-
-    df = df.copy()
-    df['_itype'] = df.apply(get_type, axis=1)
-
-    sheets = []
-    for itype in industry_order:
-        idf = df[df['_itype'] == itype].drop(columns=['_itype']).reset_index(drop=True)
-        if idf.empty:
-            continue
-        cols = _filter_industry_columns(idf, INDUSTRY_INDICATORS.get(itype, []))
-        # 값이 하나라도 있는 컬럼만 유지 (기본 컬럼은 항상 포함)
-        base = [c for c in ['종목코드', '종목명', '업종', '주요제품', '마켓분야', 'FICS분야', '결산월'] if c in cols]
-        indicator_cols = [c for c in cols if c not in base and idf[c].notna().any()]
-        sheets.append((itype, idf[base + indicator_cols]))
-
-    return sheets
+    return _split_industry_sheets(df, industry_order, INDUSTRY_INDICATORS)
 
 
 def _build_finance_sheets(df):
@@ -381,7 +777,6 @@ def _build_finance_sheets(df):
         [(sheet_name, DataFrame), ...] — 데이터가 있는 업종만 포함
     """
     from fnguideFinanceRatio import (
-        detect_industry_type,
         INDUSTRY_TYPE_MANUFACTURING, INDUSTRY_TYPE_BANKING,
         INDUSTRY_TYPE_SECURITIES, INDUSTRY_TYPE_INSURANCE,
         INDUSTRY_TYPE_VENTURE,
@@ -408,36 +803,24 @@ def _build_finance_sheets(df):
         INDUSTRY_TYPE_VENTURE,
     ]
 
-    market_col = '마켓분야' if '마켓분야' in df.columns else None
-    fics_col   = 'FICS분야' if 'FICS분야' in df.columns else None
+    return _split_industry_sheets(df, industry_order, finance_indicators)
 
-    def get_type(row):
-        market = row[market_col] if market_col else ''
-        fics   = row[fics_col]   if fics_col   else ''
-        return detect_industry_type(market, fics)
 
-    df = df.copy()
-    df['_itype'] = df.apply(get_type, axis=1)
-
-    sheets = []
-    for itype in industry_order:
-        idf = df[df['_itype'] == itype].drop(columns=['_itype']).reset_index(drop=True)
-        if idf.empty:
-            continue
-        cols = _filter_industry_columns(idf, finance_indicators.get(itype, []))
-        base = [c for c in ['종목코드', '종목명', '업종', '주요제품', '마켓분야', 'FICS분야', '결산월'] if c in cols]
-        indicator_cols = [c for c in cols if c not in base and idf[c].notna().any()]
-        sheets.append((itype, idf[base + indicator_cols]))
+def output_path(module_name, ext, now=None, suffix=''):
+    """
+    모듈 산출물 경로 (예: './derived/finance_2026_04.xlsx', ext='parquet'이면 .parquet)
 
-    return sheets
+    suffix: 파일명 끝에 붙일 문자열 (예: TEST_SUFFIX → './derived/finance_2026_04_test.parquet')
+    """
+    config = MODULE_CONFIG[module_name]
+    now = now or datetime.now()
+    return f"./derived/{config['output_prefix']}_{now.year}_{now.month:02d}{suffix}.{ext}"
 
 
 def save_to_excel(df, module_name='snapshot', filename=None):
     """DataFrame을 Excel 파일로 저장 (ratio/finance 모듈은 업종별 멀티시트)"""
     if filename is None:
-        config = MODULE_CONFIG[module_name]
-        now = datetime.now()
-        filename = f"./derived/{config['output_prefix']}_{now.year}_{now.month:02d}.xlsx"
+        filename = output_path(module_name, 'xlsx')
 
     if module_name == 'ratio':
         sheets = _build_ratio_sheets(df)
@@ -458,6 +841,263 @@ def save_to_excel(df, module_name='snapshot', filename=None):
     return filename
 
 
+# ── 데이터셋 저장 (Parquet / Feather) ─────────────────────
+# 전략 모듈(strat_utils.load_all_data)이 읽는 기본 데이터. Excel은 보기용 산출물이다.
+# 업종별 시트로 나누지 않은 전체 DataFrame을 고정 스키마로 저장한다:
+#   종목코드/기본 문자열 컬럼 → string, 결산월 → Int64,
+#   숫자로만 이루어진 지표 컬럼 → float64, 그 외(예: 연결여부, 팩터_업종명) → string
+
+DATASET_FORMATS = ('parquet', 'feather')
+TEST_SUFFIX = '_test'  # 테스트 모드 데이터셋 파일명 접미사 (전략 로더가 읽지 않음)
+_STRING_BASE_COLS = ['종목코드', '종목명', '업종', '주요제품', '마켓분야', 'FICS분야']
+
+
+def to_dataset_schema(df):
+    """DataFrame → 데이터셋 고정 스키마로 변환한 사본"""
+    out = {}
+    for col in df.columns:
+        s = df[col]
+        if col == '종목코드':
+            out[col] = s.astype('string').str.zfill(6)
+        elif col in _STRING_BASE_COLS:
+            out[col] = s.astype('string')
+        elif col == '결산월':
+            out[col] = pd.to_numeric(s, errors='coerce').astype('Int64')
+        elif pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s):
+            out[col] = s.astype('float64')
+        else:
+            numeric = pd.to_numeric(s, errors='coerce')
+            if numeric.notna().sum() == s.notna().sum():
+                out[col] = numeric.astype('float64')
+            else:
+                out[col] = s.astype('string')
+    return pd.DataFrame(out, index=df.index).reset_index(drop=True)
+
+
+def save_dataset(df, module_name='snapshot', fmt='parquet', filename=None, suffix=''):
+    """
+    DataFrame을 Parquet/Feather 데이터셋으로 저장 (pyarrow 필요)
+
+    suffix: 기본 파일명 끝에 붙일 문자열 (테스트 모드는 TEST_SUFFIX — 전략 로더가 읽는
+            월별 데이터셋을 테스트 규모 결과로 덮어쓰지 않도록)
+
+    Returns:
+        str: 저장 경로, pyarrow가 없으면 None
+    """
+    if fmt not in DATASET_FORMATS:
+        raise ValueError(f"Unknown dataset format: {fmt}")
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        print("pyarrow 미설치 - 데이터셋 저장 생략 (Excel만 저장)")
+        return None
+
+    if filename is None:
+        filename = output_path(module_name, fmt, suffix=suffix)
+
+    frame = to_dataset_schema(df)
+    if fmt == 'parquet':
+        frame.to_parquet(filename, index=False)
+    else:
+        frame.to_feather(filename)
+
+    print(f"데이터셋 저장 완료: {filename}")
+    return filename
+
+
+def save_history(df, module_name, collected_at=None):
+    """
+    DataFrame을 시점 기준 이력 저장소(fin_history)에 추가 (pyarrow 필요)
+
+    월별 데이터셋은 다음 달 실행이 덮어쓰므로 백테스트용 과거 스냅샷은 여기에 쌓는다.
+
+    Returns:
+        str: 저장 경로, pyarrow가 없으면 None
+    """
+    import fin_history
+
+    if fin_history.pq is None:
+        print("pyarrow 미설치 - 이력 저장 생략")
+        return None
+
+    path = fin_history.append(to_dataset_schema(df), module_name, collected_at)
+    print(f"이력 저장 완료: {path}")
+    return path
+
+
+def save_long_dataset(frames, filename=None):
+    """
+    모듈별 wide DataFrame → long(tidy) 테이블 하나로 합쳐 Parquet 저장 (pyarrow 필요)
+
+    스키마는 fin_columns.LONG_COLUMNS (종목코드, source, metric, period_type, period_end, value).
+    wide 형태가 필요하면 fin_columns.pivot_wide로 복원한다.
+
+    Args:
+        frames  : {module_name: DataFrame 또는 None}
+        filename: 저장 경로 (None이면 './derived/fnguide_long_YYYY_MM.parquet')
+
+    Returns:
+        str: 저장 경로, pyarrow가 없으면 None
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        print("pyarrow 미설치 - long 테이블 저장 생략")
+        return None
+
+    if filename is None:
+        now = datetime.now()
+        filename = f"./derived/fnguide_long_{now.year}_{now.month:02d}.parquet"
+
+    long_df = concat_long(to_long(df, mod) for mod, df in frames.items() if df is not None)
+    long_df.to_parquet(filename, index=False)
+
+    print(f"long 테이블 저장 완료: {filename} ({len(long_df)}행)")
+    return filename
+
+
+# ── 통합 수집 ('all') ──────────────────────────────────────
+# 종목 × 페이지를 한 번씩만 가져와 파싱하고, 그 결과 하나로
+# 모듈별 Excel과 NCAV/NFAV/PEG 입력 데이터를 모두 만든다.
+
+def collect_unified(stock_rows=None, use_multiprocessing=True, async_fetch=False, fetch_options=None,
+                    pipeline=False, resume=False, journal_file=None, metrics_path=None, delta=False):
+    """
+    전체 모듈을 종목당 한 번의 pool 작업으로 수집
+
+    Args:
+        stock_rows: 수집 대상 종목 (None이면 krxStocks 전체)
+        journal_file: 실행 저널 경로 (None이면 journal_path('all'))
+        나머지 인자는 collect_all_stocks와 동일
+
+    Returns:
+        [(stock_row, {module: dict 또는 None}), ...] — stock_rows 순서
+    """
+    prepare_cache()
+    if stock_rows is None:
+        stock_rows = load_stock_rows()
+    journal, pending = _open_journal('all', stock_rows, resume, journal_file, delta)
+    periods = None
+    refresh = []
+    if delta:
+        periods, pending, refresh = _plan_delta('all', stock_rows, journal, pending, use_multiprocessing,
+                                                async_fetch, fetch_options)
+
+    print("\n" + "=" * 50)
+    print(f"{MODULE_CONFIG['all']['description']} 통합 수집 시작")
+    print("=" * 50)
+
+    with journal:
+        metrics = _parse_into_journal(pending, 'all', journal, use_multiprocessing, async_fetch, fetch_options,
+                                      pipeline)
+        if periods is not None:
+            _record_periods(journal, pending, _ALL_MODULES, periods)
+        if refresh:
+            metrics.extra['snapshot_refresh'] = _refresh_snapshots(journal, refresh, use_multiprocessing).summary()
+        _save_metrics(metrics, metrics_path)
+        _report_failures(journal)
+        return [(row, journal.parsed(row['scode'], _ALL_MODULES)) for row in stock_rows]
+
+
+def build_module_frames(parsed_set, modules=None):
+    """
+    통합 수집 결과 → 모듈별 DataFrame
+
+    Returns:
+        {module: DataFrame 또는 None}
+    """
+    frames = {}
+    for mod in modules or _ALL_MODULES:
+        rows = [merge_stock_row(stock_row, parsed, [mod]) for stock_row, parsed in parsed_set]
+        rows = [r for r in rows if r is not None]
+        frames[mod] = _order_columns(pd.DataFrame(rows), _get_indicator_order(mod)) if rows else None
+    return frames
+
+
+def build_downstream_frames(parsed_set):
+    """
+    통합 수집 결과 → calc_NCAV / calc_NFAV / plpeg_datagen 입력 DataFrame
+
+    각 모듈의 code_to_dict와 같은 형식의 행을 만든다.
+
+    Returns:
+        {'ncav': DataFrame, 'nfav': DataFrame, 'plpeg': DataFrame}
+    """
+    import calc_NCAV
+    import calc_NFAV
+    import plpeg_datagen
+
+    ncav, nfav, plpeg = [], [], []
+    for stock_row, parsed in parsed_set:
+        code = stock_row['scode']
+        finance = parsed.get('finance') or {}
+        fi_ratio = parsed.get('ratio') or {}
+        invest_idx = parsed.get('investidx') or {}
+        ncav.append(calc_NCAV.build_record(code, finance))
+        nfav.append(calc_NFAV.build_record(code, finance, fi_ratio))
+        plpeg.append(plpeg_datagen.build_record(code, fi_ratio, invest_idx))
+
+    return {
+        'ncav': pd.DataFrame(ncav),
+        'nfav': pd.DataFrame(nfav),
+        'plpeg': pd.DataFrame.from_records(plpeg),
+    }
+
+
+def save_unified_outputs(parsed_set, write_downstream=True, write_long=False, write_history=False,
+                         dataset_suffix=''):
+    """
+    통합 수집 결과로 모든 산출물 저장
+
+    - 모듈별 Excel (save_to_excel과 동일 파일명) + Parquet 데이터셋 (파일명 끝에 dataset_suffix)
+    - write_history=True이면 모듈별 스냅샷을 이력 저장소에 추가 (save_history, 모듈 모두 같은 수집 시각)
+    - NCAV/NFAV/PEG 수집 파일 (각 모듈 main()이 캐시로 재사용하는 경로)
+    - write_long=True이면 전 모듈 long 테이블 (save_long_dataset)
+
+    Returns:
+        list: 저장한 파일 경로
+    """
+    import calc_NCAV
+    import calc_NFAV
+    import plpeg_datagen
+
+    saved = []
+    collected_at = datetime.now()
+    frames = build_module_frames(parsed_set)
+    for mod, mod_df in frames.items():
+        if mod_df is None:
+            print(f"ERROR [{mod}] 데이터 추출에 실패했습니다.")
+            continue
+        print(f"[{mod}] 종목 수: {len(mod_df)}, 컬럼 수: {len(mod_df.columns)}")
+        saved.append(save_to_excel(mod_df, module_name=mod))
+        dataset = save_dataset(mod_df, module_name=mod, suffix=dataset_suffix)
+        if dataset:
+            saved.append(dataset)
+        if write_history:
+            history = save_history(mod_df, mod, collected_at)
+            if history:
+                saved.append(history)
+
+    if write_long:
+        long_path = save_long_dataset(frames)
+        if long_path:
+            saved.append(long_path)
+
+    if write_downstream:
+        downstream = build_downstream_frames(parsed_set)
+        paths = {
+            'ncav': calc_NCAV.collected_file_path(),
+            'nfav': calc_NFAV.collected_file_path(),
+            'plpeg': plpeg_datagen.collected_file_path(),
+        }
+        for key, frame in downstream.items():
+            save_styled_excel(frame, paths[key])
+            print(f"Excel 파일 저장 완료: {paths[key]}")
+            saved.append(paths[key])
+
+    return saved
+
+
 # ── CLI ────────────────────────────────────────────────────
 
 if __name__ == "__main__":
@@ -467,15 +1107,31 @@ if __name__ == "__main__":
     # python fngCollect.py finance                      -> finance 전종목 수집
     # python fngCollect.py ratio                        -> ratio 전종목 수집
     # python fngCollect.py investidx                    -> investidx 전종목 수집
-    # python fngCollect.py all                          -> 전체 모듈 순차 수집
+    # python fngCollect.py all                          -> 전체 모듈 1회 통합 수집 (NCAV/NFAV/PEG 입력 포함)
     # python fngCollect.py snapshot test                -> snapshot 삼성전자만 테스트
     # python fngCollect.py snapshot test 005930 000660  -> snapshot 지정 종목 테스트
+    # python fngCollect.py all --async                  -> 비동기 엔진으로 페이지 선다운로드 후 파싱
+    # python fngCollect.py all --pipeline               -> 다운로드/파싱 2단계 파이프라인으로 동시 진행
+    # python fngCollect.py all --long                   -> long(tidy) 테이블 Parquet 추가 저장
+    # python fngCollect.py all --resume                 -> 이번 달 실행 저널에서 이어서 (미완료/실패 종목만 처리)
+    # python fngCollect.py all --metrics                -> 실행 지표를 derived/metrics/collect_runs.jsonl에 추가
+    # python fngCollect.py all --delta                  -> 최근 실적 기간이 바뀐 종목만 다시 수집해 이전 결과에 병합
 
     available = list(MODULE_CONFIG.keys())
     args = sys.argv[1:]
+    async_fetch = '--async' in args
+    pipeline = '--pipeline' in args
+    write_long = '--long' in args
+    resume = '--resume' in args
+    delta = '--delta' in args
+    metrics_path = None
+    if '--metrics' in args:
+        from fin_metrics import METRICS_PATH
+        metrics_path = METRICS_PATH
+    args = [a for a in args if a not in ('--async', '--pipeline', '--long', '--resume', '--metrics', '--delta')]
 
     if not args or args[0] not in available:
-        print(f"사용법: python fngCollect.py <module> [test [codes...]]")
+        print(f"사용법: python fngCollect.py <module> [test [codes...]] [--async|--pipeline] [--long] [--resume|--delta] [--metrics]")
         print(f"  module: {', '.join(available)}")
         sys.exit(1)
 
@@ -484,42 +1140,29 @@ if __name__ == "__main__":
 
     print(f"모듈: {MODULE_CONFIG[module_name]['description']}")
 
-    # all 모드: 각 모듈을 독립적으로 수집하여 개별 파일로 저장
+    # all 모드: 종목 × 페이지를 한 번씩만 수집하여 모듈별 파일 + NCAV/NFAV/PEG 입력 파일 저장
     if module_name == 'all':
-        target_modules = _ALL_MODULES
-        test_codes = rest[1:] if (rest and rest[0] == "test" and len(rest) > 1) else (['005930'] if (rest and rest[0] == "test") else None)
         is_test = rest and rest[0] == "test"
 
-        for mod in target_modules:
-            print(f"\n{'='*50}")
-            print(f"모듈: {MODULE_CONFIG[mod]['description']}")
-            print(f"{'='*50}")
-
-            if is_test:
-                print(f"테스트 모드: {test_codes}개 종목")
-                results = []
-                for code in test_codes:
-                    row = process_single_stock(
-                        ({'scode': code, 'sname': '', 'industry': '', 'products': ''}, mod)
-                    )
-                    if row is not None:
-                        results.append(row)
-                mod_df = _order_columns(pd.DataFrame(results), _get_indicator_order(mod)) if results else None
-            else:
-                mod_df = collect_all_stocks(module_name=mod, use_multiprocessing=True)
-
-            if mod_df is not None:
-                print(f"\n=== 추출된 데이터 ===")
-                print(f"전체 종목 수: {len(mod_df)}")
-                print(f"전체 컬럼 수: {len(mod_df.columns)}")
-                print(f"\n=== Excel 저장 ===")
-                filename = save_to_excel(mod_df, module_name=mod)
-                print(f"OK 완료: {filename}")
-            else:
-                print(f"ERROR [{mod}] 데이터 추출에 실패했습니다.")
+        if is_test:
+            test_codes = rest[1:] if len(rest) > 1 else ['005930']
+            print(f"테스트 모드: {len(test_codes)}개 종목")
+            stock_rows = [{'scode': code, 'sname': '', 'industry': '', 'products': ''} for code in test_codes]
+            from fin_journal import JOURNAL_DIR
+            parsed_set = collect_unified(stock_rows, use_multiprocessing=False, resume=resume,
+                                         journal_file=os.path.join(JOURNAL_DIR, 'test.jsonl'), delta=delta)
+        else:
+            parsed_set = collect_unified(async_fetch=async_fetch, pipeline=pipeline, resume=resume,
+                                         metrics_path=metrics_path, delta=delta)
+
+        print(f"\n=== Excel 저장 ===")
+        saved = save_unified_outputs(parsed_set, write_downstream=not is_test, write_long=write_long,
+                                     write_history=not is_test, dataset_suffix=TEST_SUFFIX if is_test else '')
+        print(f"\nOK 완료: {len(saved)}개 파일")
 
     else:
-        if rest and rest[0] == "test":
+        is_test = rest and rest[0] == "test"
+        if is_test:
             test_codes = rest[1:] if len(rest) > 1 else ['005930']
             print(f"테스트 모드: {len(test_codes)}개 종목")
 
@@ -533,7 +1176,9 @@ if __name__ == "__main__":
 
             final_df = _order_columns(pd.DataFrame(results), _get_indicator_order(module_name)) if results else None
         else:
-            final_df = collect_all_stocks(module_name=module_name, use_multiprocessing=True)
+            final_df = collect_all_stocks(module_name=module_name, use_multiprocessing=True, async_fetch=async_fetch,
+                                          pipeline=pipeline, resume=resume, metrics_path=metrics_path,
+                                          delta=delta)
 
         if final_df is not None:
             print(f"\n=== 추출된 데이터 ===")
@@ -542,6 +1187,14 @@ if __name__ == "__main__":
 
             print(f"\n=== Excel 저장 ===")
             filename = save_to_excel(final_df, module_name=module_name)
+            save_dataset(final_df, module_name=module_name, suffix=TEST_SUFFIX if is_test else '')
+            if not is_test:
+                save_history(final_df, module_name)
+            if write_long:
+                now = datetime.now()
+                prefix = MODULE_CONFIG[module_name]['output_prefix']
+                save_long_dataset({module_name: final_df},
+                                  filename=f"./derived/{prefix}_long_{now.year}_{now.month:02d}.parquet")
 
             print(f"\nOK 성공적으로 완료되었습니다!")
             print(f"  파일: {filename}")
@@ -18,14 +18,26 @@ FnGuide Finance 페이지 (SVD_Finance.asp) 데이터 수집 및 파싱
 
 Public API:
   getFnguideFinance(code)    : HTML 가져오기 (캐싱)
+  fetchTargets(code)         : 비동기 수집 대상 (url, cache_key, kind) 목록
   parseFnguideFinance(html)  : 재무제표 데이터 추출 → dict 또는 None
   collectFinance(code)       : HTML 가져오기 + 파싱 통합 수집 → dict 또는 None
 """
 import re
 
-from bs4 import BeautifulSoup
+from fin_utils import (cached_parse, fetch_fnguide_page, fnguide_cache_key, fnguide_page_url,
+                       make_soup, parse_company_name, parse_kse_fics)
 
-from fin_utils import fetch_fnguide_page, parse_company_name, parse_kse_fics
+# (asp_page, menu_id, cache_prefix)
+FINANCE_PAGE = ('SVD_Finance.asp', '103', 'fnguide_finance_')
+PARSER_VERSION = 1  # cached_parse 키
+
+# lxml-xpath 엔진에서 남길 서브트리: 손익계산서 / 현금흐름표 (연간·분기)
+_SOUP_XPATHS = [
+    "//div[@id='divSonikY']",
+    "//div[@id='divSonikQ']",
+    "//div[@id='divCashY']",
+    "//div[@id='divCashQ']",
+]
 
 
 # ── 손익계산서 수집 항목 (row prefix → 컬럼명)
@@ -55,10 +67,16 @@ _CASH_TARGETS = [
 
 def getFnguideFinance(code):
     """FnGuide Finance HTML 가져오기 (캐싱)"""
-    return fetch_fnguide_page(code, 'SVD_Finance.asp', '103', 'fnguide_finance_')
+    return fetch_fnguide_page(code, *FINANCE_PAGE)
+
+
+def fetchTargets(code):
+    """비동기 수집 대상 목록 → [(url, cache_key, kind)]"""
+    asp_page, menu_id, cache_prefix = FINANCE_PAGE
+    return [(fnguide_page_url(code, asp_page, menu_id), fnguide_cache_key(code, cache_prefix), 'html')]
 
 
-def parseFnguideFinance(html):
+def parseFnguideFinance(html, engine=None):
     """
     Finance HTML에서 손익계산서 및 현금흐름표 데이터 추출
 
@@ -67,12 +85,13 @@ def parseFnguideFinance(html):
 
     Args:
         html: FnGuide Finance HTML 문자열
+        engine: 파서 엔진 (None이면 fin_utils.PARSER_CONFIG['finance'])
 
     Returns:
         dict: 종목명, 마켓분야, FICS분야, 결산월, 연결여부, 연도별/분기별 손익/현금흐름 데이터
         None: 손익계산서 연간 테이블(#divSonikY)이 없는 경우
     """
-    soup = BeautifulSoup(html, 'html.parser')
+    soup = make_soup(html, 'finance', _SOUP_XPATHS, engine)
 
     data = {}
     data['종목명'] = parse_company_name(soup)
@@ -114,7 +133,7 @@ def collectFinance(code):
         dict: 종목명, 마켓분야, FICS분야, 결산월, 연결여부, 연도별/분기별 손익/현금흐름 데이터
         None: 손익계산서 연간 테이블(#divSonikY)이 없는 경우
     """
-    return parseFnguideFinance(getFnguideFinance(code))
+    return cached_parse(getFnguideFinance(code), 'finance', PARSER_VERSION, parseFnguideFinance)
 
 
 # --- Private parse helpers ---
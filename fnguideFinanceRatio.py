@@ -24,14 +24,26 @@ FnGuide FinanceRatio 페이지 (SVD_FinanceRatio.asp) 데이터 수집 및 파
 
 Public API:
   getFnGuideFiRatio(code)    : HTML 가져오기 (캐싱)
+  fetchTargets(code)         : 비동기 수집 대상 (url, cache_key, kind) 목록
   parseFnguideFiRatio(html)  : 재무비율 데이터 추출 → dict 또는 None
   collectFinanceRatio(code)  : HTML 가져오기 + 파싱 통합 수집 → dict 또는 None
 """
 import re
 
-from bs4 import BeautifulSoup
+import numpy as np
+import pandas as pd
 
-from fin_utils import fetch_fnguide_page, parse_company_name, parse_kse_fics
+from fin_utils import (cached_parse, fetch_fnguide_page, fnguide_cache_key, fnguide_page_url,
+                       make_soup, parse_company_name, parse_kse_fics)
+
+# (asp_page, menu_id, cache_prefix)
+FINANCE_RATIO_PAGE = ('SVD_FinanceRatio.asp', '104', 'fnguide_FinanceRatio_')
+PARSER_VERSION = 1  # cached_parse 키
+
+# lxml-xpath 엔진에서 남길 서브트리: grid1(연결 누적) / grid2(연결 3개월) 행을 담은 표
+_SOUP_XPATHS = [
+    "//table[.//tr[starts-with(@id, 'p_grid1_') or starts-with(@id, 'p_grid2_')]]",
+]
 
 
 # 업종별 원본 지표명 → 통합 컬럼명 매핑
@@ -160,12 +172,38 @@ def detect_industry_type(market_sector, fics_sector):
     return INDUSTRY_TYPE_MANUFACTURING
 
 
+def detect_industry_types(market_sectors, fics_sectors):
+    """
+    detect_industry_type의 벡터화 버전 (DataFrame 전체 분류용)
+
+    (마켓분야, FICS분야) 고유 조합마다 detect_industry_type을 한 번만 호출하고
+    그 결과를 행에 매핑한다. 종목 수천 개여도 고유 조합은 수십 개 수준이다.
+
+    Args:
+        market_sectors: 마켓분야 Series
+        fics_sectors  : FICS분야 Series (market_sectors와 같은 index)
+
+    Returns:
+        pd.Series: 행별 INDUSTRY_TYPE_* (index는 market_sectors와 동일)
+    """
+    pairs = pd.MultiIndex.from_arrays([market_sectors.fillna(''), fics_sectors.fillna('')])
+    codes, uniques = pd.factorize(pairs)
+    type_map = np.array([detect_industry_type(market, fics) for market, fics in uniques], dtype=object)
+    return pd.Series(type_map[codes], index=market_sectors.index)
+
+
 def getFnGuideFiRatio(code):
     """FnGuide FinanceRatio HTML 가져오기 (캐싱)"""
-    return fetch_fnguide_page(code, 'SVD_FinanceRatio.asp', '104', 'fnguide_FinanceRatio_')
+    return fetch_fnguide_page(code, *FINANCE_RATIO_PAGE)
+
+
+def fetchTargets(code):
+    """비동기 수집 대상 목록 → [(url, cache_key, kind)]"""
+    asp_page, menu_id, cache_prefix = FINANCE_RATIO_PAGE
+    return [(fnguide_page_url(code, asp_page, menu_id), fnguide_cache_key(code, cache_prefix), 'html')]
 
 
-def parseFnguideFiRatio(html):
+def parseFnguideFiRatio(html, engine=None):
     """
     FinanceRatio HTML에서 연결 누적/3개월 재무비율 데이터 추출
 
@@ -174,12 +212,13 @@ def parseFnguideFiRatio(html):
 
     Args:
         html: FnGuide FinanceRatio HTML 문자열
+        engine: 파서 엔진 (None이면 fin_utils.PARSER_CONFIG['ratio'])
 
     Returns:
         dict: 종목명, 마켓분야, FICS분야, 연도별/분기별 재무비율
         None: 연결 누적 테이블이 없는 경우
     """
-    soup = BeautifulSoup(html, 'html.parser')
+    soup = make_soup(html, 'ratio', _SOUP_XPATHS, engine)
 
     data = {}
     data['종목명'] = parse_company_name(soup)
@@ -215,7 +254,7 @@ def collectFinanceRatio(code):
         dict: 종목명, 마켓분야, FICS분야, 연도별/분기별 재무비율
         None: 연결 누적 테이블이 없는 경우
     """
-    return parseFnguideFiRatio(getFnGuideFiRatio(code))
+    return cached_parse(getFnGuideFiRatio(code), 'ratio', PARSER_VERSION, parseFnguideFiRatio)
 
 
 # --- Private parse helpers ---
@@ -18,17 +18,23 @@ Public API:
   getFnGuideMultiFactor(code)  : 멀티팩터 스타일 분석 JSON 가져오기 (캐싱)
   parseMultiFactorJson(data)   : 멀티팩터 데이터 추출 → dict
   collectInvestIdx(code)       : 멀티팩터 + 기업가치 지표 통합 수집 → dict 또는 None
+  fetchTargets(code)           : 비동기 수집 대상 (url, cache_key, kind) 목록
 """
-import datetime
 import json
-import os
 import re
-import shutil
 
-import requests
-from bs4 import BeautifulSoup
+from fin_utils import (PARTIAL_FAILURES_KEY, FetchError, cached_parse, fetch_cached, fetch_fnguide_page,
+                       fnguide_cache_key, fnguide_page_url, make_soup, parse_company_name, parse_kse_fics)
 
-from fin_utils import fetch_fnguide_page, parse_company_name, parse_kse_fics
+# (asp_page, menu_id, cache_prefix)
+INVEST_IDX_PAGE = ('SVD_Invest.asp', '105', 'fnguide_InvestIdx_')
+MULTI_FACTOR_CACHE_PREFIX = 'fnguide_MultiFactor_'
+PARSER_VERSION = 1  # cached_parse 키
+
+# lxml-xpath 엔진에서 남길 서브트리: caption이 있는 표 (기업가치 지표 탐색용)
+_SOUP_XPATHS = [
+    "//table[caption]",
+]
 
 
 # ---------------------------------------------------------------------------
@@ -37,7 +43,24 @@ from fin_utils import fetch_fnguide_page, parse_company_name, parse_kse_fics
 
 def getFnGuideInvestIdx(code):
     """FnGuide 투자지표 HTML 가져오기 (캐싱)"""
-    return fetch_fnguide_page(code, 'SVD_Invest.asp', '105', 'fnguide_InvestIdx_')
+    return fetch_fnguide_page(code, *INVEST_IDX_PAGE)
+
+
+def _multi_factor_url(code):
+    return f'https://comp.fnguide.com/SVO2/json/chart/05_05/A{code}.json'
+
+
+def _multi_factor_cache_key(code):
+    return fnguide_cache_key(code, MULTI_FACTOR_CACHE_PREFIX, f'{code}.json')
+
+
+def fetchTargets(code):
+    """비동기 수집 대상 목록 (투자지표 HTML + 멀티팩터 JSON) → [(url, cache_key, kind)]"""
+    asp_page, menu_id, cache_prefix = INVEST_IDX_PAGE
+    return [
+        (fnguide_page_url(code, asp_page, menu_id), fnguide_cache_key(code, cache_prefix), 'html'),
+        (_multi_factor_url(code), _multi_factor_cache_key(code), 'json'),
+    ]
 
 
 def getFnGuideMultiFactor(code):
@@ -45,40 +68,20 @@ def getFnGuideMultiFactor(code):
     멀티팩터 스타일 분석 JSON 가져오기 (캐싱)
 
     URL: https://comp.fnguide.com/SVO2/json/chart/05_05/A{code}.json
-    캐시: derived/fnguide_InvestIdx_{YYYY-MM}/factor_{code}.json
+    캐시: fnguide_MultiFactor/{code}.json (TTL: fin_cache.CACHE_TTL)
 
     Returns:
-        dict: JSON 응답 (CHART_H, CHART_D 포함), 실패 시 None
-    """
-    now = datetime.datetime.now()
-    url = f'https://comp.fnguide.com/SVO2/json/chart/05_05/A{code}.json'
-
-    cache_prefix = 'fnguide_InvestIdx_'
-    cache_dir  = f'derived/{cache_prefix}{now.year}-{now.month:02d}'
-    cache_path = f'{cache_dir}/factor_{code}.json'
-
-    os.makedirs(cache_dir, exist_ok=True)
-
-    # 이전 달 캐시 디렉토리 삭제
-    current_dir_name = os.path.basename(cache_dir)
-    for entry in os.listdir('derived'):
-        if entry.startswith(cache_prefix) and entry != current_dir_name:
-            shutil.rmtree(os.path.join('derived', entry))
-
-    if os.path.exists(cache_path):
-        with open(cache_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        dict: JSON 응답 (CHART_H, CHART_D 포함), JSON이 아니면 None
 
+    Raises:
+        FetchError: 다운로드 실패 (호출부의 실패 분류/저널 기록으로 전달)
+    """
+    # FnGuide JSON 응답에 UTF-8 BOM이 포함되어 resp.json()이 실패하므로
+    # utf-8-sig로 직접 디코딩한다.
+    text = fetch_cached(_multi_factor_url(code), _multi_factor_cache_key(code), encoding='utf-8-sig')
     try:
-        resp = requests.get(url, timeout=10)
-        resp.raise_for_status()
-        # FnGuide JSON 응답에 UTF-8 BOM이 포함되어 resp.json()이 실패하므로
-        # utf-8-sig로 직접 디코딩한다.
-        data = json.loads(resp.content.decode('utf-8-sig'))
-        with open(cache_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False)
-        return data
-    except Exception:
+        return json.loads(text)
+    except json.JSONDecodeError:
         return None
 
 
@@ -132,18 +135,19 @@ def parseMultiFactorJson(data):
     return result
 
 
-def parseFnGuideInvestIdx(html):
+def parseFnGuideInvestIdx(html, engine=None):
     """
     투자지표 HTML에서 기업가치 지표 데이터 추출
 
     Args:
         html: FnGuide 투자지표 HTML 문자열
+        engine: 파서 엔진 (None이면 fin_utils.PARSER_CONFIG['investidx'])
 
     Returns:
         dict: 종목명, 마켓분야, FICS분야, 연도별 기업가치 지표
         None: 기업가치 지표 테이블이 없는 경우
     """
-    soup = BeautifulSoup(html, 'html.parser')
+    soup = make_soup(html, 'investidx', _SOUP_XPATHS, engine)
 
     data = {}
     data['종목명'] = parse_company_name(soup)
@@ -173,14 +177,21 @@ def collectInvestIdx(code):
 
     Returns:
         dict: 종목명, 마켓분야, FICS분야, 멀티팩터 점수, 연도별 기업가치 지표
+              멀티팩터 JSON 수집에 실패하면 멀티팩터 점수 없이 반환하고
+              PARTIAL_FAILURES_KEY에 {'multifactor': {kind, message}}를 담는다
         None: 기업가치 지표 테이블 없음
     """
     html = getFnGuideInvestIdx(code)
-    result = parseFnGuideInvestIdx(html)
+    result = cached_parse(html, 'investidx', PARSER_VERSION, parseFnGuideInvestIdx)
     if result is None:
         return None
 
-    factor_json = getFnGuideMultiFactor(code)
+    try:
+        factor_json = getFnGuideMultiFactor(code)
+    except FetchError as e:
+        # 이미 파싱한 기업가치 지표는 살리고 멀티팩터 실패만 따로 보고
+        result[PARTIAL_FAILURES_KEY] = {'multifactor': {'kind': e.kind, 'message': f'{type(e).__name__}: {e}'}}
+        return result
     if factor_json:
         result.update(parseMultiFactorJson(factor_json))
 
@@ -2,50 +2,66 @@
 FnGuide Snapshot 페이지 (SVD_Main.asp) 데이터 수집 및 파싱
 
 - getFnGuideSnapshot(code)  : HTML 가져오기 (캐싱)
+- fetchTargets(code)        : 비동기 수집 대상 (url, cache_key, kind) 목록
 - parseFnguideSnapshot(html): 종목명, KSE/FICS 분야, Financial Highlight 투자지표 추출
 - collectSnapshot(code)     : HTML 가져오기 + 파싱 통합 수집 → dict 또는 None
+- latestPeriod(code)        : 최근 실적 기간 'YYYY/MM' (변경분 수집 판단용)
 """
 import re
 from datetime import datetime
-from bs4 import BeautifulSoup
-from fin_utils import fetch_fnguide_page, parse_company_name, parse_kse_fics
+from fin_utils import (cached_parse, fetch_fnguide_page, fnguide_cache_key, fnguide_page_url,
+                       make_soup, parse_company_name, parse_kse_fics)
+
+# (asp_page, menu_id, cache_prefix)
+SNAPSHOT_PAGE = ('SVD_Main.asp', '101', 'fnguide_snapshot_')
+PARSER_VERSION = 2  # cached_parse 키 (v2: 연도 선택 전 표 원본을 캐싱)
+
+# lxml-xpath 엔진에서 남길 서브트리: Financial Highlight 표
+_SOUP_XPATHS = [
+    "//div[@id='highlight_D_Y']",
+]
+
+# 최근 실적 기간 판단에 쓰는 Financial Highlight 표 (연결 연간 / 분기)
+_PERIOD_TABLE_IDS = ('highlight_D_Y', 'highlight_D_Q')
+
+# Financial Highlight에서 추출할 지표와 컬럼명 단위
+_SNAPSHOT_INDICATORS = (
+    '영업이익률', '부채비율', '유보율', '지배주주순이익률',
+    'PER', 'EPS', 'PBR', 'BPS', 'ROA', 'ROE',
+    '배당수익률', '발행주식수',
+)
+_UNIT_MAP = {
+    'PER': '(배)', 'PBR': '(배)', 'ROA': '(배)', 'ROE': '(배)',
+    'EPS': '(원)', 'BPS': '(원)',
+    '영업이익률': '(%)', '부채비율': '(%)', '유보율': '(%)',
+    '지배주주순이익률': '(%)', '배당수익률': '(%)',
+}
 
 
 def getFnGuideSnapshot(code):
     """FnGuide Snapshot HTML 가져오기 (캐싱)"""
-    return fetch_fnguide_page(code, 'SVD_Main.asp', '101', 'fnguide_snapshot_')
+    return fetch_fnguide_page(code, *SNAPSHOT_PAGE)
 
 
-def parseFnguideSnapshot(html):
+def fetchTargets(code):
+    """비동기 수집 대상 목록 → [(url, cache_key, kind)]"""
+    asp_page, menu_id, cache_prefix = SNAPSHOT_PAGE
+    return [(fnguide_page_url(code, asp_page, menu_id), fnguide_cache_key(code, cache_prefix), 'html')]
+
+
+def parseFnguideSnapshot(html, engine=None):
     """
     Snapshot HTML에서 투자지표 데이터 추출
 
     Args:
         html: FnGuide Snapshot HTML 문자열
+        engine: 파서 엔진 (None이면 fin_utils.PARSER_CONFIG['snapshot'])
 
     Returns:
         dict: 종목명, 마켓분야, FICS분야, 연도별 재무지표, 발행주식수
         None: Financial Highlight 테이블이 없는 경우
     """
-    soup = BeautifulSoup(html, 'html.parser')
-
-    data = {}
-    data['종목명'] = parse_company_name(soup)
-
-    kse_sector, fics_sector, fiscal_month = parse_kse_fics(soup)
-    data['마켓분야'] = kse_sector
-    data['FICS분야'] = fics_sector
-    if fiscal_month is not None:
-        data['결산월'] = fiscal_month
-
-    highlight = _parse_financial_highlight(soup)
-    if highlight is None:
-        return None
-
-    highlight_data, _ = highlight
-    data.update(highlight_data)
-
-    return data
+    return _select_snapshot(_parse_snapshot(html, engine))
 
 
 def collectSnapshot(code):
@@ -59,21 +75,88 @@ def collectSnapshot(code):
         dict: 종목명, 마켓분야, FICS분야, 연도별 재무지표, 발행주식수
         None: Financial Highlight 테이블이 없는 경우
     """
-    return parseFnguideSnapshot(getFnGuideSnapshot(code))
+    # 연도 선택은 현재 연도에 따라 달라지므로 캐시에는 선택 전 결과를 두고 매번 고른다
+    return _select_snapshot(cached_parse(getFnGuideSnapshot(code), 'snapshot', PARSER_VERSION, _parse_snapshot))
+
+
+def parseLatestPeriod(html, engine=None):
+    """
+    Financial Highlight 연간/분기 헤더 중 가장 최근 실적(추정치 제외) 기간
+
+    새 분기/연간 실적이 반영되면 값이 바뀌므로, 다른 페이지를 다시 받을지
+    판단하는 값싼 신호로 쓴다 (fngCollect --delta).
+
+    Returns:
+        str: 'YYYY/MM' (예: '2026/06'), 헤더가 없으면 None
+    """
+    soup = make_soup(html, 'snapshot', [f"//div[@id='{div_id}']" for div_id in _PERIOD_TABLE_IDS], engine)
+
+    latest = None
+    for div_id in _PERIOD_TABLE_IDS:
+        div = soup.find('div', id=div_id)
+        table_tag = div.find('table') if div else None
+        if not table_tag:
+            continue
+        for year, month, is_estimate, _ in _parse_year_headers(table_tag):
+            if not is_estimate and (latest is None or (year, month) > latest):
+                latest = (year, month)
+
+    return f"{latest[0]}/{latest[1]:02d}" if latest else None
+
+
+def latestPeriod(code):
+    """Snapshot HTML 가져오기 + parseLatestPeriod → 'YYYY/MM' 또는 None"""
+    return parseLatestPeriod(getFnGuideSnapshot(code))
 
 
 # --- Private parse helpers ---
 
-def _parse_financial_highlight(soup, current_year=None):
+def _parse_snapshot(html, engine=None):
     """
-    Financial Highlight 테이블(highlight_D_Y)에서 연결/연간 기준 데이터 추출
+    Snapshot HTML → 연도 선택 전 파싱 결과 (현재 연도와 무관하므로 cached_parse 대상)
 
     Returns:
-        (data_dict, selected_years) 튜플, 또는 None
+        dict: base (종목명, 마켓분야, FICS분야, 결산월), headers, rows (_parse_highlight_table 참고)
+        None: Financial Highlight 테이블이 없는 경우
     """
-    if current_year is None:
-        current_year = datetime.now().year
+    soup = make_soup(html, 'snapshot', _SOUP_XPATHS, engine)
+
+    base = {}
+    base['종목명'] = parse_company_name(soup)
+
+    kse_sector, fics_sector, fiscal_month = parse_kse_fics(soup)
+    base['마켓분야'] = kse_sector
+    base['FICS분야'] = fics_sector
+    if fiscal_month is not None:
+        base['결산월'] = fiscal_month
+
+    highlight = _parse_highlight_table(soup)
+    if highlight is None:
+        return None
+
+    headers, rows = highlight
+    return {'base': base, 'headers': headers, 'rows': rows}
+
+
+def _select_snapshot(parsed, current_year=None):
+    """_parse_snapshot 결과 → parseFnguideSnapshot 형식 dict (None이면 None)"""
+    if parsed is None:
+        return None
+    data = dict(parsed['base'])
+    highlight_data, _ = _select_highlight(parsed['headers'], parsed['rows'], current_year)
+    data.update(highlight_data)
+    return data
+
+
+def _parse_highlight_table(soup):
+    """
+    Financial Highlight 테이블(highlight_D_Y)의 헤더와 지표 행 추출
 
+    Returns:
+        (headers, rows) 튜플, 또는 None
+        headers: _parse_year_headers 결과 [(year, month, is_estimate, text), ...]
+        rows   : [(지표명, [값, ...]), ...] (_SNAPSHOT_INDICATORS만, 표 순서), tbody가 없으면 빈 리스트
+    """
     table = soup.find('div', id='highlight_D_Y')
     if not table:
         return None
@@ -82,8 +165,27 @@ def _parse_financial_highlight(soup, current_year=None):
     if not table_tag:
         return None
 
-    # 헤더에서 연도/월 추출
-    year_month_headers = _parse_year_headers(table_tag)
+    headers = _parse_year_headers(table_tag)
+
+    rows = []
+    tbody = table_tag.find('tbody')
+    if tbody:
+        for row in tbody.find_all('tr'):
+            name = _extract_indicator_name(row)
+            if name in _SNAPSHOT_INDICATORS:
+                rows.append((name, _extract_row_values(row)))
+    return headers, rows
+
+
+def _select_highlight(year_month_headers, rows, current_year=None):
+    """
+    Financial Highlight 헤더/행에서 연결/연간 기준 데이터 선택
+
+    Returns:
+        (data_dict, selected_years) 튜플
+    """
+    if current_year is None:
+        current_year = datetime.now().year
 
     # 연도별 최신 데이터 인덱스 선택 (현재년도 기준 과거3년 ~ 미래1년)
     year_to_latest = {}
@@ -95,32 +197,8 @@ def _parse_financial_highlight(soup, current_year=None):
 
     selected_years = sorted(year_to_latest.keys())
 
-    # 지표 데이터 추출
-    indicators = [
-        '영업이익률', '부채비율', '유보율', '지배주주순이익률',
-        'PER', 'EPS', 'PBR', 'BPS', 'ROA', 'ROE',
-        '배당수익률', '발행주식수'
-    ]
-
-    unit_map = {
-        'PER': '(배)', 'PBR': '(배)', 'ROA': '(배)', 'ROE': '(배)',
-        'EPS': '(원)', 'BPS': '(원)',
-        '영업이익률': '(%)', '부채비율': '(%)', '유보율': '(%)',
-        '지배주주순이익률': '(%)', '배당수익률': '(%)'
-    }
-
     data = {}
-    tbody = table_tag.find('tbody')
-    if not tbody:
-        return data, selected_years
-
-    for row in tbody.find_all('tr'):
-        name = _extract_indicator_name(row)
-        if name not in indicators:
-            continue
-
-        values = _extract_row_values(row)
-
+    for name, values in rows:
         if name == '발행주식수':
             # 가장 최근 non-None 값 하나만
             for year in reversed(selected_years):
@@ -129,7 +207,7 @@ def _parse_financial_highlight(soup, current_year=None):
                     data['발행주식수(천주)'] = values[idx]
                     break
         else:
-            unit = unit_map.get(name, '')
+            unit = _UNIT_MAP.get(name, '')
             for year in selected_years:
                 idx, _ = year_to_latest[year]
                 if idx < len(values):
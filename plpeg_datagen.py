@@ -10,6 +10,18 @@ import fnguideFinanceRatio as fnFR
 import fnguideInvestIdx as fnII
 import krxStocks
 
+
+def collected_file_path(now=None):
+    """PEG 수집 데이터 파일 경로 (fngCollect 통합 수집에서도 같은 경로로 저장)"""
+    now = now or datetime.datetime.now()
+    return "derived/plpeg_{0}-{1:02d}.xlsx".format(now.year, now.month)
+
+
+def build_record(code, fi_ratio, invest_idx):
+    """파싱된 FinanceRatio/InvestIdx dict → PEG 입력 행"""
+    return {**fi_ratio, **invest_idx, 'code': code}
+
+
 def code_to_dict(code):
     try:
         fiRatioHtml = fnFR.getFnGuideFiRatio(code)        # 재무비율 페이지
@@ -19,7 +31,7 @@ def code_to_dict(code):
         investIdx = fnII.parseFnGuideInvestIdx(InvestIdxHtml)
         
         # result = { **snapshot, **finance, **fiRatio, **investIdx, 'code' : code }            
-        result = {**fiRatio, **investIdx,  'code' : code }            
+        result = build_record(code, fiRatio, investIdx)
         print(code)
         return result
     except Exception as e:
@@ -62,7 +74,7 @@ def select_stocks(df):
 
 if __name__ == '__main__':
     now = datetime.datetime.now()    
-    collectedFilePath = "derived/plpeg_{0}-{1:02d}.xlsx".format(now.year, now.month)
+    collectedFilePath = collected_file_path(now)
     testcollectedFilePath = "derived/plpeg_test_{0}-{1:02d}.xlsx".format(now.year, now.month)
     PEGoutputFilePath = "derived/peg_output_{0}-{1:02d}.xlsx".format(now.year, now.month)
     collected = pd.DataFrame()
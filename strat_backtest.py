@@ -0,0 +1,353 @@
+# strat_backtest.py
+# 전략 백테스트 엔진 — fin_history 시점 기준 스냅샷 + 로컬 가격 테이블
+#
+# 실행: python strat_backtest.py [시작일] [종료일]   (예: 2016-01-01 2026-09-30)
+#
+# 방식:
+#   1. 가격 테이블의 월말 거래일마다 리밸런싱 (BACKTEST_CONFIG["rebalance"])
+#   2. 리밸런싱일에 알 수 있었던 스냅샷(strat_utils.load_data_as_of)으로
+#      merge_base → apply_common_filters → 각 전략 실행
+#      같은 스냅샷을 가리키는 리밸런싱일끼리는 전략 결과를 재사용
+#   3. 전략별 점수 상위 top_n 종목을 동일가중 매수, 다음 리밸런싱까지 보유 (비중은 가격 따라 변동)
+#   4. 일별 평가액 / 회전율 / 거래비용은 (거래일 × 종목) 가격 배열 연산으로 한 번에 계산
+#
+# 전략:
+#   peg / piotroski / greenblatt / multifactor : 각 strat_* 점수 상위 top_n
+#   composite : build_composite_score 종합점수 상위 top_n (NCAV/NFAV는 이력이 없어 제외)
+#   universe  : 공통 필터 통과 전종목 동일가중 (벤치마크)
+#
+# 가격 테이블 (BACKTEST_CONFIG["price_file"], Parquet 또는 CSV):
+#   wide: 인덱스(또는 첫 컬럼) = 날짜, 나머지 컬럼 = 종목코드, 값 = 수정종가
+#   long: date / 종목코드 / close 컬럼
+#   리밸런싱일에 가격이 없는 종목은 매수하지 않고, 보유 중 빈 값은 직전 가격으로 평가
+#   (거래정지·상장폐지 종목은 마지막 가격으로 남음)
+#
+# 성과 지표:
+#   CAGR, MDD, 연변동성, 샤프(무위험수익률 0), 평균 회전율(편도, 리밸런싱 1회), 연환산 회전율
+#   회전율 = 매매한 비중 합 / 2, 거래비용 = 매매한 비중 합 × cost_bps
+
+import contextlib
+import io
+import multiprocessing as mp
+import time
+
+import numpy as np
+import pandas as pd
+
+import fin_history
+from agent_strategies import build_composite_score
+from strat_greenblatt import strategy_greenblatt
+from strat_multifactor import strategy_multifactor
+from strat_peg import strategy_peg
+from strat_piotroski import strategy_piotroski
+from strat_utils import apply_common_filters, load_data_as_of, merge_base
+
+# 전략명 → (전략 함수, 점수 컬럼)
+STRATEGIES = {
+    "peg":         (strategy_peg,         "PEG_점수"),
+    "piotroski":   (strategy_piotroski,   "Piotroski_점수"),
+    "greenblatt":  (strategy_greenblatt,  "Greenblatt_점수"),
+    "multifactor": (strategy_multifactor, "멀티팩터_점수"),
+}
+ALL_STRATEGIES = list(STRATEGIES) + ["composite", "universe"]
+
+TRADING_DAYS = 252
+
+
+# =============================================================================
+# 가격 테이블 / 리밸런싱 일정
+# =============================================================================
+
+def load_price_table(path: str) -> pd.DataFrame:
+    """
+    가격 테이블 → (날짜 × 종목코드) float64 DataFrame (빈 값은 그대로 둠)
+    """
+    if path.endswith(".parquet"):
+        raw = pd.read_parquet(path)
+    else:
+        raw = pd.read_csv(path, dtype={"종목코드": str})
+
+    if {"date", "종목코드", "close"} <= set(raw.columns):
+        prices = raw.pivot_table(index="date", columns="종목코드", values="close", aggfunc="last")
+    else:
+        prices = raw if isinstance(raw.index, pd.DatetimeIndex) else raw.set_index(raw.columns[0])
+
+    prices.index = pd.to_datetime(prices.index)
+    prices.index.name = "date"
+    prices.columns = [str(c).zfill(6) for c in prices.columns]
+    return prices.sort_index().astype("float64")
+
+
+def rebalance_dates(index: pd.DatetimeIndex, freq: str = "M") -> pd.DatetimeIndex:
+    """거래일 인덱스 → 기간(freq)별 마지막 거래일"""
+    last = pd.Series(index, index=index).groupby(index.to_period(freq)).max()
+    return pd.DatetimeIndex(last.to_numpy())
+
+
+# =============================================================================
+# 리밸런싱일별 종목 선정
+# =============================================================================
+
+def _select_on(when, strategies: list, strategy_cfg: dict, composite_weights: dict,
+               common_filter_cfg: dict, top_n: int) -> dict:
+    """when 시점 스냅샷으로 전략 실행 → {전략명: [종목코드, ...]}"""
+    data = load_data_as_of(when)
+    base = apply_common_filters(merge_base(data), common_filter_cfg)
+
+    needed = set(STRATEGIES) if "composite" in strategies else set(strategies) & set(STRATEGIES)
+    results = {name: STRATEGIES[name][0](base, strategy_cfg.get(name, {})) for name in needed}
+    if "composite" in strategies:
+        empty = pd.DataFrame()
+        results["composite"] = build_composite_score(
+            base_df=base,
+            peg_df=results["peg"],
+            piotroski_df=results["piotroski"],
+            greenblatt_df=results["greenblatt"],
+            multifactor_df=results["multifactor"],
+            ncav_df=empty,
+            nfav_df=empty,
+            weights=composite_weights,
+        )
+
+    picks = {}
+    for name in strategies:
+        if name == "universe":
+            picks[name] = base["종목코드"].tolist()
+            continue
+        df_ = results[name]
+        score_col = "종합점수" if name == "composite" else STRATEGIES[name][1]
+        if df_.empty or score_col not in df_.columns:
+            picks[name] = []
+        else:
+            picks[name] = df_.nlargest(top_n, score_col)["종목코드"].tolist()
+    return picks
+
+
+def _select_job(args) -> dict:
+    """_select_on 래퍼 (multiprocessing용, quiet이면 전략 출력 숨김)"""
+    *select_args, quiet = args
+    with contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext():
+        return _select_on(*select_args)
+
+
+def select_portfolios(dates: pd.DatetimeIndex, strategies: list, strategy_cfg: dict,
+                      composite_weights: dict, common_filter_cfg: dict, top_n: int,
+                      processes: int | None = None, quiet: bool = True) -> dict:
+    """
+    리밸런싱일별 전략 실행 → {전략명: [[종목코드, ...] (리밸런싱일 순서)]}
+
+    fin_history.collected_as_of로 리밸런싱일마다 읽을 스냅샷을 먼저 정하고,
+    스냅샷 조합이 같은 날은 한 번만 실행한다. 스냅샷이 없는 날은 빈 목록 (현금 보유).
+    스냅샷별 실행은 서로 독립이므로 processes(기본 CPU 수)개 프로세스로 나눠 실행한다.
+    quiet=True이면 전략 함수의 진행 출력을 숨긴다.
+    """
+    keys = list(zip(*(fin_history.collected_as_of(dates, source) for source in fin_history.SOURCES)))
+
+    # 스냅샷 조합 → 그 조합을 처음 쓰는 리밸런싱일
+    first_dates: dict[tuple, pd.Timestamp] = {}
+    for when, key in zip(dates, keys):
+        if not any(pd.isna(k) for k in key):
+            first_dates.setdefault(key, when)
+
+    jobs = [(when, strategies, strategy_cfg, composite_weights, common_filter_cfg, top_n, quiet)
+            for when in first_dates.values()]
+    processes = processes or mp.cpu_count()
+    if processes > 1 and len(jobs) > 1:
+        with mp.Pool(processes=min(processes, len(jobs))) as pool:
+            picks_list = pool.map(_select_job, jobs)
+    else:
+        picks_list = [_select_job(job) for job in jobs]
+    cache = dict(zip(first_dates, picks_list))
+
+    empty: dict[str, list[str]] = {name: [] for name in strategies}
+    selections: dict[str, list[list[str]]] = {name: [] for name in strategies}
+    for key in keys:
+        picks = cache.get(key, empty)
+        for name in strategies:
+            selections[name].append(picks[name])
+
+    print(f"  🗂  스냅샷 {len(cache)}개로 리밸런싱 {len(dates)}회 종목 선정")
+    return selections
+
+
+def weights_matrix(picks: list, codes: pd.Index, tradable: np.ndarray) -> np.ndarray:
+    """
+    리밸런싱일별 선정 종목 → (리밸런싱 × 종목) 동일가중 비중 배열
+
+    tradable: (리밸런싱 × 종목) 리밸런싱일 가격 존재 여부. 가격 없는 종목은 제외.
+    """
+    weights = np.zeros(tradable.shape)
+    for k, codes_k in enumerate(picks):
+        idx = codes.get_indexer(codes_k)
+        idx = idx[idx >= 0]
+        idx = idx[tradable[k, idx]]
+        if len(idx):
+            weights[k, idx] = 1.0 / len(idx)
+    return weights
+
+
+# =============================================================================
+# 시뮬레이션 (배열 연산)
+# =============================================================================
+
+def relative_prices(prices: np.ndarray, rebal_idx: np.ndarray):
+    """
+    각 거래일 가격 / 그 거래일이 속한 보유기간 시작일 가격
+
+    Returns:
+        (seg, rel)
+        seg: (T',) 첫 리밸런싱일부터 각 거래일의 보유기간 번호
+        rel: (T', 종목) 가격 배율 (가격 없음 → 0)
+    """
+    seg = np.searchsorted(rebal_idx, np.arange(rebal_idx[0], len(prices)), side="right") - 1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rel = prices[rebal_idx[0]:] / prices[rebal_idx][seg]
+    return seg, np.nan_to_num(rel, nan=0.0, posinf=0.0, neginf=0.0)
+
+
+def simulate(prices: np.ndarray, rebal_idx: np.ndarray, seg: np.ndarray, rel: np.ndarray,
+             weights: np.ndarray, cost_rate: float = 0.0):
+    """
+    비중 배열 → 일별 평가액 / 리밸런싱별 회전율 (초기 자본 1.0, 비중 합 < 1이면 나머지는 현금)
+
+    Returns:
+        (equity, turnover)
+        equity  : (T',) 첫 리밸런싱일부터 일별 평가액
+        turnover: (리밸런싱,) 편도 회전율 (첫 회는 현금 → 매수)
+    """
+    cash = 1.0 - weights.sum(axis=1)
+
+    # 보유기간 끝(다음 리밸런싱일)의 기간 수익 배율과 가격 변동으로 바뀐 비중
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rel_end = np.nan_to_num(prices[rebal_idx[1:]] / prices[rebal_idx[:-1]], nan=0.0, posinf=0.0, neginf=0.0)
+    grown = weights[:-1] * rel_end
+    g_end = grown.sum(axis=1) + cash[:-1]
+    drifted = grown / np.where(g_end > 0, g_end, 1.0)[:, None]
+
+    traded = np.abs(weights - np.vstack([np.zeros((1, weights.shape[1])), drifted])).sum(axis=1)
+    step = 1.0 - cost_rate * traded
+    step[1:] *= g_end
+    start_equity = np.cumprod(step)
+
+    growth = np.einsum("tn,tn->t", weights[seg], rel) + cash[seg]
+    return start_equity[seg] * growth, traded / 2
+
+
+def performance_summary(equity: pd.Series, turnover: np.ndarray) -> dict:
+    """평가액 시계열 + 회전율 → 성과 지표 dict"""
+    years = (equity.index[-1] - equity.index[0]).days / 365.25
+    returns = equity.pct_change().dropna()
+    vol = returns.std() * np.sqrt(TRADING_DAYS)
+    avg_turnover = turnover[1:].mean() if len(turnover) > 1 else np.nan
+    return {
+        "CAGR(%)": ((equity.iloc[-1] / 1.0) ** (1 / years) - 1) * 100 if years > 0 else np.nan,
+        "MDD(%)": (equity / equity.cummax() - 1).min() * 100,
+        "연변동성(%)": vol * 100,
+        "샤프": returns.mean() * TRADING_DAYS / vol if vol > 0 else np.nan,
+        "평균회전율(%)": avg_turnover * 100,
+        "연환산회전율(%)": avg_turnover * (len(turnover) - 1) / years * 100 if years > 0 else np.nan,
+        "최종평가액": equity.iloc[-1],
+    }
+
+
+# =============================================================================
+# 실행
+# =============================================================================
+
+def run_backtest(prices: pd.DataFrame, backtest_cfg: dict, strategy_cfg: dict,
+                 composite_weights: dict, common_filter_cfg: dict,
+                 start=None, end=None) -> dict:
+    """
+    월별 리밸런싱 백테스트
+
+    Args:
+        prices      : load_price_table 결과 (날짜 × 종목코드)
+        backtest_cfg: BACKTEST_CONFIG (rebalance, top_n, cost_bps, strategies, processes)
+        start / end : 기간 (None이면 가격 테이블 전체)
+
+    Returns:
+        {
+            'summary':  DataFrame (전략 × 성과 지표),
+            'equity':   DataFrame (날짜 × 전략, 초기 자본 1.0),
+            'turnover': DataFrame (리밸런싱일 × 전략, 편도 회전율),
+            'holdings': DataFrame (리밸런싱일, 전략, 종목코드, 비중),
+        }
+    """
+    strategies = backtest_cfg.get("strategies", ALL_STRATEGIES)
+    prices = prices.loc[start:end]
+    dates = rebalance_dates(prices.index, backtest_cfg.get("rebalance", "M"))
+
+    # 스냅샷이 모두 갖춰지기 전 리밸런싱일은 건너뜀
+    available = np.logical_and.reduce([fin_history.collected_as_of(dates, source).notna()
+                                       for source in fin_history.SOURCES])
+    dates = dates[available]
+    if len(dates) == 0:
+        raise FileNotFoundError(f"가격 테이블 기간에 이력 스냅샷이 없습니다: {fin_history.HISTORY_DIR}")
+
+    print(f"\n🔁 백테스트: {dates[0].date()} ~ {prices.index[-1].date()}, "
+          f"리밸런싱 {len(dates)}회, 종목 {prices.shape[1]}개, 전략 {len(strategies)}개")
+
+    started = time.perf_counter()
+    selections = select_portfolios(dates, strategies, strategy_cfg, composite_weights, common_filter_cfg,
+                                   backtest_cfg.get("top_n", 20), backtest_cfg.get("processes"))
+    selected_at = time.perf_counter()
+
+    rebal_idx = prices.index.get_indexer(dates)
+    tradable = prices.iloc[rebal_idx].notna().to_numpy()
+    price_arr = prices.ffill().to_numpy()
+    seg, rel = relative_prices(price_arr, rebal_idx)
+    cost_rate = backtest_cfg.get("cost_bps", 0) / 10_000
+
+    equity, turnover, summary, holdings = {}, {}, {}, []
+    for name in strategies:
+        weights = weights_matrix(selections[name], prices.columns, tradable)
+        eq, to = simulate(price_arr, rebal_idx, seg, rel, weights, cost_rate)
+        equity[name] = pd.Series(eq, index=prices.index[rebal_idx[0]:])
+        turnover[name] = to
+        summary[name] = performance_summary(equity[name], to)
+
+        k, n = np.nonzero(weights)
+        holdings.append(pd.DataFrame({"리밸런싱일": dates[k], "전략": name,
+                                      "종목코드": prices.columns[n], "비중": weights[k, n]}))
+
+    print(f"  ⏱  종목 선정 {selected_at - started:.1f}s, 시뮬레이션 {time.perf_counter() - selected_at:.2f}s")
+
+    return {
+        "summary": pd.DataFrame(summary).T.rename_axis("전략"),
+        "equity": pd.DataFrame(equity).rename_axis("date"),
+        "turnover": pd.DataFrame(turnover, index=dates).rename_axis("리밸런싱일"),
+        "holdings": pd.concat(holdings, ignore_index=True),
+    }
+
+
+def main():
+    import datetime
+    import sys
+
+    from agent_config import BACKTEST_CONFIG, COMMON_FILTERS, COMPOSITE_WEIGHTS, STRATEGY_CONFIG
+    from fin_utils import save_styled_excel_multisheet
+
+    args = sys.argv[1:]
+    start = args[0] if len(args) > 0 else None
+    end = args[1] if len(args) > 1 else None
+
+    prices = load_price_table(BACKTEST_CONFIG["price_file"])
+    result = run_backtest(prices, BACKTEST_CONFIG, STRATEGY_CONFIG, COMPOSITE_WEIGHTS, COMMON_FILTERS,
+                          start=start, end=end)
+
+    print("\n📊 성과 요약")
+    print(result["summary"].round(2).to_string())
+
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M")
+    output_path = f"derived/backtest_{timestamp}.xlsx"
+    save_styled_excel_multisheet([
+        ("성과", result["summary"].reset_index()),
+        ("평가액", result["equity"].reset_index()),
+        ("회전율", result["turnover"].reset_index()),
+        ("보유종목", result["holdings"]),
+    ], output_path)
+    print(f"\n💾 결과 저장: {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -20,7 +20,7 @@
 #   - Top N 선정 (기본값 30)
 
 import pandas as pd
-from strat_utils import _recent_cols, _best_col, _normalize
+from strat_utils import _year_cols, _recent_cols, _best_col, _normalize
 
 
 def strategy_greenblatt(df: pd.DataFrame, cfg: dict) -> pd.DataFrame:
@@ -33,9 +33,10 @@ def strategy_greenblatt(df: pd.DataFrame, cfg: dict) -> pd.DataFrame:
     """
     result = df.copy()
 
-    ev_col   = _best_col(result, _recent_cols(result, "_EV/EBITDA"))
-    roic_col = _best_col(result, _recent_cols(result, "(누적)_ROIC"))
-    debt_col = _best_col(result, _recent_cols(result, "(누적)_부채비율"))
+    years    = _year_cols(result)
+    ev_col   = _best_col(result, _recent_cols(years, "_EV/EBITDA"))
+    roic_col = _best_col(result, _recent_cols(years, "(누적)_ROIC"))
+    debt_col = _best_col(result, _recent_cols(years, "(누적)_부채비율"))
 
     if not ev_col or not roic_col:
         print("  ⚠️ Greenblatt 전략: 필요 컬럼 없음 (EV/EBITDA 또는 ROIC)")
@@ -23,7 +23,7 @@
 
 import numpy as np
 import pandas as pd
-from strat_utils import _recent_cols, _best_col, _normalize
+from strat_utils import _year_cols, _recent_cols, _best_col, _normalize
 
 
 def strategy_peg(df: pd.DataFrame, cfg: dict) -> pd.DataFrame:
@@ -34,8 +34,9 @@ def strategy_peg(df: pd.DataFrame, cfg: dict) -> pd.DataFrame:
     result = df.copy()
 
     # --- 컬럼 동적 탐색 (연도 하드코딩 없음) ---
-    per_col  = _best_col(result, _recent_cols(result, "_PER(배)"))
-    debt_col = _best_col(result, _recent_cols(result, "(누적)_부채비율"))
+    years    = _year_cols(result)
+    per_col  = _best_col(result, _recent_cols(years, "_PER(배)"))
+    debt_col = _best_col(result, _recent_cols(years, "(누적)_부채비율"))
 
     if not per_col:
         print("  ⚠️ PEG 전략: PER 컬럼 없음")
@@ -45,7 +46,7 @@ def strategy_peg(df: pd.DataFrame, cfg: dict) -> pd.DataFrame:
 
     # EPS 성장률: 3년 CAGR 우선 (invest_idx의 절대값 EPS 활용)
     # 컬럼명은 파서에 따라 "{year}_EPS(원)" 또는 "{year}_EPS" 두 가지 가능
-    eps_abs_cols = _recent_cols(result, "_EPS(원)", n=4) or _recent_cols(result, "_EPS", n=4)
+    eps_abs_cols = _recent_cols(years, "_EPS(원)", n=4) or _recent_cols(years, "_EPS", n=4)
     if len(eps_abs_cols) >= 4:
         eps_new = pd.to_numeric(result[eps_abs_cols[0]], errors="coerce")
         eps_old = pd.to_numeric(result[eps_abs_cols[3]], errors="coerce")
@@ -57,7 +58,7 @@ def strategy_peg(df: pd.DataFrame, cfg: dict) -> pd.DataFrame:
         eps_method = "3yr CAGR"
     else:
         # fallback: 최근 3개년 연간 EPS증가율 평균
-        eps_gr_cols = _recent_cols(result, "(누적)_EPS증가율", n=3)
+        eps_gr_cols = _recent_cols(years, "(누적)_EPS증가율", n=3)
         if not eps_gr_cols:
             print("  ⚠️ PEG 전략: EPS 데이터 없음")
             return pd.DataFrame()
@@ -26,7 +26,7 @@
 #   - F-Score >= min_score (기본값 6)
 
 import pandas as pd
-from strat_utils import _recent_cols, _best_col, _normalize
+from strat_utils import _year_cols, _recent_cols, _best_col, _normalize
 
 
 def strategy_piotroski(df: pd.DataFrame, cfg: dict) -> pd.DataFrame:
@@ -37,8 +37,10 @@ def strategy_piotroski(df: pd.DataFrame, cfg: dict) -> pd.DataFrame:
     result = df.copy()
 
     # --- 컬럼 동적 탐색: _recent_cols()로 연도 무관하게 최신/전년 자동 선택 ---
+    years = _year_cols(result)
+
     def _pair(suffix):
-        cols = _recent_cols(result, suffix, n=2)
+        cols = _recent_cols(years, suffix, n=2)
         return (cols[0] if cols else None,
                 cols[1] if len(cols) > 1 else None)
 
@@ -47,8 +49,8 @@ def strategy_piotroski(df: pd.DataFrame, cfg: dict) -> pd.DataFrame:
     cur_cur,  cur_prev  = _pair("(누적)_유동비율")
     opm_cur,  opm_prev  = _pair("(누적)_영업이익률")
     ato_cur,  ato_prev  = _pair("(누적)_총자산회전율")
-    cf_col  = _best_col(result, _recent_cols(result, "(연간)_영업활동현금흐름"))
-    ni_col  = _best_col(result, _recent_cols(result, "(연간)_당기순이익"))
+    cf_col  = _best_col(result, _recent_cols(years, "(연간)_영업활동현금흐름"))
+    ni_col  = _best_col(result, _recent_cols(years, "(연간)_당기순이익"))
 
     scores = pd.DataFrame(index=result.index)
 
@@ -0,0 +1,214 @@
+# strat_sweep.py
+# 전략 파라미터 스윕 — STRATEGY_CONFIG / COMPOSITE_WEIGHTS 조합을 한 번에 비교
+#
+# 실행: python strat_sweep.py [기준일]   (기준일 생략 시 DATA_CONFIG 파일, 지정 시 fin_history 스냅샷)
+#
+# 방식:
+#   1. 데이터 로드 → merge_base → apply_common_filters 를 한 번만 수행
+#   2. 베이스 DataFrame은 Pool initializer로 worker마다 한 번만 넘김
+#      (fork 환경은 copy-on-write로 공유, spawn 환경은 worker당 1회 pickle)
+#   3. SWEEP_CONFIG["grid"]를 조합별 설정으로 펼치고, 전략별로 설정이 같은 조합은 한 번만 실행
+#   4. 조합별 종합점수 계산 → 비교 테이블 1개로 저장
+#
+# 그리드 키 (점으로 구분한 설정 경로):
+#   "peg.max_peg"               → STRATEGY_CONFIG["peg"]["max_peg"]
+#   "multifactor.weights.모멘텀" → STRATEGY_CONFIG["multifactor"]["weights"]["모멘텀"]
+#   "composite.peg"             → COMPOSITE_WEIGHTS["peg"]
+#
+# 비교 테이블 (1행 = 1조합, 첫 행은 현재 설정 그대로인 '기준'):
+#   그리드 키별 적용 값, 전략별 선정 종목 수, 종합 종목 수, 종합 상위 top_n 종목코드,
+#   기준 대비 종합 상위 일치율(%)
+
+import contextlib
+import copy
+import io
+import itertools
+import json
+import multiprocessing as mp
+
+import pandas as pd
+
+from agent_strategies import build_composite_score
+from strat_backtest import STRATEGIES
+
+# =============================================================================
+# 그리드 → 조합별 설정
+# =============================================================================
+
+def expand_grid(grid: dict) -> list:
+    """{키: [값, ...]} → [{키: 값, ...}, ...] (모든 조합, 키 순서 유지)"""
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def apply_overrides(strategy_cfg: dict, composite_weights: dict, overrides: dict):
+    """
+    설정 사본에 조합 값 적용 → (strategy_cfg, composite_weights)
+
+    없는 경로는 새로 만든다 (예: 기본값에만 의존하던 항목).
+    """
+    strategy_cfg = copy.deepcopy(strategy_cfg)
+    composite_weights = dict(composite_weights)
+    for path, value in overrides.items():
+        head, *rest = path.split(".")
+        if head == "composite":
+            composite_weights[".".join(rest)] = value
+            continue
+        node = strategy_cfg.setdefault(head, {})
+        for part in rest[:-1]:
+            node = node.setdefault(part, {})
+        node[rest[-1]] = value
+    return strategy_cfg, composite_weights
+
+
+def lookup(strategy_cfg: dict, composite_weights: dict, path: str):
+    """설정 경로의 현재 값 (없으면 None)"""
+    head, *rest = path.split(".")
+    if head == "composite":
+        return composite_weights.get(".".join(rest))
+    node = strategy_cfg.get(head, {})
+    for part in rest:
+        if not isinstance(node, dict) or part not in node:
+            return None
+        node = node[part]
+    return node
+
+
+def _cfg_key(cfg: dict) -> str:
+    return json.dumps(cfg, sort_keys=True, ensure_ascii=False, default=str)
+
+
+# =============================================================================
+# worker (베이스 DataFrame은 initializer로 1회 전달)
+# =============================================================================
+
+_BASE: pd.DataFrame | None = None
+_EXTRA: tuple = (None, None)  # (ncav_df, nfav_df)
+
+
+def _init_worker(base: pd.DataFrame, ncav_df: pd.DataFrame, nfav_df: pd.DataFrame):
+    global _BASE, _EXTRA
+    _BASE = base
+    _EXTRA = (ncav_df, nfav_df)
+
+
+def _run_strategy(args) -> pd.DataFrame:
+    """(전략명, 전략 설정) → 전략 결과"""
+    name, cfg = args
+    with contextlib.redirect_stdout(io.StringIO()):
+        return STRATEGIES[name][0](_BASE, cfg)
+
+
+def _run_composite(args) -> pd.DataFrame:
+    """(전략별 결과 dict, 종합 가중치) → 종합 랭킹"""
+    results, weights = args
+    ncav_df, nfav_df = _EXTRA
+    return build_composite_score(
+        base_df=_BASE,
+        peg_df=results["peg"],
+        piotroski_df=results["piotroski"],
+        greenblatt_df=results["greenblatt"],
+        multifactor_df=results["multifactor"],
+        ncav_df=ncav_df,
+        nfav_df=nfav_df,
+        weights=weights,
+    )
+
+
+# =============================================================================
+# 스윕 실행
+# =============================================================================
+
+def run_sweep(base: pd.DataFrame, grid: dict, strategy_cfg: dict, composite_weights: dict,
+              ncav_df: pd.DataFrame | None = None, nfav_df: pd.DataFrame | None = None,
+              top_n: int = 20, processes: int | None = None) -> pd.DataFrame:
+    """
+    파라미터 조합별 전략 실행 → 비교 테이블
+
+    Args:
+        base: merge_base + apply_common_filters 결과 (모든 조합이 공유)
+        grid: {설정 경로: [값, ...]} (파일 상단 주석 참고)
+        ncav_df / nfav_df: strategy_ncav_nfav 결과 (조합과 무관, 종합점수에만 사용)
+        top_n: 비교할 종합 상위 종목 수
+        processes: worker 수 (None이면 CPU 수, 1이면 현재 프로세스에서 실행)
+
+    Returns:
+        DataFrame (1행 = 1조합, 첫 행은 현재 설정 '기준')
+    """
+    ncav_df = pd.DataFrame() if ncav_df is None else ncav_df
+    nfav_df = pd.DataFrame() if nfav_df is None else nfav_df
+
+    combos = [{}] + expand_grid(grid)
+    configs = [apply_overrides(strategy_cfg, composite_weights, overrides) for overrides in combos]
+
+    # 전략별로 설정이 같은 조합은 한 번만 실행
+    strategy_jobs: dict[tuple[str, str], tuple[str, dict]] = {}
+    for cfg, _ in configs:
+        for name in STRATEGIES:
+            strategy_jobs.setdefault((name, _cfg_key(cfg.get(name, {}))), (name, cfg.get(name, {})))
+
+    processes = processes or mp.cpu_count()
+    print(f"\n🧪 파라미터 스윕: 조합 {len(combos) - 1}개 (+기준), 전략 실행 {len(strategy_jobs)}회, "
+          f"프로세스 {processes}개")
+
+    def _execute(pool):
+        run = pool.map if pool is not None else map
+        strategy_results = dict(zip(strategy_jobs, run(_run_strategy, list(strategy_jobs.values()))))
+        per_combo = [{name: strategy_results[(name, _cfg_key(cfg.get(name, {})))] for name in STRATEGIES}
+                     for cfg, _ in configs]
+        composites = list(run(_run_composite, [(results, weights)
+                                                for results, (_, weights) in zip(per_combo, configs)]))
+        return per_combo, composites
+
+    if processes > 1:
+        with mp.Pool(processes=processes, initializer=_init_worker, initargs=(base, ncav_df, nfav_df)) as pool:
+            per_combo, composites = _execute(pool)
+    else:
+        _init_worker(base, ncav_df, nfav_df)
+        per_combo, composites = _execute(None)
+
+    rows: list[dict] = []
+    baseline = None
+    for overrides, (cfg, weights), results, composite in zip(combos, configs, per_combo, composites):
+        top = composite.head(top_n)["종목코드"].tolist()
+        if baseline is None:
+            baseline = set(top)
+        row: dict[str, object] = {"조합": "기준" if not overrides else len(rows)}
+        row.update({key: lookup(cfg, weights, key) for key in grid})
+        row.update({f"{name}_종목수": len(results[name]) for name in STRATEGIES})
+        row["종합_종목수"] = len(composite)
+        row["기준대비_일치율(%)"] = len(baseline & set(top)) / len(baseline) * 100 if baseline else None
+        row[f"종합_상위{top_n}"] = ",".join(top)
+        rows.append(row)
+
+    return pd.DataFrame(rows)
+
+
+def main():
+    import datetime
+    import sys
+
+    from agent_config import COMMON_FILTERS, COMPOSITE_WEIGHTS, DATA_CONFIG, STRATEGY_CONFIG, SWEEP_CONFIG
+    from fin_utils import save_styled_excel
+    from strat_ncav_nfav import strategy_ncav_nfav
+    from strat_utils import apply_common_filters, load_all_data, load_data_as_of, merge_base
+
+    as_of = sys.argv[1] if len(sys.argv) > 1 else None
+    data = load_data_as_of(as_of) if as_of else load_all_data(DATA_CONFIG)
+    base = apply_common_filters(merge_base(data), COMMON_FILTERS)
+    ncav_df, nfav_df = strategy_ncav_nfav(DATA_CONFIG) if not as_of else (None, None)
+
+    table = run_sweep(base, SWEEP_CONFIG["grid"], STRATEGY_CONFIG, COMPOSITE_WEIGHTS, ncav_df, nfav_df,
+                      top_n=SWEEP_CONFIG.get("top_n", 20), processes=SWEEP_CONFIG.get("processes"))
+
+    print("\n📊 조합 비교")
+    print(table.drop(columns=[c for c in table.columns if c.startswith("종합_상위")]).to_string(index=False))
+
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M")
+    output_path = f"derived/sweep_{timestamp}.xlsx"
+    save_styled_excel(table, output_path)
+    print(f"\n💾 결과 저장: {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,19 @@
 # strat_utils.py
 # 전략 모듈 공통 유틸리티
-# - FnGuide Excel 파일 로딩 (load_all_data, merge_base)
+# - FnGuide 산출물 로딩 (load_all_data, merge_base) - xlsx보다 오래되지 않은 Parquet/Feather 우선, 없으면 xlsx
+# - 과거 시점 데이터 로딩 (load_data_as_of) - fin_history 이력 저장소
 # - 공통 종목 필터 (apply_common_filters)
-# - 동적 컬럼 탐색 헬퍼 (_recent_cols, _best_col)
+# - 동적 컬럼 탐색 헬퍼 (_year_cols, _recent_cols, _best_col)
 # - 정규화 헬퍼 (_normalize)
 
 import os
 import glob
-import re
 import warnings
 import numpy as np
 import pandas as pd
 
+from fin_columns import recent_year_columns, year_suffix_index
+
 warnings.filterwarnings("ignore")
 
 
@@ -19,10 +21,64 @@ warnings.filterwarnings("ignore")
 # 데이터 로더
 # =============================================================================
 
+DATASET_EXTS = (".parquet", ".feather")
+
+
+def _dataset_path(xlsx_path: str):
+    """
+    xlsx와 같은 이름의 Parquet/Feather 데이터셋 경로 (없으면 None)
+
+    xlsx가 데이터셋보다 나중에 저장됐으면 (예: xlsx만 다시 만든 경우) 데이터셋이 오래된 것이므로 None.
+    """
+    stem, _ = os.path.splitext(xlsx_path)
+    xlsx_mtime = os.path.getmtime(xlsx_path) if os.path.exists(xlsx_path) else None
+    for ext in DATASET_EXTS:
+        path = stem + ext
+        if os.path.exists(path):
+            if xlsx_mtime is not None and os.path.getmtime(path) < xlsx_mtime:
+                continue
+            return path
+    return None
+
+
+def _strings_to_object(df: pd.DataFrame) -> pd.DataFrame:
+    """string dtype → object (기존 xlsx 로딩 결과와 동일한 동작 유지)"""
+    str_cols = df.select_dtypes(include="string").columns
+    df[str_cols] = df[str_cols].astype(object).where(df[str_cols].notna(), None)
+    return df
+
+
+def _read_frame(path: str, multi_sheet: bool = False) -> pd.DataFrame:
+    """
+    fngCollect 산출물 1개를 DataFrame으로 읽습니다.
+    같은 이름의 .parquet/.feather가 xlsx와 같거나 나중에 저장됐으면 우선 사용하고, 아니면 xlsx를 읽습니다.
+    multi_sheet=True이면 xlsx의 모든 업종 시트를 수직으로 합칩니다.
+    """
+    dataset = _dataset_path(path)
+    if dataset is not None:
+        if dataset.endswith(".parquet"):
+            df = pd.read_parquet(dataset)
+        else:
+            df = pd.read_feather(dataset)
+        df = _strings_to_object(df)
+    elif os.path.exists(path):
+        if multi_sheet:
+            sheets = pd.read_excel(path, sheet_name=None, dtype={"종목코드": str})
+            df = pd.concat(sheets.values(), ignore_index=True)
+        else:
+            df = pd.read_excel(path, dtype={"종목코드": str})
+    else:
+        return None
+
+    df["종목코드"] = df["종목코드"].str.zfill(6)
+    return df
+
+
 def load_all_data(config: dict) -> dict:
     """
-    4개의 xlsx 파일을 로드하고 제조업 시트를 기준으로 합칩니다.
+    4개의 데이터 파일을 로드하고 제조업 시트를 기준으로 합칩니다.
     재무비율/재무제표는 모든 업종 시트를 수직으로 합칩니다.
+    xlsx와 같은 이름의 .parquet/.feather 파일이 xlsx보다 오래되지 않았으면 그쪽을 우선 읽습니다.
 
     Returns:
         {
@@ -35,46 +91,47 @@ def load_all_data(config: dict) -> dict:
     print("📂 데이터 파일 로딩 중...")
 
     data = {}
+    sources = [
+        # (data 키, config 키, 표시명, 업종별 멀티시트 여부)
+        ("snapshot", "snapshot_file", "snapshot", False),
+        ("invest", "invest_idx_file", "invest_idx", False),
+        ("finance", "finance_file", "finance", True),
+        ("ratio", "ratio_file", "ratio", True),
+    ]
+    for key, config_key, label, multi_sheet in sources:
+        path = config[config_key]
+        df = _read_frame(path, multi_sheet)
+        if df is None:
+            raise FileNotFoundError(f"{label} 파일 없음: {path}")
+        data[key] = df
+        print(f"  ✅ {label}: {len(df)}개 종목")
 
-    # snapshot (단일 시트)
-    snap_path = config["snapshot_file"]
-    if os.path.exists(snap_path):
-        data["snapshot"] = pd.read_excel(snap_path, dtype={"종목코드": str})
-        data["snapshot"]["종목코드"] = data["snapshot"]["종목코드"].str.zfill(6)
-        print(f"  ✅ snapshot: {len(data['snapshot'])}개 종목")
-    else:
-        raise FileNotFoundError(f"snapshot 파일 없음: {snap_path}")
-
-    # invest_idx (단일 시트)
-    inv_path = config["invest_idx_file"]
-    if os.path.exists(inv_path):
-        data["invest"] = pd.read_excel(inv_path, dtype={"종목코드": str})
-        data["invest"]["종목코드"] = data["invest"]["종목코드"].str.zfill(6)
-        print(f"  ✅ invest_idx: {len(data['invest'])}개 종목")
-    else:
-        raise FileNotFoundError(f"invest_idx 파일 없음: {inv_path}")
-
-    # finance (여러 업종 시트 합산)
-    fin_path = config["finance_file"]
-    if os.path.exists(fin_path):
-        fin_sheets = pd.read_excel(fin_path, sheet_name=None, dtype={"종목코드": str})
-        fin_df = pd.concat(fin_sheets.values(), ignore_index=True)
-        fin_df["종목코드"] = fin_df["종목코드"].str.zfill(6)
-        data["finance"] = fin_df
-        print(f"  ✅ finance: {len(fin_df)}개 종목")
-    else:
-        raise FileNotFoundError(f"finance 파일 없음: {fin_path}")
-
-    # ratio (여러 업종 시트 합산)
-    rat_path = config["ratio_file"]
-    if os.path.exists(rat_path):
-        rat_sheets = pd.read_excel(rat_path, sheet_name=None, dtype={"종목코드": str})
-        rat_df = pd.concat(rat_sheets.values(), ignore_index=True)
-        rat_df["종목코드"] = rat_df["종목코드"].str.zfill(6)
-        data["ratio"] = rat_df
-        print(f"  ✅ ratio: {len(rat_df)}개 종목")
-    else:
-        raise FileNotFoundError(f"ratio 파일 없음: {rat_path}")
+    return data
+
+
+def load_data_as_of(when) -> dict:
+    """
+    fin_history 이력 저장소에서 when 시점에 알 수 있었던 데이터를 로드합니다.
+    load_all_data와 같은 형식이므로 merge_base 이하 전략 코드를 그대로 쓸 수 있습니다.
+
+    Args:
+        when: datetime / date / 'YYYY-MM-DD' (날짜만 주면 그날 수집분 포함)
+
+    Returns:
+        load_all_data와 동일한 dict. 각 DataFrame의 attrs['collected_at']에 수집 시각.
+    """
+    import fin_history
+
+    data = {}
+    # (data 키, fin_history source)
+    for key, source in [("snapshot", "snapshot"), ("invest", "investidx"),
+                        ("finance", "finance"), ("ratio", "ratio")]:
+        df = fin_history.as_of(when, source)
+        if df is None:
+            raise FileNotFoundError(f"{source} 이력 없음: {when} 이전 수집분이 없습니다")
+        df = _strings_to_object(df)
+        df["종목코드"] = df["종목코드"].str.zfill(6)
+        data[key] = df
 
     return data
 
@@ -130,8 +187,9 @@ def apply_common_filters(df: pd.DataFrame, config: dict) -> pd.DataFrame:
 
     # 최소 시가총액 필터 (snapshot의 BPS * 발행주식수로 근사)
     # 직접 시가총액 컬럼이 없으므로 PBR × BPS × 주식수로 추정
-    pbr_col = _best_col(df, _recent_cols(df, "_PBR(배)"))
-    bps_col = _best_col(df, _recent_cols(df, "_BPS(원)"))
+    years = _year_cols(df)
+    pbr_col = _best_col(df, _recent_cols(years, "_PBR(배)"))
+    bps_col = _best_col(df, _recent_cols(years, "_BPS(원)"))
     if "발행주식수(천주)" in df.columns and pbr_col and bps_col:
         df["추정시가총액_억"] = (
             pd.to_numeric(df[pbr_col], errors="coerce") *
@@ -151,21 +209,20 @@ def apply_common_filters(df: pd.DataFrame, config: dict) -> pd.DataFrame:
 # 헬퍼 함수
 # =============================================================================
 
-def _recent_cols(df: pd.DataFrame, suffix: str, n: int = 3) -> list:
+def _year_cols(df: pd.DataFrame) -> dict:
+    """'{YYYY}{suffix}' 컬럼 색인 (프레임당 1회 만들어 _recent_cols에 넘김)"""
+    return year_suffix_index(df.columns)
+
+
+def _recent_cols(df, suffix: str, n: int = 3) -> list:
     """
     컬럼명이 '{YYYY}{suffix}' 패턴인 것을 연도 내림차순으로 최대 n개 반환.
+    df 대신 _year_cols(df) 결과를 넘기면 컬럼 색인을 다시 만들지 않는다.
 
     예) suffix="_PER(배)"         → ["2025_PER(배)", "2024_PER(배)", ...]
         suffix="(누적)_EPS증가율" → ["2025(누적)_EPS증가율", "2024(누적)_EPS증가율", ...]
     """
-    pattern = re.compile(r'^(\d{4})' + re.escape(suffix) + r'$')
-    matched = sorted(
-        ((int(m.group(1)), col)
-         for col in df.columns
-         if (m := pattern.match(col))),
-        reverse=True,
-    )
-    return [col for _, col in matched[:n]]
+    return recent_year_columns(df if isinstance(df, dict) else df.columns, suffix, n)
 
 
 def _best_col(df: pd.DataFrame, candidates: list) -> str | None:
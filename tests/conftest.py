@@ -0,0 +1,71 @@
+"""
+테스트 공용 fixture
+
+  cache_dir   : 임시 디렉토리로 이동 + fin_cache 공용 CacheManager 초기화
+  http_server : 로컬 aiohttp 서버 (백그라운드 스레드) — 경로별 핸들러 등록 후 base URL 사용
+"""
+import asyncio
+import socket
+import threading
+
+import pytest
+from aiohttp import web
+
+import fin_cache
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    """derived/ 이하를 tmp_path에 만들도록 cwd 변경, 프로세스 공용 CacheManager 초기화"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(fin_cache, '_manager', None)
+    monkeypatch.setattr(fin_cache, '_manager_pid', None)
+    return tmp_path
+
+
+class _Server:
+    def __init__(self):
+        self.routes = {}    # path → async handler(request)
+        self.hits = []      # [(path, 요청 헤더 dict), ...]
+        self.base_url = None
+
+    def route(self, path, handler):
+        self.routes[path] = handler
+
+    async def _dispatch(self, request):
+        self.hits.append((request.path, dict(request.headers)))
+        handler = self.routes.get(request.path)
+        if handler is None:
+            return web.Response(status=404)
+        return await handler(request)
+
+
+@pytest.fixture
+def http_server():
+    server = _Server()
+    app = web.Application()
+    app.router.add_route('GET', '/{tail:.*}', server._dispatch)
+
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    server.base_url = f'http://127.0.0.1:{port}'
+
+    loop = asyncio.new_event_loop()
+    runner = web.AppRunner(app)
+    started = threading.Event()
+
+    def run():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(runner.setup())
+        loop.run_until_complete(web.TCPSite(runner, '127.0.0.1', port).start())
+        started.set()
+        loop.run_forever()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    started.wait(5)
+    yield server
+    asyncio.run_coroutine_threadsafe(runner.cleanup(), loop).result(5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(5)
@@ -0,0 +1,51 @@
+import time
+from datetime import datetime, timedelta
+
+from aiohttp import web
+
+from agent_kis_api import KISApi, TokenManager
+
+
+def test_short_lived_token_is_not_reissued_every_second(tmp_path):
+    """토큰 수명이 refresh_ahead보다 짧아도 백그라운드 갱신이 매초 재발급하지 않아야 함"""
+    issued = []
+
+    def issue():
+        issued.append(datetime.now())
+        return f'token-{len(issued)}', datetime.now() + timedelta(seconds=10)
+
+    manager = TokenManager(issue, 'test', cache_file=str(tmp_path / 'token.json'),
+                           refresh_ahead=timedelta(hours=1))
+    assert manager.get() == 'token-1'
+    manager.start()
+    try:
+        time.sleep(2.5)
+    finally:
+        manager.stop()
+    assert len(issued) == 1
+    assert manager.get() == 'token-1'
+
+
+def _api(base_url, tmp_path):
+    api = KISApi({'app_key': 'key', 'app_secret': 'secret', 'account_no': '12345678', 'is_paper_trading': True,
+                  'base_url_paper': base_url, 'base_url_real': base_url, 'rate_limit_per_sec': 100,
+                  'token_cache_file': str(tmp_path / 'token.json')})
+    api.tokens.token, api.tokens.expire = 'token', datetime.now() + timedelta(days=1)
+    return api
+
+
+def test_order_history_follows_continuation_pages(http_server, tmp_path):
+    def page(odnos):
+        return [{'pdno': '005930', 'sll_buy_dvsn_cd': '02', 'ord_qty': '1', 'odno': n} for n in odnos]
+
+    async def history(request):
+        if request.headers.get('tr_cont') == 'N' and request.query['CTX_AREA_NK100'] == 'nk1':
+            return web.json_response({'rt_cd': '0', 'output1': page(['0003'])}, headers={'tr_cont': 'D'})
+        return web.json_response({'rt_cd': '0', 'output1': page(['0001', '0002']),
+                                  'ctx_area_fk100': 'fk1', 'ctx_area_nk100': 'nk1'}, headers={'tr_cont': 'M'})
+
+    http_server.route('/uapi/domestic-stock/v1/trading/inquire-daily-ccld', history)
+    orders = _api(http_server.base_url, tmp_path).get_order_history(filled_only=False, strict=True)
+
+    assert [o['order_no'] for o in orders] == ['0001', '0002', '0003']
+    assert len(http_server.hits) == 2
@@ -0,0 +1,58 @@
+import asyncio
+import time
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+from agent_kis_stream import TR_EXECUTION, make_replay_app, parse_frame, subscribe_message
+
+
+def _record(code, price, volume):
+    fields = ['0'] * 46
+    fields[0], fields[1], fields[2] = code, '093015', str(price)
+    fields[5], fields[7], fields[8], fields[9] = '1.25', '70000', '72000', '69500'
+    fields[13] = str(volume)
+    return fields
+
+
+def test_parse_frame_multiple_records():
+    payload = '^'.join(_record('005930', 71000, 1200) + _record('000660', 180000, 300))
+    quotes = parse_frame(f'0|{TR_EXECUTION}|002|{payload}')
+    assert [q['code'] for q in quotes] == ['005930', '000660']
+    assert quotes[0] == {'code': '005930', 'time': '093015', 'price': 71000, 'open': 70000, 'high': 72000,
+                         'low': 69500, 'volume': 1200, 'change_rate': 1.25}
+    assert quotes[1]['price'] == 180000
+
+
+def test_parse_frame_ignores_encrypted_and_other_tr():
+    payload = '^'.join(_record('005930', 71000, 1200))
+    assert parse_frame(f'1|{TR_EXECUTION}|001|{payload}') == []
+    assert parse_frame(f'0|H0STASP0|001|{payload}') == []
+
+
+@pytest.mark.parametrize('frame', [
+    f'0|{TR_EXECUTION}|001',                                   # 구분자 누락
+    f'0|{TR_EXECUTION}|000|005930',                            # 레코드 수 0
+    f'0|{TR_EXECUTION}|001|005930^093015',                     # 필드 누락
+    f'0|{TR_EXECUTION}|001|' + '^'.join(['005930', '093015', 'abc'] + ['0'] * 43),  # 숫자 아님
+])
+def test_parse_frame_rejects_malformed(frame):
+    with pytest.raises((ValueError, IndexError)):
+        parse_frame(frame)
+
+
+def test_replay_with_no_ticks_does_not_spin():
+    """틱이 없는 repeat 재생은 구독 응답만 보내고 루프를 점유하지 않아야 함"""
+    async def run():
+        async with TestClient(TestServer(make_replay_app([], repeat=True))) as client:
+            ws = await client.ws_connect('/')
+            await ws.send_str(subscribe_message('key', '005930'))
+            ack = await ws.receive_json(timeout=5)
+            cpu = time.process_time()
+            await asyncio.sleep(0.3)
+            await ws.close()
+            return ack, time.process_time() - cpu
+
+    ack, cpu_used = asyncio.run(run())
+    assert ack['body']['msg1'] == 'SUBSCRIBE SUCCESS'
+    assert cpu_used < 0.15
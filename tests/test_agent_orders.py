@@ -0,0 +1,59 @@
+import requests
+
+import agent_orders
+from agent_orders import _OrderBook
+
+
+def _item(order_no, code='005930', side='매수', qty=10):
+    return {'order_no': order_no, 'code': code, 'side': side, 'qty': qty}
+
+
+def test_order_book_skips_known_and_claimed_orders():
+    history = [_item('0001'), _item('0002'), _item('0003', qty=5), _item('0004', side='매도')]
+    book = _OrderBook(known=['0001'])
+    order = {'code': '005930', 'qty': 10}
+
+    assert book.find(history, order, '매수') == '0002'
+    assert book.find(history, order, '매수') is None   # 이미 배정된 주문은 다시 잡지 않음
+    assert book.find(history, {'code': '005930', 'qty': 10}, '매도') == '0004'
+
+
+def test_order_book_claim_blocks_match():
+    book = _OrderBook()
+    book.claim('0002')
+    assert book.find([_item('0002')], {'code': '005930', 'qty': 10}, '매수') is None
+
+
+class _LostResponseApi:
+    """첫 주문 응답이 유실되지만 실제로는 접수된 API"""
+
+    def __init__(self):
+        self.placed = []
+
+    def place_order(self, code, side, qty, price, order_type):
+        self.placed.append(code)
+        raise requests.ReadTimeout('read timed out')
+
+    def get_order_history(self, filled_only=False, strict=False):
+        return [_item(f'{i:04d}', code=code) for i, code in enumerate(self.placed, 1)]
+
+
+def test_lost_response_is_reconciled_from_history_without_resubmitting():
+    api = _LostResponseApi()
+    order = {'code': '005930', 'qty': 10}
+    result = agent_orders._submit(api, order, 'buy', '00', _OrderBook(), max_retries=2, retry_backoff=0)
+
+    assert result['state'] == agent_orders.ACCEPTED
+    assert result['order_no'] == '0001'
+    assert api.placed == ['005930']
+
+
+def test_order_book_prefers_order_number_from_response():
+    """실패 응답에 주문번호가 있으면 같은 (종목, 수량)의 다른 주문을 잡지 않아야 함"""
+    history = [_item('0000000002'), _item('0000000003')]
+    book = _OrderBook()
+    order = {'code': '005930', 'qty': 10}
+
+    assert book.find(history, order, '매수', order_no='3') == '0000000003'
+    assert book.find(history, order, '매수', order_no='0000000004') is None
+    assert book.find(history, order, '매수') == '0000000002'
@@ -0,0 +1,89 @@
+import os
+import threading
+import time
+
+from aiohttp import web
+
+import fin_cache
+import fngCollect
+from fin_fetch import FetchJob, prefetch_to_cache
+
+
+async def _json_page(request):
+    return web.json_response({'ok': 1})
+
+
+def test_prepare_cache_then_fetch_from_another_thread(cache_dir, http_server):
+    """메인 스레드에서 연 캐시를 파이프라인 다운로드 스레드에서 써도 SQLite 스레드 오류가 없어야 함"""
+    http_server.route('/a.json', _json_page)
+    fngCollect.prepare_cache()
+
+    stats = {}
+    errors = []
+
+    def fetch():
+        try:
+            stats.update(prefetch_to_cache([FetchJob(f'{http_server.base_url}/a.json',
+                                                     'fnguide_MultiFactor/a.json', 'json')]))
+        except Exception as e:  # 스레드 예외를 메인 스레드로 전달
+            errors.append(e)
+
+    thread = threading.Thread(target=fetch)
+    thread.start()
+    thread.join(10)
+
+    assert errors == []
+    assert stats['fetched'] == 1 and stats['failed'] == 0
+    cache = fin_cache.get_cache_manager()
+    assert cache.read('fnguide_MultiFactor/a.json') == '{"ok": 1}'
+    assert cache.index.get('fnguide_MultiFactor/a.json') is not None
+
+
+def test_ttl_by_namespace():
+    assert fin_cache.ttl_for('fnguide_snapshot/A005930.html') == fin_cache.CACHE_TTL['fnguide_snapshot']
+    assert fin_cache.ttl_for('unknown/a.html') == fin_cache.DEFAULT_TTL
+    meta = {'fetched_at': 1000.0}
+    assert fin_cache.is_fresh(meta, 60, now=1059.0)
+    assert not fin_cache.is_fresh(meta, 60, now=1060.0)
+    assert not fin_cache.is_fresh(None, 60)
+
+
+def test_expired_entry_is_revalidated_with_conditional_get(cache_dir, http_server):
+    """TTL 이내는 요청 없이 캐시 사용, 만료 후에는 ETag로 조건부 GET → 304면 본문 유지"""
+    async def page(request):
+        if request.headers.get('If-None-Match') == '"v1"':
+            return web.Response(status=304)
+        return web.json_response({'ok': 1}, headers={'ETag': '"v1"'})
+
+    http_server.route('/a.json', page)
+    key = 'fnguide_MultiFactor/a.json'
+    job = FetchJob(f'{http_server.base_url}/a.json', key, 'json')
+
+    assert prefetch_to_cache([job])['fetched'] == 1
+    assert prefetch_to_cache([job])['cached'] == 1
+    assert len(http_server.hits) == 1
+
+    cache = fin_cache.get_cache_manager()
+    assert cache.expire([key]) == 1
+    assert not cache.is_fresh(key)
+
+    stats = prefetch_to_cache([job])
+    assert stats['revalidated'] == 1 and stats['fetched'] == 0
+    assert http_server.hits[-1][1].get('If-None-Match') == '"v1"'
+    assert cache.is_fresh(key)
+    assert cache.read(key) == '{"ok": 1}'
+
+
+def test_housekeeping_prunes_old_parse_cache(cache_dir):
+    old = cache_dir / 'derived' / 'parse_cache' / 'snapshot_v1-2025' / 'ab' / 'ab12.pkl'
+    new = cache_dir / 'derived' / 'parse_cache' / 'snapshot_v2' / 'cd' / 'cd34.pkl'
+    for path in (old, new):
+        path.parent.mkdir(parents=True)
+        path.write_bytes(b'x')
+    stale = time.time() - fin_cache.PARSE_CACHE_MAX_AGE - 60
+    os.utime(old, (stale, stale))
+
+    fin_cache.get_cache_manager().housekeeping()
+
+    assert not old.exists() and not old.parent.parent.exists()
+    assert new.exists()
@@ -0,0 +1,61 @@
+import random
+import re
+
+import pandas as pd
+
+import fngCollect
+from fin_columns import group_by_indicator
+
+# ── 기준 구현 (지표마다 남은 컬럼 전체를 훑던 원래 _order_columns) ──
+
+def _reference_sort_key(col):
+    m_annual = re.match(r'^(\d{4})\(연간\)', col)
+    if m_annual:
+        return (0, int(m_annual.group(1)), 0, col)
+    m_quarter = re.match(r'^(\d{4})/(\d)Q', col)
+    if m_quarter:
+        return (1, int(m_quarter.group(1)), int(m_quarter.group(2)), col)
+    return (2, 0, 0, col)
+
+
+def _reference_matches(col, indicator):
+    return col == indicator or col.startswith(f'{indicator}_') or f'_{indicator}' in col
+
+
+def _reference_order(columns, indicator_order):
+    remaining = list(columns)
+    ordered = []
+    for indicator in indicator_order:
+        matched = sorted((c for c in remaining if _reference_matches(c, indicator)), key=_reference_sort_key)
+        ordered.extend(matched)
+        remaining = [c for c in remaining if c not in matched]
+    return ordered + sorted(remaining, key=_reference_sort_key)
+
+
+def _sample_columns(indicators):
+    columns = []
+    for ind in indicators:
+        columns += [ind, f'{ind}_y-3', f'2023_{ind}', f'2023(연간)_{ind}', f'2025(연간)_{ind}',
+                    f'2024/1Q_{ind}', f'2024/3Q_{ind}', f'2025(누적)_{ind}']
+    columns += ['기타', '2024(연간)_기타지표', 'EPS', 'ROE_', '_ROA']
+    columns = list(dict.fromkeys(columns))
+    random.Random(0).shuffle(columns)
+    return columns
+
+
+def test_group_by_indicator_matches_reference_order():
+    indicators = fngCollect._get_indicator_order('all')
+    columns = _sample_columns(indicators)
+
+    groups, unmatched = group_by_indicator(columns, indicators)
+    ordered = [c for group in groups for c in group] + sorted(unmatched, key=_reference_sort_key)
+    assert ordered == _reference_order(columns, indicators)
+
+
+def test_order_columns_keeps_base_columns_first():
+    indicators = fngCollect._get_indicator_order('ratio')
+    columns = _sample_columns(indicators)
+    df = pd.DataFrame(columns=[*columns[:3], '종목명', '종목코드', *columns[3:]])
+
+    ordered = list(fngCollect._order_columns(df, indicators).columns)
+    assert ordered == ['종목코드', '종목명', *_reference_order(columns, indicators)]
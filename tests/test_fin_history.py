@@ -0,0 +1,52 @@
+from datetime import datetime
+
+import pandas as pd
+
+import fin_history
+
+
+def _snapshot(per):
+    return pd.DataFrame({'종목코드': ['005930', '000660', '035420'], 'PER(배)': per, '종목명': ['a', 'b', 'c']})
+
+
+def _store(tmp_path):
+    root = str(tmp_path / 'history')
+    fin_history.append(_snapshot([10.0, 11.0, 12.0]), 'snapshot', datetime(2026, 3, 31, 18, 0), root=root)
+    fin_history.append(_snapshot([20.0, 21.0, 22.0]), 'snapshot', datetime(2026, 4, 30, 18, 0), root=root)
+    return root
+
+
+def test_as_of_reads_latest_collection_before_when(tmp_path):
+    root = _store(tmp_path)
+
+    assert fin_history.as_of('2026-03-30', 'snapshot', root=root) is None
+    march = fin_history.as_of('2026-03-31', 'snapshot', root=root)  # 날짜만 주면 그날 수집분 포함
+    assert march['PER(배)'].tolist() == [10.0, 11.0, 12.0]
+    assert march.attrs['collected_at'] == pd.Timestamp('2026-03-31 18:00')
+    assert fin_history.as_of(datetime(2026, 4, 30, 17, 59), 'snapshot', root=root)['PER(배)'].iloc[0] == 10.0
+    assert fin_history.as_of('2026-05-15', 'snapshot', root=root)['PER(배)'].iloc[0] == 20.0
+
+
+def test_as_of_column_and_code_filters(tmp_path):
+    root = _store(tmp_path)
+    df = fin_history.as_of('2026-05-01', 'snapshot', columns=['PER(배)', '없는컬럼'], codes=['660'], root=root)
+    assert list(df.columns) == ['종목코드', 'PER(배)']
+    assert df['종목코드'].tolist() == ['000660']
+
+
+def test_collected_as_of_agrees_with_as_of(tmp_path):
+    root = _store(tmp_path)
+    whens = ['2026-03-01', '2026-03-31', '2026-04-15', '2026-04-30', '2026-12-31']
+    collected = fin_history.collected_as_of(whens, 'snapshot', root=root)
+    for when, expected in zip(whens, collected):
+        df = fin_history.as_of(when, 'snapshot', root=root)
+        assert (df is None and pd.isna(expected)) or df.attrs['collected_at'] == expected
+
+
+def test_append_same_second_does_not_overwrite(tmp_path):
+    root = str(tmp_path / 'history')
+    when = datetime(2026, 4, 30, 18, 0)
+    first = fin_history.append(_snapshot([1.0, 1.0, 1.0]), 'snapshot', when, root=root)
+    second = fin_history.append(_snapshot([2.0, 2.0, 2.0]), 'snapshot', when, root=root)
+    assert first != second
+    assert fin_history.as_of(when, 'snapshot', root=root)['PER(배)'].iloc[0] == 2.0
@@ -0,0 +1,49 @@
+import json
+
+import fin_journal
+
+ROW = {'scode': '005930', 'sname': '삼성전자'}
+ROW2 = {'scode': '000660', 'sname': 'SK하이닉스'}
+
+
+def test_resume_keeps_results_and_retries_errors(tmp_path):
+    path = str(tmp_path / 'finance_2026_04.jsonl')
+    with fin_journal.RunJournal(path) as journal:
+        journal.record_stock(ROW, {'finance': {'매출액': 1}}, {})
+        journal.record_stock(ROW2, {'finance': None}, {'finance': {'kind': 'transient', 'message': 'timeout'}})
+
+    with fin_journal.RunJournal(path, resume=True) as journal:
+        assert journal.pending([ROW, ROW2], ['finance']) == [ROW2]
+        assert journal.parsed('005930', ['finance']) == {'finance': {'매출액': 1}}
+        assert [rec['code'] for rec in journal.failures()] == ['000660']
+        journal.record_stock(ROW2, {'finance': {'매출액': 2}}, {})
+
+    with fin_journal.RunJournal(path, resume=True) as journal:
+        assert journal.pending([ROW, ROW2], ['finance']) == []
+        assert journal.failures() == []
+
+
+def test_resume_drops_truncated_last_line(tmp_path):
+    """기록 중 잘린 마지막 줄은 무시되고, 이어 쓴 레코드가 그 줄에 붙지 않아야 함"""
+    path = str(tmp_path / 'finance_2026_04.jsonl')
+    with fin_journal.RunJournal(path) as journal:
+        journal.record(ROW, 'finance', fin_journal.STATUS_OK, data={'매출액': 1})
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"code": "000660", "module": "fin')
+
+    with fin_journal.RunJournal(path, resume=True) as journal:
+        assert journal.pending([ROW, ROW2], ['finance']) == [ROW2]
+        journal.record(ROW2, 'finance', fin_journal.STATUS_OK, data={'매출액': 2})
+
+    with open(path, encoding='utf-8') as f:
+        assert [json.loads(line)['code'] for line in f] == ['005930', '000660']
+    with fin_journal.RunJournal(path, resume=True) as journal:
+        assert journal.pending([ROW, ROW2], ['finance']) == []
+
+
+def test_fresh_run_truncates_previous_journal(tmp_path):
+    path = str(tmp_path / 'finance_2026_04.jsonl')
+    with fin_journal.RunJournal(path) as journal:
+        journal.record(ROW, 'finance', fin_journal.STATUS_OK, data={})
+    with fin_journal.RunJournal(path) as journal:
+        assert journal.pending([ROW], ['finance']) == [ROW]
@@ -0,0 +1,56 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+from openpyxl import load_workbook
+
+import fin_utils
+
+
+@pytest.fixture(params=['xlsxwriter', 'openpyxl'])
+def writer(request, monkeypatch):
+    """두 저장 경로 모두 확인 (openpyxl: xlsxwriter 미설치 상황)"""
+    if request.param == 'openpyxl':
+        monkeypatch.setattr(fin_utils, 'xlsxwriter', None)
+    elif fin_utils.xlsxwriter is None:
+        pytest.skip('xlsxwriter 미설치')
+    return request.param
+
+
+def test_excel_round_trip_keeps_dates_and_blanks(tmp_path, writer):
+    df = pd.DataFrame({
+        '리밸런싱일': pd.to_datetime(['2024-01-31', None]),
+        '기록시각': [pd.Timestamp('2024-02-01 09:30:00', tz='Asia/Seoul'), pd.NaT],
+        '종목코드': ['005930', None],
+        '비중': [0.05, np.nan],
+    })
+    path = tmp_path / 'out.xlsx'
+    fin_utils.save_styled_excel(df, str(path))
+
+    ws = load_workbook(path).active
+    rows = [[cell for cell in row] for row in ws.iter_rows()]
+    assert [c.value for c in rows[0]] == ['리밸런싱일', '기록시각', '종목코드', '비중']
+
+    date, stamp, code, weight = rows[1]
+    assert date.value == datetime.datetime(2024, 1, 31)
+    assert date.number_format == fin_utils.EXCEL_DATE_FORMAT
+    assert stamp.value == datetime.datetime(2024, 2, 1, 9, 30)
+    assert stamp.number_format == fin_utils.EXCEL_DATETIME_FORMAT
+    assert code.value == '005930'
+    assert weight.value == 0.05 and weight.number_format == fin_utils.EXCEL_NUMBER_FORMAT
+    assert date.font.name == fin_utils.EXCEL_FONT['name']
+
+    # NaT / None / NaN → 빈 셀
+    assert [c.value for c in rows[2]] == [None, None, None, None]
+
+
+def test_excel_index_dates(tmp_path, writer):
+    df = pd.DataFrame({'equity': [1.0, 1.1]},
+                      index=pd.DatetimeIndex(['2024-01-31', '2024-02-29'], name='date'))
+    path = tmp_path / 'equity.xlsx'
+    fin_utils.save_styled_excel_multisheet([('equity', df)], str(path), index=True)
+
+    ws = load_workbook(path)['equity']
+    values = [cell.value for cell in ws['A']]
+    assert datetime.datetime(2024, 2, 29) in values
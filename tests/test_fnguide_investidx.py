@@ -0,0 +1,55 @@
+import fngCollect
+import fnguideInvestIdx
+from fin_journal import RunJournal
+from fin_utils import FAILURE_THROTTLED, PARTIAL_FAILURES_KEY, FetchError
+
+ROW = {'scode': '005930', 'sname': '삼성전자', 'industry': '', 'products': ''}
+
+
+def _patch_pages(monkeypatch, multifactor):
+    monkeypatch.setattr(fnguideInvestIdx, 'getFnGuideInvestIdx', lambda code: '<html></html>')
+    monkeypatch.setattr(fnguideInvestIdx, 'cached_parse',
+                        lambda html, name, version, fn: {'종목명': '삼성전자', '2025_PER': 12.0})
+    monkeypatch.setattr(fnguideInvestIdx, 'getFnGuideMultiFactor', multifactor)
+
+
+def _throttled(code):
+    raise FetchError(f'https://example/{code}.json', FAILURE_THROTTLED, 'HTTP 429', status=429)
+
+
+def test_multifactor_failure_keeps_html_result(monkeypatch):
+    _patch_pages(monkeypatch, _throttled)
+
+    result = fnguideInvestIdx.collectInvestIdx('005930')
+
+    assert result['2025_PER'] == 12.0
+    assert result[PARTIAL_FAILURES_KEY]['multifactor']['kind'] == FAILURE_THROTTLED
+
+
+def test_multifactor_failure_is_reported_but_not_resumed(monkeypatch, tmp_path):
+    _patch_pages(monkeypatch, _throttled)
+
+    row, parsed, errors, _ = fngCollect._parse_stock_pages((ROW, 'investidx'))
+
+    assert parsed['investidx'] == {'종목명': '삼성전자', '2025_PER': 12.0}
+    assert list(errors) == ['investidx.multifactor']
+
+    path = str(tmp_path / 'investidx.jsonl')
+    with RunJournal(path) as journal:
+        journal.record_stock(row, parsed, errors)
+    with RunJournal(path, resume=True) as journal:
+        assert journal.pending([ROW], ['investidx']) == []
+        assert journal.parsed('005930', ['investidx'])['investidx']['2025_PER'] == 12.0
+        assert [(f['module'], f['error']['kind']) for f in journal.failures()] == \
+            [('investidx.multifactor', FAILURE_THROTTLED)]
+
+
+def test_multifactor_success_merges_scores(monkeypatch):
+    data = {'CHART_H': [{'NAME': '삼성전자'}, {'NAME': '반도체(업종)'}],
+            'CHART_D': [{'NM': '밸류', 'VAL1': '0.5', 'VAL2': '0.1'}]}
+    _patch_pages(monkeypatch, lambda code: data)
+
+    result = fnguideInvestIdx.collectInvestIdx('005930')
+
+    assert PARTIAL_FAILURES_KEY not in result
+    assert result['밸류_종목'] == 0.5 and result['팩터_업종명'] == '반도체'
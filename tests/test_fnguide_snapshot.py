@@ -0,0 +1,36 @@
+import os
+
+import fin_utils
+import fnguideSnapshot
+
+_YEARS = ['2021/12', '2022/12', '2023/12', '2024/12', '2025/12', '2026/12(E)', '2027/12(E)']
+
+PAGE = f"""<html><head><title>삼성전자(A005930) | Snapshot</title></head><body>
+<div class="corp_group1"><h2>12월 결산</h2></div>
+<p class="stxt_group"><span class="stxt">KSE 코스피 전기·전자</span><span class="stxt">FICS 반도체</span></p>
+<div id="highlight_D_Y"><table>
+<thead><tr class="td_gapcolor2">{''.join(f'<th scope="col"><div>{y}</div></th>' for y in _YEARS)}</tr></thead>
+<tbody>
+<tr><th scope="row"><div>PER<span class="csize">(배)</span></div></th>
+  <td>10</td><td>11</td><td>12</td><td>13</td><td>14</td><td>15</td><td>16</td></tr>
+<tr><th scope="row"><div>발행주식수</div></th>
+  <td>5,969,783</td><td>5,969,783</td><td>5,969,783</td><td>5,919,638</td><td>5,919,638</td><td></td><td></td></tr>
+</tbody></table></div></body></html>"""
+
+
+def test_year_window_is_applied_after_the_parse_cache(tmp_path, monkeypatch):
+    """파싱 캐시는 현재 연도와 무관하게 하나만 두고, 연도 선택은 읽을 때마다 적용"""
+    monkeypatch.setattr(fin_utils, 'PARSE_CACHE_DIR', str(tmp_path / 'parse_cache'))
+    monkeypatch.setattr(fnguideSnapshot, 'getFnGuideSnapshot', lambda code: PAGE)
+
+    data = fnguideSnapshot.collectSnapshot('005930')
+    assert data == fnguideSnapshot.parseFnguideSnapshot(PAGE)
+    assert os.listdir(tmp_path / 'parse_cache') == [f'snapshot_v{fnguideSnapshot.PARSER_VERSION}']
+
+    parsed = fin_utils.cached_parse(PAGE, 'snapshot', fnguideSnapshot.PARSER_VERSION, None)  # 캐시 적중
+    in_2026 = fnguideSnapshot._select_snapshot(parsed, current_year=2026)
+    in_2027 = fnguideSnapshot._select_snapshot(parsed, current_year=2027)
+    assert [k for k in in_2026 if k.endswith('PER(배)')] == [f'{y}_PER(배)' for y in range(2023, 2028)]
+    assert [k for k in in_2027 if k.endswith('PER(배)')] == [f'{y}_PER(배)' for y in range(2024, 2028)]
+    assert in_2026['종목명'] == '삼성전자' and in_2026['결산월'] == 12
+    assert in_2026['발행주식수(천주)'] == 5919638.0
@@ -0,0 +1,28 @@
+from strat_sweep import apply_overrides, expand_grid, lookup
+
+
+def test_expand_grid_all_combinations_in_key_order():
+    combos = expand_grid({'peg.max_peg': [0.5, 1.0], 'piotroski.min_score': [6, 7, 8]})
+    assert len(combos) == 6
+    assert combos[0] == {'peg.max_peg': 0.5, 'piotroski.min_score': 6}
+    assert combos[-1] == {'peg.max_peg': 1.0, 'piotroski.min_score': 8}
+    assert all(list(c) == ['peg.max_peg', 'piotroski.min_score'] for c in combos)
+    assert expand_grid({}) == [{}]
+
+
+def test_apply_overrides_copies_and_creates_paths():
+    strategy_cfg = {'peg': {'max_peg': 1.0}, 'multifactor': {'weights': {'모멘텀': 0.15, '밸류': 0.2}}}
+    weights = {'peg': 0.2, 'ncav': 0.1}
+    overrides = {'peg.max_peg': 0.5, 'multifactor.weights.모멘텀': 0.3, 'nfav.min_nfav_r': 0.7,
+                 'composite.ncav': 0.0}
+
+    cfg, new_weights = apply_overrides(strategy_cfg, weights, overrides)
+
+    assert cfg['peg']['max_peg'] == 0.5
+    assert cfg['multifactor']['weights'] == {'모멘텀': 0.3, '밸류': 0.2}
+    assert cfg['nfav'] == {'min_nfav_r': 0.7}
+    assert new_weights == {'peg': 0.2, 'ncav': 0.0}
+    # 원본 설정은 그대로
+    assert strategy_cfg == {'peg': {'max_peg': 1.0}, 'multifactor': {'weights': {'모멘텀': 0.15, '밸류': 0.2}}}
+    assert weights == {'peg': 0.2, 'ncav': 0.1}
+    assert all(lookup(cfg, new_weights, path) == value for path, value in overrides.items())
@@ -0,0 +1,39 @@
+import os
+
+import pandas as pd
+
+import fngCollect
+import strat_utils
+
+
+def _write_pair(tmp_path, xlsx_rows, parquet_rows, parquet_newer):
+    xlsx = str(tmp_path / 'snapshot_2026_04.xlsx')
+    pd.DataFrame({'종목코드': ['005930'] * xlsx_rows}).to_excel(xlsx, index=False)
+    pd.DataFrame({'종목코드': ['000660'] * parquet_rows}).to_parquet(str(tmp_path / 'snapshot_2026_04.parquet'))
+    older, newer = 1_700_000_000, 1_700_000_100
+    os.utime(xlsx, (newer, older if parquet_newer else newer))
+    os.utime(tmp_path / 'snapshot_2026_04.parquet', (newer, newer if parquet_newer else older))
+    return xlsx
+
+
+def test_read_frame_prefers_dataset_when_not_older(tmp_path):
+    xlsx = _write_pair(tmp_path, xlsx_rows=1, parquet_rows=3, parquet_newer=True)
+    assert len(strat_utils._read_frame(xlsx)) == 3
+
+
+def test_read_frame_falls_back_to_newer_xlsx(tmp_path):
+    xlsx = _write_pair(tmp_path, xlsx_rows=1, parquet_rows=3, parquet_newer=False)
+    df = strat_utils._read_frame(xlsx)
+    assert df['종목코드'].tolist() == ['005930']
+
+
+def test_test_mode_dataset_does_not_replace_monthly_dataset(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('derived')
+    df = pd.DataFrame({'종목코드': ['005930'], '종목명': ['삼성전자'], 'PER': [12.0]})
+
+    path = fngCollect.save_dataset(df, module_name='snapshot', suffix=fngCollect.TEST_SUFFIX)
+
+    assert path == fngCollect.output_path('snapshot', 'parquet', suffix='_test')
+    assert path.endswith('_test.parquet')
+    assert not os.path.exists(fngCollect.output_path('snapshot', 'parquet'))